@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from datetime import timedelta
-from app.core.security import create_access_token, verify_password, get_password_hash
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timedelta
+from app.core.security import (
+    create_access_token, verify_password_async, get_password_hash_async,
+    create_refresh_token, hash_refresh_token
+)
 from app.core.config import settings
 from app.db.mongodb import db
-from app.models.user import UserCreate
+from app.models.user import UserCreate, Token, RefreshRequest
 
 
 router = APIRouter()
@@ -24,8 +28,8 @@ async def signup(user: UserCreate):
             detail=f"Email {user.username} is already registered."
         )
 
-    # 3. Hash Password
-    hashed_password = get_password_hash(user.password)
+    # 3. Hash Password (on the hashing pool, not the event loop)
+    hashed_password = await get_password_hash_async(user.password)
     
     # 4. Create User Document
     user_doc = {
@@ -38,8 +42,14 @@ async def signup(user: UserCreate):
         "disabled": False
     }
 
-    # 5. Insert into DB
-    result = await database["users"].insert_one(user_doc)
+    # 5. Insert into DB (the unique username index catches two signups racing past step 2)
+    try:
+        result = await database["users"].insert_one(user_doc)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Email {user.username} is already registered."
+        )
     
     return {"message": "User created successfully", "id": str(result.inserted_id)}
 
@@ -51,18 +61,75 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     # 2. Find User
     user = await database["users"].find_one({"username": form_data.username})
     
-    # 3. Verify Password
-    if not user or not verify_password(form_data.password, user["hashed_password"]):
+    # 3. Verify Password (on the hashing pool, not the event loop)
+    is_valid, new_hash = (False, None)
+    if user:
+        is_valid, new_hash = await verify_password_async(form_data.password, user["hashed_password"])
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Stored with an old bcrypt cost? Upgrade it now that we know the password
+    if new_hash:
+        await database["users"].update_one({"_id": user["_id"]}, {"$set": {"hashed_password": new_hash}})
     
-    # 4. Generate Token
+    # 4. Generate Tokens
+    return await issue_tokens(database, user["username"])
+
+async def issue_tokens(database, username: str):
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user["username"]}, expires_delta=access_token_expires
+        data={"sub": username}, expires_delta=access_token_expires
     )
-    
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+
+    # Only the hash is stored, so a DB leak doesn't hand out sessions
+    refresh_token = create_refresh_token()
+    now = datetime.utcnow()
+    await database["refresh_tokens"].insert_one({
+        "token_hash": hash_refresh_token(refresh_token),
+        "username": username,
+        "created_at": now,
+        "expires_at": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        "revoked": False
+    })
+
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post("/refresh", response_model=Token)
+async def refresh(body: RefreshRequest):
+    """
+    Swaps a refresh token for a new access token (no password, no bcrypt).
+    The refresh token is rotated: the old one stops working once used.
+    """
+    database = db.client[settings.DATABASE_NAME]
+
+    # 1. Atomically revoke the presented token, so a replayed copy can't be used twice
+    stored = await database["refresh_tokens"].find_one_and_update(
+        {
+            "token_hash": hash_refresh_token(body.refresh_token),
+            "revoked": False,
+            "expires_at": {"$gt": datetime.utcnow()}
+        },
+        {"$set": {"revoked": True, "rotated_at": datetime.utcnow()}}
+    )
+    if not stored:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # 2. New pair of tokens
+    return await issue_tokens(database, stored["username"])
+
+@router.post("/logout")
+async def logout(body: RefreshRequest):
+    database = db.client[settings.DATABASE_NAME]
+    await database["refresh_tokens"].update_one(
+        {"token_hash": hash_refresh_token(body.refresh_token)},
+        {"$set": {"revoked": True}}
+    )
+    return {"message": "Logged out"}
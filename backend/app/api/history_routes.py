@@ -1,26 +1,130 @@
-from fastapi import APIRouter, Depends
-from typing import List
+import json
+import base64
+from datetime import datetime
+from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from app.db.mongodb import db
 from app.core.config import settings
 from app.core.security import get_current_user
-from app.models.history import ScanLog
+from app.core.etag import make_etag, etag_matches, not_modified
+from app.models.history import ScanLog, UserSummary
+from app.db.summaries import COLLECTION as SUMMARY_COLLECTION, present_summary
 
 router = APIRouter()
 
+# Only what ScanLog returns (skips confidence/message on the wire from MongoDB)
+SCAN_LOG_PROJECTION = {field.alias or name: 1 for name, field in ScanLog.model_fields.items()}
+
+# Newest first; _id breaks ties between logs written in the same instant
+HISTORY_SORT = [("timestamp", -1), ("_id", -1)]
+
+def encode_cursor(document: dict) -> str:
+    raw = json.dumps({"t": document["timestamp"].isoformat(), "id": str(document["_id"])})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(token: str) -> dict:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        return {"timestamp": datetime.fromisoformat(raw["t"]), "_id": ObjectId(raw["id"])}
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid 'next' cursor")
+
+async def history_etag(database, username: str, limit: int, next: Optional[str]) -> str:
+    """
+    Every history write bumps history_version on the user's summary (retried, unlike the
+    counters), so the summary doubles as the history version: one _id lookup instead of the paged query.
+    """
+    summary = await database[SUMMARY_COLLECTION].find_one(
+        {"_id": username}, {"history_version": 1, "prediction_count": 1, "last_prediction_at": 1}
+    ) or {}
+    return make_etag(
+        "history", username, summary.get("history_version", 0), summary.get("prediction_count", 0),
+        summary.get("last_prediction_at"), limit, next
+    )
+
 @router.get("/my-logs", response_model=List[ScanLog])
-async def get_my_history(current_user: dict = Depends(get_current_user)):
+async def get_my_history(
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    next: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
     database = db.client[settings.DATABASE_NAME]
     
     # FIX: Use "sub" because security.py now returns {"sub": "email@..."}
     user_id = current_user["sub"]
+
+    # Nothing written since the client's copy: 304, the history query never runs
+    etag = await history_etag(database, user_id, limit, next)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     
-    # Fetch logs for THIS user only, sorted by newest first
-    cursor = database["history"].find({"username": user_id}).sort("timestamp", -1).limit(10)
-    
-    logs = []
-    async for document in cursor:
+    # Fetch logs for THIS user only, sorted by newest first.
+    # Keyset paging: continue strictly after the last (timestamp, _id) of the previous page,
+    # so every page is an index range scan no matter how deep we are.
+    query = {"username": user_id}
+    if next:
+        after = decode_cursor(next)
+        query["$or"] = [
+            {"timestamp": {"$lt": after["timestamp"]}},
+            {"timestamp": after["timestamp"], "_id": {"$lt": after["_id"]}},
+        ]
+
+    # Ask for one extra document to know whether another page exists
+    cursor = database["history"].find(query, SCAN_LOG_PROJECTION).sort(HISTORY_SORT).limit(limit + 1)
+    documents = await cursor.to_list(length=limit + 1)
+
+    if len(documents) > limit:
+        documents = documents[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(documents[-1])
+
+    for document in documents:
         # Convert ObjectId to string for Pydantic
         document["_id"] = str(document["_id"])
-        logs.append(document)
         
-    return logs
\ No newline at end of file
+    return documents
+
+def _export_value(value):
+    # Same shapes as the ScanLog JSON of /my-logs: ISO 8601 datetimes, string ids
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+@router.get("/export")
+async def export_my_history(current_user: dict = Depends(get_current_user)):
+    """
+    Streams every history record of the user as NDJSON (one JSON object per line, the ScanLog
+    fields of /my-logs), straight from the MongoDB cursor, so memory stays flat however long
+    the history is.
+    """
+    database = db.client[settings.DATABASE_NAME]
+    cursor = database["history"].find({"username": current_user["sub"]}, SCAN_LOG_PROJECTION) \
+        .sort(HISTORY_SORT).batch_size(500)
+
+    async def ndjson_lines():
+        async for document in cursor:
+            yield json.dumps(document, default=_export_value, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(
+        ndjson_lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="history.ndjson"'}
+    )
+
+@router.get("/summary", response_model=UserSummary)
+async def get_my_summary(current_user: dict = Depends(get_current_user)):
+    """
+    Counts, latest and average attendance for the user, kept up to date on every
+    prediction, so this is one _id lookup instead of a scan over the whole history.
+    """
+    database = db.client[settings.DATABASE_NAME]
+    doc = await database[SUMMARY_COLLECTION].find_one({"_id": current_user["sub"]})
+    if not doc:
+        return UserSummary(username=current_user["sub"])
+    return present_summary(doc)
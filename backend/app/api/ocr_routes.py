@@ -1,5 +1,7 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from app.ocr.ocr_processor import extract_attendance_from_image
+import asyncio
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query, Response
+from app.ocr.ocr_service import scan_image, OCRError
+from app.ocr.ocr_jobs import ocr_jobs
 from app.core.security import get_current_user
 
 # Note: We REMOVED joblib and pandas to save RAM on Render Free Tier.
@@ -9,7 +11,9 @@ router = APIRouter()
 
 @router.post("/scan", tags=["OCR"])
 async def scan_attendance(
+    response: Response,
     file: UploadFile = File(...),
+    async_mode: bool = Query(False, alias="async"),
     current_user: dict = Depends(get_current_user)
 ):
     # 1. Validate Image
@@ -19,24 +23,26 @@ async def scan_attendance(
     # 2. Read Image Bytes
     image_bytes = await file.read()
 
-    # 3. Run OCR (Now using Gemini via ocr_processor)
-    try:
-        # returns a dictionary: {"overall_attendance": 85.0, "subjects": [...], "raw_text": "..."}
-        data = extract_attendance_from_image(image_bytes)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"OCR Engine Error: {str(e)}")
+    # 3. Job mode: queue it and hand back a job id right away
+    if async_mode:
+        try:
+            job = await ocr_jobs.submit(image_bytes, current_user["sub"])
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="OCR queue is full. Please try again shortly.")
+        response.status_code = 202
+        return ocr_jobs.public_view(job)
 
-    # 4. Check if we found anything (Gemini usually returns valid JSON structure even on failure)
-    if "error" in data:
-         raise HTTPException(status_code=500, detail=data["error"])
+    # 4. Synchronous mode (same bounded Groq concurrency as the jobs)
+    try:
+        return await scan_image(image_bytes)
+    except OCRError as e:
+        raise HTTPException(status_code=500, detail=e.detail)
 
-    # 5. Return Clean Data
-    # We removed the "ai_analysis" (Prediction) part because it requires heavy libraries.
-    # The Frontend will use this data to fill the form, then the User clicks "Predict".
-    return {
-        "extracted_data": {
-            "overall_attendance": data.get("overall_attendance", 0.0),
-            "subject_attendances": data.get("subjects", [])
-        },
-        "raw_text": data.get("raw_text", "")
-    }
\ No newline at end of file
+@router.get("/jobs/{job_id}", tags=["OCR"])
+async def get_scan_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    # Read from MongoDB: the job may have been submitted to another worker
+    job = await ocr_jobs.get(job_id)
+    # Other users' jobs look exactly like missing ones
+    if not job or job["username"] != current_user["sub"]:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return ocr_jobs.public_view(job)
@@ -1,28 +1,30 @@
-import os
 import json
-import google.generativeai as genai
-from fastapi import APIRouter, Depends
+import asyncio
+import hashlib
+import time
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
-from datetime import datetime
-from app.db.mongodb import db
+from datetime import date, datetime
+from app.db.mongodb import history_buffer, get_database
+from app.core.cache import LRUCache
 from app.core.config import settings
 from app.core.security import get_current_user
+from app.core.metrics import prediction_fallback_total
+from app.core.upstream import upstream
+from app.ml.model_engine import model_engine
+from app.ml.prediction_cache import prediction_cache
+from app.ml.precompute import COLLECTION as VERDICT_COLLECTION
 
 load_dotenv()
 
 router = APIRouter()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
 # --- HELPER: AUTO-SELECT MODEL ---
-def get_best_available_model():
-    try:
-        # Just use Flash. It is the most reliable for free tier rate limits.
-        return "gemini-1.5-flash"
-    except:
-        return "gemini-1.5-flash"
+# Just use Flash. It is the most reliable for free tier rate limits.
+CURRENT_MODEL_NAME = settings.GEMINI_MODEL_NAME
 
-CURRENT_MODEL_NAME = get_best_available_model()
 
 class PredictionRequest(BaseModel):
     overall_attendance: float
@@ -36,6 +38,18 @@ class PredictionRequest(BaseModel):
     is_first_period: bool
     filename: str
 
+class SubjectAttendance(BaseModel):
+    attended: int
+    held: int
+
+class PlanRequest(BaseModel):
+    attendance: Dict[str, SubjectAttendance] = {}
+    remaining_weeks: int
+    exam_dates: List[date] = []
+    start_date: Optional[date] = None
+    faculty_strictness: Dict[str, int] = {}
+    include_slots: bool = True
+
 # --- VINTAGE MATH MODEL (CORRECTED LOGIC) ---
 def calculate_vintage_risk(data: PredictionRequest):
     # 1. Sanitize Inputs (No negative days)
@@ -86,41 +100,181 @@ def calculate_vintage_risk(data: PredictionRequest):
         "message": f"Calculated Risk: {int(final_risk)}%. {msg_text}."
     }
 
+async def ask_gemini(data: PredictionRequest):
+    prompt = f"""
+    Act as a College Advisor. 
+    Attendance: {data.overall_attendance}%, Exam in: {data.days_to_exam} days, Proxy: {data.has_proxy}.
+    Return JSON: {{ "prediction": "Safe/Not Safe", "confidence": "85%", "message": "Short reason" }}
+    """
+    # Async REST call through the shared upstream client (pooled, rate limited, circuit breaker)
+    response = await upstream.post_json(
+        "gemini",
+        f"/v1beta/models/{CURRENT_MODEL_NAME}:generateContent",
+        {"contents": [{"parts": [{"text": prompt}]}]},
+        params={"key": settings.GEMINI_API_KEY},
+    )
+    text = response["candidates"][0]["content"]["parts"][0]["text"]
+    clean_text = text.replace("```json", "").replace("```", "").strip()
+    return json.loads(clean_text)
+
+async def ask_local_model(data: PredictionRequest):
+    safe_proba = await model_engine.predict_safe_proba(data)
+    is_safe = safe_proba >= 0.5
+    return {
+        "prediction": "Safe to Bunk 😎" if is_safe else "Not Safe ❌",
+        "confidence": f"{safe_proba * 100:.1f}%" if is_safe else f"{(1 - safe_proba) * 100:.1f}% Risk",
+        "message": f"XGBoost model: {safe_proba * 100:.1f}% chance it's safe to bunk."
+    }
+
 @router.post("/", status_code=200)
 async def predict_risk(data: PredictionRequest, current_user: dict = Depends(get_current_user)):
-    result = {}
-    
-    # 1. Try Gemini
-    try:
-        model = genai.GenerativeModel(CURRENT_MODEL_NAME)
-        prompt = f"""
-        Act as a College Advisor. 
-        Attendance: {data.overall_attendance}%, Exam in: {data.days_to_exam} days, Proxy: {data.has_proxy}.
-        Return JSON: {{ "prediction": "Safe/Not Safe", "confidence": "85%", "message": "Short reason" }}
-        """
-        response = model.generate_content(prompt)
-        clean_text = response.text.replace("```json", "").replace("```", "").strip()
-        result = json.loads(clean_text)
-    except Exception:
-        # Fallback to Vintage Math
-        result = calculate_vintage_risk(data)
-
-    # 2. SAVE TO DATABASE
-    try:
-        username = current_user.get("username") or current_user.get("sub") or "unknown"
-        history_log = {
-            "username": username,
-            "timestamp": datetime.now(),
-            "overall_attendance": data.overall_attendance,
-            "filename": data.filename,
-            "prediction": result.get("prediction", "Unknown"),
-            "confidence": result.get("confidence", "0%"),
-            "message": result.get("message", "")
-        }
-        database = db.client[settings.DATABASE_NAME]
-        await database["history"].insert_one(history_log)
-        
-    except Exception as e:
-        print(f"❌ DB Save Error: {e}")
-
-    return result
\ No newline at end of file
+    # 1. Hedge: the Vintage Math answer is ready before any model is even asked
+    fallback = calculate_vintage_risk(data.model_copy())
+
+    # 2. Same features answered recently? Only Gemini is worth it: Vintage Math and the local model
+    #    are deterministic and about as cheap as a lookup, and a cached answer loses attendance precision
+    engine = settings.PREDICTION_ENGINE
+    if engine not in ("vintage", "xgboost") or (engine == "xgboost" and not model_engine.ready):
+        engine = "gemini"
+    use_cache = engine == "gemini" and prediction_cache.enabled
+    cache_key = prediction_cache.key(data, engine) if use_cache else None
+    result = await prediction_cache.get(cache_key) if use_cache else None
+
+    # 3. Ask the configured engine (Gemini within the latency budget, or the local model)
+    if result is None:
+        started = time.perf_counter()
+        try:
+            if engine == "vintage":
+                result = {**fallback, "engine": "vintage"}
+            elif engine == "xgboost":
+                result = await ask_local_model(data)
+                result["engine"] = "xgboost"
+            else:
+                result = await asyncio.wait_for(ask_gemini(data), timeout=settings.GEMINI_LATENCY_BUDGET_SECONDS)
+                result["engine"] = "gemini"
+        except asyncio.TimeoutError:
+            print(f"⏱️ Gemini exceeded {settings.GEMINI_LATENCY_BUDGET_SECONDS}s budget, using Vintage Math")
+            prediction_fallback_total.inc(reason="timeout")
+            result = {**fallback, "engine": "vintage"}
+        except Exception:
+            # Fallback to Vintage Math
+            prediction_fallback_total.inc(reason="error")
+            result = {**fallback, "engine": "vintage"}
+
+        # Only real model answers are remembered; a fallback should get a fresh try next time
+        if use_cache and result.get("engine") == engine:
+            prediction_cache.set(cache_key, result, time.perf_counter() - started)
+
+    # 4. SAVE TO DATABASE (queued; written in bulk behind the response, cache hits included)
+    username = current_user.get("username") or current_user.get("sub") or "unknown"
+    history_buffer.add(build_history_log(username, data, result))
+
+    return result
+
+def build_history_log(username: str, data: PredictionRequest, result: dict):
+    return {
+        "username": username,
+        "timestamp": datetime.now(),
+        "overall_attendance": data.overall_attendance,
+        "filename": data.filename,
+        "prediction": result.get("prediction", "Unknown"),
+        "confidence": result.get("confidence", "0%"),
+        "message": result.get("message", "")
+    }
+
+@router.post("/batch", status_code=200)
+async def predict_risk_batch(rows: List[PredictionRequest], current_user: dict = Depends(get_current_user)):
+    """
+    Scores many rows at once with the vectorized Vintage Math engine (no Gemini).
+    """
+    if len(rows) > settings.PREDICT_BATCH_MAX_ROWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large. Send at most {settings.PREDICT_BATCH_MAX_ROWS} rows per request."
+        )
+    if not rows:
+        return []
+
+    # 1. Score every row in one vectorized pass (NumPy is only imported once a batch comes in)
+    from app.ml.vintage_batch import requests_to_columns, calculate_vintage_risk_batch
+    results = calculate_vintage_risk_batch(requests_to_columns(rows), engine="vintage")
+
+    # 2. SAVE TO DATABASE (queued; written with insert_many behind the response)
+    username = current_user.get("username") or current_user.get("sub") or "unknown"
+    history_buffer.add_many([build_history_log(username, row, result) for row, result in zip(rows, results)])
+
+    return results
+
+# --- SEMESTER PLANNER ---
+# Key: (user, timetable contents, request). A new timetable hashes differently, so stale plans are never served.
+_plan_cache = LRUCache(maxsize=settings.PLAN_CACHE_SIZE, ttl_seconds=settings.PLAN_CACHE_TTL_SECONDS)
+
+def plan_cache_key(username: str, timetable: dict, request: PlanRequest, start: date):
+    payload = json.dumps(
+        {"timetable": timetable, "request": request.model_dump(mode="json"), "start": start.isoformat()},
+        sort_keys=True,
+    )
+    return username, hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+@router.post("/plan", status_code=200)
+async def plan_bunks(
+    request: PlanRequest,
+    current_user: dict = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    """
+    Whole-semester answer to "how many can I still skip": max bunks per subject and per weekday
+    that keep attendance at the target, plus a Vintage Math risk score for every remaining slot.
+    Replaces calling /predict/ once per hypothetical class.
+    """
+    if not 0 < request.remaining_weeks <= settings.PLAN_MAX_WEEKS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"remaining_weeks must be between 1 and {settings.PLAN_MAX_WEEKS}."
+        )
+    for name, counts in request.attendance.items():
+        if counts.attended < 0 or counts.attended > counts.held:
+            raise HTTPException(status_code=400, detail=f"Invalid attendance counts for {name}.")
+
+    username = current_user["sub"]
+    user = await db["users"].find_one({"username": username}, {"timetable": 1})
+    timetable = (user or {}).get("timetable")
+    if not timetable or not any(timetable.values()):
+        raise HTTPException(status_code=404, detail="Save your timetable first.")
+
+    start = request.start_date or date.today()
+    key = plan_cache_key(username, timetable, request, start)
+    plan = _plan_cache.get(key)
+    if plan is not None:
+        return plan
+
+    # NumPy is only imported once someone asks for a plan
+    from app.ml.bunk_planner import plan_semester
+    plan = await asyncio.to_thread(
+        plan_semester,
+        timetable,
+        {name: counts.model_dump() for name, counts in request.attendance.items()},
+        start,
+        request.remaining_weeks,
+        request.exam_dates,
+        request.faculty_strictness,
+        settings.ATTENDANCE_TARGET,
+        request.include_slots,
+    )
+    _plan_cache.set(key, plan)
+    return plan
+
+# --- PRECOMPUTED VERDICTS ---
+@router.get("/today", status_code=200)
+async def predict_today(current_user: dict = Depends(get_current_user), db=Depends(get_database)):
+    """
+    Today's per-class verdicts, computed overnight by app/ml/precompute.py:
+    one indexed (username, date) read, no model call. 404 means "ask /predict/ instead".
+    """
+    doc = await db[VERDICT_COLLECTION].find_one(
+        {"username": current_user["sub"], "date": date.today().isoformat()},
+        {"_id": 0, "expires_at": 0}
+    )
+    if not doc:
+        raise HTTPException(status_code=404, detail="No precomputed verdicts for today.")
+    return doc
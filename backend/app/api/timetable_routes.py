@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
 from app.db.mongodb import get_database
 from app.core.security import get_current_user
+from app.core.etag import make_etag, etag_matches, not_modified
+from app.ml.precompute import COLLECTION as VERDICT_COLLECTION
 from app.models.user import UserTimetable # ✅ NEW PATH
 
 router = APIRouter()
 
+def timetable_etag(username: str, version: int) -> str:
+    return make_etag("timetable", username, version)
+
 @router.post("/", response_model=dict)
 async def update_timetable(
     timetable: UserTimetable,
@@ -14,28 +20,46 @@ async def update_timetable(
     """
     Saves or updates the student's weekly timetable.
     """
-    user_email = current_user["email"]
+    # Tokens carry the user's email in "sub"; it is stored as "username" (see auth_routes)
+    user_email = current_user["sub"]
     
-    # Update the specific user's document with the new timetable
+    # Update the specific user's document with the new timetable.
+    # timetable_version backs the ETag on GET, so every save must bump it.
     result = await db["users"].update_one(
-        {"email": user_email},
-        {"$set": {"timetable": timetable.dict()}}
+        {"username": user_email},
+        {"$set": {"timetable": timetable.dict()}, "$inc": {"timetable_version": 1}}
     )
     
     if result.modified_count == 0 and result.matched_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
+
+    # Verdicts precomputed from the old timetable no longer apply (/predict/today falls back to /predict/)
+    await db[VERDICT_COLLECTION].delete_many({"username": user_email})
         
     return {"message": "Timetable updated successfully! 📅"}
 
 @router.get("/", response_model=UserTimetable)
 async def get_timetable(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user),
     db=Depends(get_database)
 ):
     """
     Retrieves the logged-in user's timetable.
+    Sends an ETag; a matching If-None-Match gets 304 after reading only the version number.
     """
-    user = await db["users"].find_one({"email": current_user["email"]})
+    username = current_user["sub"]
+
+    if if_none_match:
+        user = await db["users"].find_one({"username": username}, {"_id": 0, "timetable_version": 1})
+        etag = timetable_etag(username, (user or {}).get("timetable_version", 0))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    # Only the timetable (never the password hash etc.)
+    user = await db["users"].find_one({"username": username}, {"_id": 0, "timetable": 1, "timetable_version": 1})
+    response.headers["ETag"] = timetable_etag(username, (user or {}).get("timetable_version", 0))
     
     if not user or "timetable" not in user:
         # Return empty default if not set
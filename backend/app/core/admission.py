@@ -0,0 +1,206 @@
+import asyncio
+import json
+import math
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import registry, Counter, register_gauge_callback
+from app.core.ratelimit import TokenBucket
+
+# Admission control in front of the expensive routes: OCR (Groq vision), predictions (Gemini/model)
+# and the bcrypt-bound auth routes. Two checks, both answered before the route does any work:
+# 1. Per-client token bucket (JWT `sub`, or the client IP when there is no valid token) -> 429
+# 2. Per-class concurrency limit with a bounded, short wait queue -> 503
+# Both responses carry Retry-After, so well-behaved clients back off instead of hammering.
+
+admission_rejections_total = registry.register(Counter(
+    "admission_rejections_total", "Requests shed by admission control", labels=("route_class", "reason")))
+
+class RouteClass:
+    def __init__(self, name: str, rate_per_minute: float, burst: int, concurrency: int, queue_size: int):
+        self.name = name
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def enter(self, max_wait: float):
+        """
+        Returns None once a slot is held, or the reason it was refused ("queue_full", "queue_timeout").
+        """
+        if self._semaphore.locked():
+            if self.waiting >= self.queue_size:
+                return "queue_full"
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=max_wait)
+            except asyncio.TimeoutError:
+                return "queue_timeout"
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self.in_flight += 1
+        return None
+
+    def leave(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def share(self, workers: int):
+        # Called in a freshly forked worker, before it serves anything. Only the class-wide limits:
+        # a keep-alive client stays on one worker, so its token bucket keeps the per-client numbers
+        self.concurrency = max(1, self.concurrency // workers)
+        self.queue_size = max(1, self.queue_size // workers)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+def forwarded_client(headers, trusted_hops: int):
+    """
+    The client address as seen by the outermost of our `trusted_hops` proxies. Each proxy appends
+    the address it received the request from, so only the last `trusted_hops` entries of
+    X-Forwarded-For are ours; anything left of them is whatever the client chose to send.
+    None when the header is missing or shorter than the proxy chain (not from our proxies).
+    """
+    entries = []
+    for name, value in headers:
+        if name == b"x-forwarded-for":
+            entries += [entry.strip() for entry in value.decode("latin-1").split(",")]
+    if trusted_hops < 1 or len(entries) < trusted_hops:
+        return None
+    return entries[-trusted_hops] or None
+
+class AdmissionController:
+    def __init__(self, classes: list, max_wait_seconds: float, max_tracked_clients: int, enabled: bool = True):
+        self.classes = {route_class.name: route_class for route_class in classes}
+        self.max_wait_seconds = max_wait_seconds
+        self.enabled = enabled
+        # (class, client) -> TokenBucket; idle clients fall out of the LRU and start again with a full bucket
+        self._buckets = LRUCache(max_tracked_clients)
+
+    def share_limits(self, workers: int):
+        """
+        Semaphores live in each process: with N gunicorn workers each one gets 1/N of every class's
+        concurrency and queue, so those hold for the whole server. Per-client buckets are not split:
+        a client's connection (and so its requests) mostly stays on one worker, and 1/N of its rate
+        there would throttle well-behaved users. A client spreading requests over several connections
+        can get up to N times its rate; an exact server-wide limit would need a shared store.
+        """
+        for route_class in self.classes.values():
+            route_class.share(workers)
+
+    def classify(self, scope):
+        if scope["method"] != "POST":
+            return None
+        path = scope["path"]
+        if path == "/api/v1/ocr/scan":
+            return self.classes["ocr"]
+        if path.startswith("/api/v1/predict/"):
+            return self.classes["predict"]
+        if path in ("/api/v1/auth/login", "/api/v1/auth/signup"):
+            return self.classes["auth"]
+        return None
+
+    def client_key(self, scope, route_class):
+        # Same claims get_current_user sees (cached decode); auth routes have no token yet
+        if route_class.name != "auth":
+            from app.core.security import decode_token_claims
+            for name, value in scope["headers"]:
+                if name == b"authorization":
+                    scheme, _, token = value.decode("latin-1").partition(" ")
+                    claims = decode_token_claims(token) if scheme.lower() == "bearer" else None
+                    if claims is not None:
+                        return f"user:{claims['sub']}"
+                    break
+        if settings.ADMISSION_TRUST_FORWARDED_FOR:
+            forwarded = forwarded_client(scope["headers"], settings.ADMISSION_TRUSTED_PROXY_HOPS)
+            if forwarded:
+                return f"ip:{forwarded}"
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    def bucket_for(self, route_class, client_key):
+        key = (route_class.name, client_key)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(route_class.rate, route_class.burst)
+            self._buckets.set(key, bucket)
+        return bucket
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "tracked_clients": len(self._buckets),
+            "classes": {
+                name: {"in_flight": c.in_flight, "waiting": c.waiting, "concurrency": c.concurrency,
+                       "queue_size": c.queue_size, "rate_per_minute": round(c.rate * 60, 2), "burst": c.burst}
+                for name, c in self.classes.items()
+            },
+        }
+
+admission_controller = AdmissionController(
+    classes=[
+        RouteClass("ocr", settings.ADMISSION_OCR_RATE_PER_MINUTE, settings.ADMISSION_OCR_BURST,
+                   settings.ADMISSION_OCR_CONCURRENCY, settings.ADMISSION_OCR_QUEUE),
+        RouteClass("predict", settings.ADMISSION_PREDICT_RATE_PER_MINUTE, settings.ADMISSION_PREDICT_BURST,
+                   settings.ADMISSION_PREDICT_CONCURRENCY, settings.ADMISSION_PREDICT_QUEUE),
+        RouteClass("auth", settings.ADMISSION_AUTH_RATE_PER_MINUTE, settings.ADMISSION_AUTH_BURST,
+                   settings.ADMISSION_AUTH_CONCURRENCY, settings.ADMISSION_AUTH_QUEUE),
+    ],
+    max_wait_seconds=settings.ADMISSION_MAX_WAIT_SECONDS,
+    max_tracked_clients=settings.ADMISSION_MAX_TRACKED_CLIENTS,
+    enabled=settings.ADMISSION_ENABLED,
+)
+
+register_gauge_callback(
+    "admission_requests", "Requests holding (in_flight) or waiting for (waiting) an admission slot",
+    lambda: {(name, state): getattr(c, state) for name, c in admission_controller.classes.items()
+             for state in ("in_flight", "waiting")},
+    labels=("route_class", "state")
+)
+
+async def reject(send, status: int, detail: str, retry_after: float):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+# Plain ASGI like MetricsMiddleware: a shed request costs a dict lookup and a bucket refill
+class AdmissionMiddleware:
+    def __init__(self, app, controller: AdmissionController = None):
+        self.app = app
+        self.controller = controller or admission_controller
+
+    async def __call__(self, scope, receive, send):
+        controller = self.controller
+        if scope["type"] != "http" or not controller.enabled:
+            return await self.app(scope, receive, send)
+        route_class = controller.classify(scope)
+        if route_class is None:
+            return await self.app(scope, receive, send)
+
+        # 1. Per-client rate: one abusive client can't use up everyone's share
+        bucket = controller.bucket_for(route_class, controller.client_key(scope, route_class))
+        if not bucket.try_acquire():
+            admission_rejections_total.inc(route_class=route_class.name, reason="rate_limited")
+            return await reject(send, 429, "Too many requests. Slow down and try again shortly.",
+                                bucket.wait_time())
+
+        # 2. Per-class concurrency: past the limit, wait briefly in a bounded queue, then shed
+        refused = await route_class.enter(controller.max_wait_seconds)
+        if refused is not None:
+            admission_rejections_total.inc(route_class=route_class.name, reason=refused)
+            return await reject(send, 503, "Server is busy. Please try again in a moment.",
+                                controller.max_wait_seconds)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route_class.leave()
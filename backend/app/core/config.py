@@ -3,6 +3,30 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def available_cpus() -> int:
+    """
+    CPUs usable by this process: the affinity mask, capped by a cgroup CPU quota (v2 or v1)
+    when there is one. os.cpu_count() reports the whole host, even inside a small container.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    for quota_file, period_file in (("/sys/fs/cgroup/cpu.max", None),
+                                    ("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "/sys/fs/cgroup/cpu/cpu.cfs_period_us")):
+        try:
+            with open(quota_file) as f:
+                fields = f.read().split()
+            if period_file:
+                with open(period_file) as f:
+                    fields.append(f.read().strip())
+        except OSError:
+            continue
+        if fields[0] not in ("max", "-1") and int(fields[1]) > 0:
+            cpus = min(cpus, max(1, int(fields[0]) // int(fields[1])))
+        break
+    return max(1, cpus)
+
 class Settings:
     PROJECT_NAME: str = os.getenv("PROJECT_NAME", "Should I Bunk?")
     API_V1_STR: str = "/api/v1"
@@ -12,12 +36,154 @@ class Settings:
     
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Long-lived, revocable; exchanged at /auth/refresh for new access tokens (no bcrypt)
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+
+    # --- Password Hashing ---
+    # Stored hashes with a different cost are rehashed on the next successful login
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
     MONGO_DETAILS: str = os.getenv("MONGO_DETAILS")
     
+    # --- History Write-Behind Buffer ---
+    HISTORY_FLUSH_MAX_BATCH: int = int(os.getenv("HISTORY_FLUSH_MAX_BATCH", "200"))
+    HISTORY_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("HISTORY_FLUSH_INTERVAL_SECONDS", "0.25"))
+    HISTORY_BUFFER_MAX: int = int(os.getenv("HISTORY_BUFFER_MAX", "10000"))
+    HISTORY_FLUSH_MAX_RETRIES: int = int(os.getenv("HISTORY_FLUSH_MAX_RETRIES", "5"))
+    # How many recent readings the summary's rolling average covers
+    SUMMARY_ROLLING_WINDOW: int = int(os.getenv("SUMMARY_ROLLING_WINDOW", "10"))
+    
     # --- THE FIX ---
     # 1. Try "DATABASE_NAME" (Render standard)
     # 2. Try "MONGO_INITDB_DATABASE" (Your .env file)
     # 3. If both fail, use "should_i_bunk" (Hardcoded safety net)
     DATABASE_NAME: str = os.getenv("DATABASE_NAME", os.getenv("MONGO_INITDB_DATABASE", "should_i_bunk"))
 
+    # --- Multi-worker serving (gunicorn.conf.py) ---
+    # CPUs this process may actually run on (container/affinity limits), not the host's count
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", str(available_cpus())))
+    PORT: int = int(os.getenv("PORT", "8000"))
+    # Seconds a worker gets to finish in-flight requests and drain the history buffer on restart
+    GRACEFUL_TIMEOUT_SECONDS: int = int(os.getenv("GRACEFUL_TIMEOUT_SECONDS", "30"))
+    # Recycle workers after this many requests (0 = never)
+    WORKER_MAX_REQUESTS: int = int(os.getenv("WORKER_MAX_REQUESTS", "0"))
+    # Split each provider's rate limit across workers (quotas are per API key, not per process)
+    SPLIT_RATE_LIMITS_ACROSS_WORKERS: bool = os.getenv("SPLIT_RATE_LIMITS_ACROSS_WORKERS", "true").lower() == "true"
+
+    # Open the upstream connection pool in a background task right after startup (off = on first request)
+    WARM_UP_ON_STARTUP: bool = os.getenv("WARM_UP_ON_STARTUP", "true").lower() == "true"
+
+    # --- Upstream AI Providers (shared client: app/core/upstream.py) ---
+    GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
+    GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
+    # Point these at a local fake server for tests/benchmarks
+    GEMINI_BASE_URL: str = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com")
+    GROQ_BASE_URL: str = os.getenv("GROQ_BASE_URL", "https://api.groq.com")
+    GEMINI_TIMEOUT_SECONDS: float = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "10"))
+    GROQ_TIMEOUT_SECONDS: float = float(os.getenv("GROQ_TIMEOUT_SECONDS", "30"))
+    GEMINI_MAX_CONCURRENCY: int = int(os.getenv("GEMINI_MAX_CONCURRENCY", "16"))
+    # Token buckets (requests/second + burst) per provider
+    GEMINI_RATE_PER_SECOND: float = float(os.getenv("GEMINI_RATE_PER_SECOND", "10"))
+    GEMINI_RATE_BURST: int = int(os.getenv("GEMINI_RATE_BURST", "20"))
+    GROQ_RATE_PER_SECOND: float = float(os.getenv("GROQ_RATE_PER_SECOND", "0.5"))
+    GROQ_RATE_BURST: int = int(os.getenv("GROQ_RATE_BURST", "5"))
+    # How long a call may wait for a rate-limit token before we give up on the provider
+    UPSTREAM_MAX_RATE_WAIT_SECONDS: float = float(os.getenv("UPSTREAM_MAX_RATE_WAIT_SECONDS", "10"))
+    # Circuit breaker: open after N consecutive failures, probe again after the cooldown
+    UPSTREAM_BREAKER_FAILURES: int = int(os.getenv("UPSTREAM_BREAKER_FAILURES", "5"))
+    UPSTREAM_BREAKER_COOLDOWN_SECONDS: float = float(os.getenv("UPSTREAM_BREAKER_COOLDOWN_SECONDS", "30"))
+    UPSTREAM_MAX_CONNECTIONS: int = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "50"))
+
+    # --- Prediction Engine ---
+    # Max seconds we wait for Gemini before answering with the Vintage Math model.
+    GEMINI_MODEL_NAME: str = os.getenv("GEMINI_MODEL_NAME", "gemini-1.5-flash")
+    GEMINI_LATENCY_BUDGET_SECONDS: float = float(os.getenv("GEMINI_LATENCY_BUDGET_SECONDS", "2.5"))
+    PREDICT_BATCH_MAX_ROWS: int = int(os.getenv("PREDICT_BATCH_MAX_ROWS", "5000"))
+
+    # "gemini" (default, Vintage Math fallback), "xgboost" (local model) or "vintage" (rules only)
+    PREDICTION_ENGINE: str = os.getenv("PREDICTION_ENGINE", "gemini").lower()
+    MODEL_PATH: str = os.getenv("MODEL_PATH", "")
+    # Exported by train_model.py; used instead of the pickle when present
+    COMPILED_TREES_PATH: str = os.getenv("COMPILED_TREES_PATH", "")
+    MODEL_BATCH_MAX_SIZE: int = int(os.getenv("MODEL_BATCH_MAX_SIZE", "32"))
+    MODEL_BATCH_WAIT_MS: float = float(os.getenv("MODEL_BATCH_WAIT_MS", "2"))
+
+    # --- Prediction Cache (same features = same answer, no second Gemini call) ---
+    # 0 disables it. Attendance is floored to this step before keying (80.1% and 80.2% share an entry);
+    # entries never span the 75%/85% thresholds, whatever the step
+    PREDICTION_CACHE_SIZE: int = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+    PREDICTION_CACHE_TTL_SECONDS: int = int(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "3600"))
+    PREDICTION_CACHE_ATTENDANCE_STEP: float = float(os.getenv("PREDICTION_CACHE_ATTENDANCE_STEP", "0.5"))
+    # Also share entries between workers through MongoDB
+    PREDICTION_CACHE_SHARED: bool = os.getenv("PREDICTION_CACHE_SHARED", "false").lower() == "true"
+
+    # --- Morning Verdict Precompute (app/ml/precompute.py, served by /predict/today) ---
+    PRECOMPUTE_ENABLED: bool = os.getenv("PRECOMPUTE_ENABLED", "true").lower() == "true"
+    # Server-local hour the nightly run starts. It computes the coming morning: the same day for an
+    # hour before noon (02:00 -> today's verdicts), the next day for an evening hour (22:00 -> tomorrow's)
+    PRECOMPUTE_RUN_AT_HOUR: int = int(os.getenv("PRECOMPUTE_RUN_AT_HOUR", "2"))
+    PRECOMPUTE_BATCH_SIZE: int = int(os.getenv("PRECOMPUTE_BATCH_SIZE", "500"))
+    # Minimum pause between batches, so the job never hogs MongoDB or the event loop
+    PRECOMPUTE_BATCH_PAUSE_SECONDS: float = float(os.getenv("PRECOMPUTE_BATCH_PAUSE_SECONDS", "0.2"))
+    PRECOMPUTE_LEASE_SECONDS: int = int(os.getenv("PRECOMPUTE_LEASE_SECONDS", "600"))
+
+    # --- Semester Bunk Planner (/predict/plan) ---
+    ATTENDANCE_TARGET: float = float(os.getenv("ATTENDANCE_TARGET", "0.75"))
+    PLAN_MAX_WEEKS: int = int(os.getenv("PLAN_MAX_WEEKS", "26"))
+    # Plans are keyed on the timetable contents, so editing the timetable invalidates them
+    PLAN_CACHE_SIZE: int = int(os.getenv("PLAN_CACHE_SIZE", "1024"))
+    PLAN_CACHE_TTL_SECONDS: int = int(os.getenv("PLAN_CACHE_TTL_SECONDS", "3600"))
+
+    # --- Admission Control (app/core/admission.py) ---
+    # Per-client token buckets (JWT sub, else client IP) + per-class concurrency and wait queue.
+    # Rates and bursts are per client. Concurrency and queue sizes are for the whole server: under
+    # gunicorn each worker gets 1/WEB_CONCURRENCY of them (ADMISSION_SPLIT_ACROSS_WORKERS=false makes
+    # them per worker instead)
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_OCR_RATE_PER_MINUTE: float = float(os.getenv("ADMISSION_OCR_RATE_PER_MINUTE", "6"))
+    ADMISSION_OCR_BURST: int = int(os.getenv("ADMISSION_OCR_BURST", "3"))
+    ADMISSION_OCR_CONCURRENCY: int = int(os.getenv("ADMISSION_OCR_CONCURRENCY", "8"))
+    ADMISSION_OCR_QUEUE: int = int(os.getenv("ADMISSION_OCR_QUEUE", "16"))
+    ADMISSION_PREDICT_RATE_PER_MINUTE: float = float(os.getenv("ADMISSION_PREDICT_RATE_PER_MINUTE", "60"))
+    ADMISSION_PREDICT_BURST: int = int(os.getenv("ADMISSION_PREDICT_BURST", "20"))
+    ADMISSION_PREDICT_CONCURRENCY: int = int(os.getenv("ADMISSION_PREDICT_CONCURRENCY", "64"))
+    ADMISSION_PREDICT_QUEUE: int = int(os.getenv("ADMISSION_PREDICT_QUEUE", "128"))
+    # Login/signup are keyed by client IP (no token yet) and bound by the bcrypt pool
+    ADMISSION_AUTH_RATE_PER_MINUTE: float = float(os.getenv("ADMISSION_AUTH_RATE_PER_MINUTE", "10"))
+    ADMISSION_AUTH_BURST: int = int(os.getenv("ADMISSION_AUTH_BURST", "5"))
+    ADMISSION_AUTH_CONCURRENCY: int = int(os.getenv("ADMISSION_AUTH_CONCURRENCY", "8"))
+    ADMISSION_AUTH_QUEUE: int = int(os.getenv("ADMISSION_AUTH_QUEUE", "16"))
+    # How long a request may wait in the queue before it is shed with 503
+    ADMISSION_MAX_WAIT_SECONDS: float = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "2"))
+    ADMISSION_MAX_TRACKED_CLIENTS: int = int(os.getenv("ADMISSION_MAX_TRACKED_CLIENTS", "50000"))
+    ADMISSION_SPLIT_ACROSS_WORKERS: bool = os.getenv("ADMISSION_SPLIT_ACROSS_WORKERS", "true").lower() == "true"
+    # Key anonymous clients on X-Forwarded-For instead of the peer address. Only turn this on behind
+    # proxies that append to it (Render does); the address is read TRUSTED_PROXY_HOPS from the right,
+    # since everything further left is client-controlled
+    ADMISSION_TRUST_FORWARDED_FOR: bool = os.getenv("ADMISSION_TRUST_FORWARDED_FOR", "false").lower() == "true"
+    ADMISSION_TRUSTED_PROXY_HOPS: int = int(os.getenv("ADMISSION_TRUSTED_PROXY_HOPS", "1"))
+
+    # --- OCR Extraction ---
+    # Read the whole table (every subject row + TOTAL) in one call instead of only the TOTAL number
+    OCR_TABLE_MODE: bool = os.getenv("OCR_TABLE_MODE", "true").lower() == "true"
+    OCR_TABLE_MAX_TOKENS: int = int(os.getenv("OCR_TABLE_MAX_TOKENS", "768"))
+
+    # --- OCR Image Preprocessing ---
+    OCR_MAX_IMAGE_SIDE: int = int(os.getenv("OCR_MAX_IMAGE_SIDE", "1600"))
+    OCR_JPEG_QUALITY: int = int(os.getenv("OCR_JPEG_QUALITY", "85"))
+    # Crop to the bottom-right corner where the TOTAL cell lives (ignored in table mode: it needs every row)
+    OCR_CROP_TOTAL_ROI: bool = os.getenv("OCR_CROP_TOTAL_ROI", "false").lower() == "true"
+    OCR_ROI_WIDTH_FRACTION: float = float(os.getenv("OCR_ROI_WIDTH_FRACTION", "0.5"))
+    OCR_ROI_HEIGHT_FRACTION: float = float(os.getenv("OCR_ROI_HEIGHT_FRACTION", "0.35"))
+
+    # --- OCR Result Cache (same screenshot = same answer) ---
+    OCR_CACHE_SIZE: int = int(os.getenv("OCR_CACHE_SIZE", "512"))
+    OCR_CACHE_TTL_SECONDS: int = int(os.getenv("OCR_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+    # --- OCR Concurrency (Groq vision is rate limited) ---
+    OCR_MAX_CONCURRENCY: int = int(os.getenv("OCR_MAX_CONCURRENCY", "4"))
+    OCR_JOB_QUEUE_MAX: int = int(os.getenv("OCR_JOB_QUEUE_MAX", "200"))
+    OCR_JOB_TTL_SECONDS: int = int(os.getenv("OCR_JOB_TTL_SECONDS", "900"))
+
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,24 @@
+import hashlib
+from typing import Optional
+from fastapi import Response
+
+# ETags for cheap polling: the app re-reads timetable/history on every screen load,
+# and most of the time nothing has changed since the last read.
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match can be "*" or a comma-separated list; weak (W/) tags compare equal to strong ones.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
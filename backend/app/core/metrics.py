@@ -0,0 +1,283 @@
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pymongo import monitoring
+
+# Small, dependency-free Prometheus text exporter.
+# observe() is a bisect + two additions under an uncontended lock (a few hundred ns),
+# cheap enough to leave on for every request and every Mongo command.
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{str(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name, self.help, self.label_names = name, help_text, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value}")
+        return lines
+
+class Gauge:
+    """
+    Either set() directly, or pass a callback returning {label_tuple: value} read at scrape time.
+    """
+
+    def __init__(self, name, help_text, labels=(), callback=None):
+        self.name, self.help, self.label_names = name, help_text, tuple(labels)
+        self.callback = callback
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, **labels):
+        self._values[tuple(labels.get(n, "") for n in self.label_names)] = value
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount=1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self):
+        values = self._values
+        if self.callback is not None:
+            try:
+                values = self.callback()
+            except Exception:
+                values = {}
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.label_names = name, help_text, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # per-bucket counts (+Inf last), sum
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                le_label = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# --- The metrics ---
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Latency per route template", labels=("method", "route", "status")))
+upstream_duration = registry.register(Histogram(
+    "upstream_call_duration_seconds", "Calls to external AI providers", labels=("provider", "outcome")))
+password_hash_duration = registry.register(Histogram(
+    "password_hash_duration_seconds", "bcrypt hash/verify time on the hashing pool", labels=("op",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.4, 0.8, 1.6)))
+mongo_command_duration = registry.register(Histogram(
+    "mongo_command_duration_seconds", "MongoDB commands as seen by the driver", labels=("command", "outcome")))
+prediction_fallback_total = registry.register(Counter(
+    "prediction_fallback_total", "Predictions answered by calculate_vintage_risk instead of the model",
+    labels=("reason",)))
+event_loop_lag = registry.register(Histogram(
+    "event_loop_lag_seconds", "How late the event loop wakes a sleeping task",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)))
+prediction_cache_lookups_total = registry.register(Counter(
+    "prediction_cache_lookups_total", "Prediction cache lookups by outcome (hit_local, hit_shared, miss)",
+    labels=("outcome",)))
+prediction_cache_saved_seconds_total = registry.register(Counter(
+    "prediction_cache_saved_seconds_total", "Model/upstream time the cached answers took originally"))
+mongo_pool_connections = registry.register(Gauge(
+    "mongo_pool_connections", "Motor/PyMongo pool connections by state", labels=("state",)))
+mongo_pool_events_total = registry.register(Counter(
+    "mongo_pool_events_total", "Connection pool events", labels=("event",)))
+
+@contextmanager
+def track_upstream(provider: str):
+    """
+    Times one upstream AI call. Cancellation (e.g. a latency budget running out) is recorded as "timeout".
+    """
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except (asyncio.CancelledError, asyncio.TimeoutError):
+        outcome = "timeout"
+        raise
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        upstream_duration.observe(time.perf_counter() - start, provider=provider, outcome=outcome)
+
+def register_gauge_callback(name, help_text, callback, labels=()):
+    return registry.register(Gauge(name, help_text, labels=labels, callback=callback))
+
+# --- MongoDB driver listeners (passed to AsyncIOMotorClient(event_listeners=...)) ---
+class MongoCommandMetrics(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1e6, command=event.command_name, outcome="ok")
+
+    def failed(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1e6, command=event.command_name, outcome="error")
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        mongo_pool_events_total.inc(event="pool_cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        mongo_pool_connections.inc(state="open")
+        mongo_pool_events_total.inc(event="created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        mongo_pool_connections.dec(state="open")
+        mongo_pool_events_total.inc(event="closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        mongo_pool_events_total.inc(event="checkout_failed")
+
+    def connection_checked_out(self, event):
+        mongo_pool_connections.inc(state="checked_out")
+
+    def connection_checked_in(self, event):
+        mongo_pool_connections.dec(state="checked_out")
+
+def mongo_event_listeners():
+    return [MongoCommandMetrics(), MongoPoolMetrics()]
+
+# --- Event loop lag ---
+async def monitor_event_loop_lag(interval: float = 0.5):
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        event_loop_lag.observe(max(0.0, loop.time() - start - interval))
+
+# --- Per-route latency (plain ASGI middleware: no BaseHTTPMiddleware overhead, streaming-safe) ---
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                method=scope["method"], route=route_template(scope), status=status["code"]
+            )
+
+def _candidate_routes(routes):
+    # Newer FastAPI keeps each included router as one entry; its routes (with the prefix) are behind it
+    for route in routes:
+        if hasattr(route, "effective_route_contexts"):
+            yield from route.effective_route_contexts()
+        else:
+            yield route
+
+def route_template(scope):
+    # "/api/v1/ocr/jobs/{job_id}" instead of the raw path keeps label cardinality bounded.
+    # Newer FastAPI sets scope["route"] to the route as declared in its router ("/" for POST /predict/);
+    # the full template, prefix included, is on the effective route context.
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if getattr(context, "path", None):
+        return context.path
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    # Not routed (404, or answered by a middleware such as admission control): match it ourselves
+    from starlette.routing import Match
+    for candidate in _candidate_routes(scope["app"].routes if "app" in scope else []):
+        path = getattr(candidate, "path", None)
+        if path is None:
+            continue
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            return path
+    return "unmatched"
@@ -0,0 +1,72 @@
+import argparse
+import os
+
+# Per-process memory from /proc (Linux). With gunicorn's preload the interesting number is PSS:
+# pages still shared copy-on-write with the master count 1/N towards each worker, so
+# master PSS + sum(worker PSS) is what the whole deployment really uses.
+
+SMAPS_FIELDS = {
+    "Rss": "rss", "Pss": "pss",
+    "Shared_Clean": "shared", "Shared_Dirty": "shared",
+    "Private_Clean": "private", "Private_Dirty": "private",
+}
+
+def memory_stats(pid="self") -> dict:
+    """
+    Bytes of rss / pss / shared / private for one process. Falls back to RSS only
+    when smaps_rollup isn't available (non-Linux, old kernels).
+    """
+    stats = {"rss": 0, "pss": 0, "shared": 0, "private": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                field = SMAPS_FIELDS.get(parts[0].rstrip(":")) if parts else None
+                if field:
+                    stats[field] += int(parts[1]) * 1024
+        return stats
+    except (FileNotFoundError, PermissionError, IndexError, ValueError):
+        pass
+
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    stats["rss"] = int(line.split()[1]) * 1024
+    except (FileNotFoundError, PermissionError):
+        import resource
+        # ru_maxrss is KiB on Linux (peak, not current) - better than nothing
+        stats["rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return stats
+
+def child_pids(pid: int):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except FileNotFoundError:
+        return []
+
+def worker_report(master_pid: int):
+    """
+    [(role, pid, stats)] for a gunicorn master and its workers.
+    """
+    rows = [("master", master_pid, memory_stats(master_pid))]
+    rows += [("worker", pid, memory_stats(pid)) for pid in child_pids(master_pid)]
+    return rows
+
+def print_report(master_pid: int):
+    rows = worker_report(master_pid)
+    mib = 1024 * 1024
+    print(f"{'role':<8} {'pid':>8} {'rss MiB':>9} {'pss MiB':>9} {'shared':>9} {'private':>9}")
+    for role, pid, s in rows:
+        print(f"{role:<8} {pid:>8} {s['rss'] / mib:>9.1f} {s['pss'] / mib:>9.1f} "
+              f"{s['shared'] / mib:>9.1f} {s['private'] / mib:>9.1f}")
+    total_rss = sum(s["rss"] for _, _, s in rows)
+    total_pss = sum(s["pss"] for _, _, s in rows)
+    print(f"{'total':<8} {'':>8} {total_rss / mib:>9.1f} {total_pss / mib:>9.1f}   "
+          f"(rss double-counts shared pages, pss doesn't)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory of a gunicorn master and its workers")
+    parser.add_argument("master_pid", type=int, nargs="?", default=os.getpid())
+    print_report(parser.parse_args().master_pid)
@@ -1,22 +1,57 @@
+import asyncio
+import hashlib
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, status, HTTPException
 from app.core.config import settings
+from app.core.cache import LRUCache
+from app.core.metrics import password_hash_duration
 
 # 1. Password Hashing Setup
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max pinned to the configured cost so needs_update() flags hashes made with any other cost
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt burns tens of ms of CPU per call (and releases the GIL), so it runs on a small
+# dedicated pool instead of the event loop. The pool size caps how many cores a login burst can take.
+hashing_pool = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
 
 # Initialize OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    with password_hash_duration.time(op="verify"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    with password_hash_duration.time(op="hash"):
+        return pwd_context.hash(password)
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hashing_pool, get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies on the hashing pool. Returns (is_valid, new_hash): new_hash is set when the stored
+    hash used an outdated bcrypt cost and should be replaced.
+    """
+    loop = asyncio.get_running_loop()
+    is_valid = await loop.run_in_executor(hashing_pool, verify_password, plain_password, hashed_password)
+    if is_valid and pwd_context.needs_update(hashed_password):
+        return True, await get_password_hash_async(plain_password)
+    return is_valid, None
 
 # 2. Token Generation
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -30,25 +65,52 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+# Refresh tokens are long random strings; only their SHA-256 goes to MongoDB.
+# (A fast hash is enough here: unlike passwords, there is nothing to brute-force.)
+def create_refresh_token() -> str:
+    return secrets.token_urlsafe(48)
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
 # 3. Token Verification (The Guard)
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+# Decoded claims per bearer token, kept until the token itself expires
+_claims_cache = LRUCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+def decode_token_claims(token: str) -> Optional[dict]:
+    """
+    Returns {"sub", "role"} for a valid access token, None otherwise.
+    Repeated requests with the same token skip the JWT decode.
+    """
+    claims = _claims_cache.get(token)
+    if claims is not None:
+        return claims
+
     try:
         # Decode the token
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        
-        email: str = payload.get("sub")
-        role: str = payload.get("role")
-        
-        if email is None:
-            raise credentials_exception
-            
-        # FIX: Return "sub" instead of "email" so other files can find it easily
-        return {"sub": email, "role": role}
-        
     except JWTError:
-        raise credentials_exception
\ No newline at end of file
+        return None
+
+    email: str = payload.get("sub")
+    role: str = payload.get("role")
+    if email is None:
+        return None
+
+    # FIX: Return "sub" instead of "email" so other files can find it easily
+    claims = {"sub": email, "role": role}
+    ttl = payload.get("exp", 0) - time.time()
+    if ttl > 0:
+        _claims_cache.set(token, claims, ttl_seconds=ttl)
+    return claims
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    claims = decode_token_claims(token)
+    if claims is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # Copy so route handlers can't modify the cached claims
+    return dict(claims)
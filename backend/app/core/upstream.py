@@ -0,0 +1,169 @@
+import asyncio
+import os
+import httpx
+from app.core.config import settings
+from app.core.metrics import track_upstream, register_gauge_callback, Counter, registry
+from app.core.ratelimit import TokenBucket, CircuitBreaker
+
+class UpstreamError(Exception):
+    pass
+
+class UpstreamUnavailable(UpstreamError):
+    """
+    Raised without touching the network: breaker open or local rate limit exhausted.
+    """
+
+upstream_rejections_total = registry.register(Counter(
+    "upstream_rejections_total", "Upstream calls refused locally", labels=("provider", "reason")))
+
+class UpstreamProvider:
+    """
+    Everything we remember about one AI provider: where it lives, how hard we may hit it,
+    and whether it is currently failing.
+    """
+
+    def __init__(self, name: str, base_url: str, rate_per_second: float, burst: int,
+                 max_concurrency: int, timeout_seconds: float, failure_threshold: int,
+                 cooldown_seconds: float, max_rate_wait_seconds: float):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout_seconds = timeout_seconds
+        self.max_concurrency = max_concurrency
+        self.max_rate_wait_seconds = max_rate_wait_seconds
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.breaker = CircuitBreaker(failure_threshold, cooldown_seconds)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+
+    async def acquire_rate_token(self):
+        # Wait briefly for a token; past max_rate_wait_seconds we'd rather fall back right away
+        wait = self.bucket.wait_time()
+        if wait > self.max_rate_wait_seconds:
+            upstream_rejections_total.inc(provider=self.name, reason="rate_limited")
+            raise UpstreamUnavailable(f"{self.name}: local rate limit reached")
+        while not self.bucket.try_acquire():
+            await asyncio.sleep(self.bucket.wait_time())
+
+class UpstreamClient:
+    """
+    One pooled httpx.AsyncClient shared by every provider (Gemini for predictions, Groq for OCR).
+    Created lazily, so each process (e.g. every forked worker) gets its own connections.
+    """
+
+    def __init__(self, providers: dict):
+        self.providers = providers
+        self._http = None
+
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+                ),
+                timeout=httpx.Timeout(30.0, connect=5.0),
+            )
+        return self._http
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def reset_after_fork(self):
+        # The parent's sockets must not be shared; the child opens its own on first use
+        self._http = None
+        for provider in self.providers.values():
+            provider.in_flight = 0
+
+    def share_rate_limits(self, workers: int):
+        """
+        Provider quotas are per API key, not per process: with N workers each one gets 1/N of the rate.
+        """
+        for provider in self.providers.values():
+            bucket = provider.bucket
+            bucket.rate = bucket.rate / workers
+            bucket.burst = max(1.0, bucket.burst / workers)
+            bucket.tokens = min(bucket.tokens, bucket.burst)
+
+    async def post_json(self, provider_name: str, path: str, payload: dict, headers: dict = None, params: dict = None):
+        provider = self.providers[provider_name]
+
+        # 1. Failing provider? Skip it without paying its failure latency
+        if not provider.breaker.allow():
+            upstream_rejections_total.inc(provider=provider.name, reason="circuit_open")
+            raise UpstreamUnavailable(
+                f"{provider.name}: circuit open, retry in {provider.breaker.retry_after():.0f}s"
+            )
+
+        sent = False
+        try:
+            # 2. Per-provider rate limit + concurrency cap
+            await provider.acquire_rate_token()
+            async with provider.semaphore:
+                provider.in_flight += 1
+                sent = True
+                try:
+                    with track_upstream(provider.name):
+                        response = await self.http().post(
+                            provider.base_url + path, json=payload, headers=headers, params=params,
+                            timeout=provider.timeout_seconds,
+                        )
+                finally:
+                    provider.in_flight -= 1
+        except (httpx.HTTPError, asyncio.CancelledError, UpstreamUnavailable) as e:
+            if sent:
+                # Timeouts/cancellations count: a provider slower than our budget is as good as down
+                provider.breaker.record_failure()
+            else:
+                # Nothing reached the provider, so no verdict on its health
+                provider.breaker.release_probe()
+            if isinstance(e, httpx.HTTPError):
+                raise UpstreamError(f"{provider.name}: {type(e).__name__}: {e}")
+            raise
+
+        # 3. 429 / 5xx mean the provider is struggling; other 4xx are our fault
+        if response.status_code == 429 or response.status_code >= 500:
+            provider.breaker.record_failure()
+            raise UpstreamError(f"{provider.name}: HTTP {response.status_code}")
+        provider.breaker.record_success()
+        if response.status_code >= 400:
+            raise UpstreamError(f"{provider.name}: HTTP {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    def breaker_states(self):
+        order = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+        return {(name,): order[p.breaker.state] for name, p in self.providers.items()}
+
+def _provider(name: str, base_url: str, max_concurrency: int, timeout_seconds: float):
+    prefix = name.upper()
+    return UpstreamProvider(
+        name=name,
+        base_url=base_url,
+        rate_per_second=getattr(settings, f"{prefix}_RATE_PER_SECOND"),
+        burst=getattr(settings, f"{prefix}_RATE_BURST"),
+        max_concurrency=max_concurrency,
+        timeout_seconds=timeout_seconds,
+        failure_threshold=settings.UPSTREAM_BREAKER_FAILURES,
+        cooldown_seconds=settings.UPSTREAM_BREAKER_COOLDOWN_SECONDS,
+        max_rate_wait_seconds=settings.UPSTREAM_MAX_RATE_WAIT_SECONDS,
+    )
+
+upstream = UpstreamClient({
+    "gemini": _provider("gemini", settings.GEMINI_BASE_URL, settings.GEMINI_MAX_CONCURRENCY,
+                        settings.GEMINI_TIMEOUT_SECONDS),
+    "groq": _provider("groq", settings.GROQ_BASE_URL, settings.OCR_MAX_CONCURRENCY,
+                      settings.GROQ_TIMEOUT_SECONDS),
+})
+
+# Forked workers (gunicorn preload) must never reuse the master's connection pool
+os.register_at_fork(after_in_child=upstream.reset_after_fork)
+
+register_gauge_callback(
+    "upstream_circuit_state", "Circuit breaker per provider (0=closed, 1=half_open, 2=open)",
+    upstream.breaker_states, labels=("provider",)
+)
+register_gauge_callback(
+    "upstream_in_flight", "Calls currently in flight per provider",
+    lambda: {(name,): p.in_flight for name, p in upstream.providers.items()}, labels=("provider",)
+)
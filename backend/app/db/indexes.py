@@ -0,0 +1,195 @@
+import argparse
+import asyncio
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from app.core.config import settings
+
+# Every index the API relies on. Names are part of the contract: ensure_indexes
+# matches existing indexes by name; drifted keys/options are fixed by `python -m app.db.indexes`.
+REQUIRED_INDEXES = [
+    # auth_routes (signup/login) and timetable_routes look users up by username (their email)
+    {"collection": "users", "name": "username_unique",
+     "keys": [("username", ASCENDING)], "unique": True},
+    # history_routes: filter by username, newest first, keyset-paged on (timestamp, _id)
+    {"collection": "history", "name": "username_timestamp",
+     "keys": [("username", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)]},
+    # /auth/refresh and /auth/logout
+    {"collection": "refresh_tokens", "name": "token_hash_unique",
+     "keys": [("token_hash", ASCENDING)], "unique": True},
+    {"collection": "refresh_tokens", "name": "expires_at_ttl",
+     "keys": [("expires_at", ASCENDING)], "expireAfterSeconds": 0},
+    # OCR result cache entries expire on their own
+    {"collection": "ocr_cache", "name": "created_at_ttl",
+     "keys": [("created_at", ASCENDING)], "expireAfterSeconds": settings.OCR_CACHE_TTL_SECONDS},
+    # /predict/today: one verdict document per user and day; old days expire on their own
+    {"collection": "precomputed_verdicts", "name": "username_date_unique",
+     "keys": [("username", ASCENDING), ("date", ASCENDING)], "unique": True},
+    {"collection": "precomputed_verdicts", "name": "expires_at_ttl",
+     "keys": [("expires_at", ASCENDING)], "expireAfterSeconds": 0},
+    # Async OCR jobs (app/ocr/ocr_jobs.py) are polled from any worker; finished ones expire on their own
+    {"collection": "ocr_jobs", "name": "expires_at_ttl",
+     "keys": [("expires_at", ASCENDING)], "expireAfterSeconds": 0},
+    # Shared prediction cache tier (PREDICTION_CACHE_SHARED)
+    {"collection": "prediction_cache", "name": "created_at_ttl",
+     "keys": [("created_at", ASCENDING)], "expireAfterSeconds": settings.PREDICTION_CACHE_TTL_SECONDS},
+]
+
+OPTION_FIELDS = ("unique", "expireAfterSeconds")
+
+def _options(spec: dict):
+    return {field: spec[field] for field in OPTION_FIELDS if field in spec and spec[field] is not False}
+
+def _same_keys(existing: dict, spec: dict):
+    return [(k, int(v)) for k, v in existing["key"]] == [(k, int(v)) for k, v in spec["keys"]]
+
+async def _replace(collection, old_name: str, old: dict, spec: dict, wanted: dict):
+    """
+    Swaps an index for the spec without ever leaving the collection without one: with different
+    keys the new index is built under a temporary name before the old one goes; with the same keys
+    (MongoDB won't hold both) a failed build puts the old definition back before re-raising.
+    """
+    name = spec["name"]
+    if not _same_keys(old, spec):
+        temporary = f"{name}_rebuild"
+        await collection.create_index(spec["keys"], name=temporary, **wanted)
+        await collection.drop_index(old_name)
+        await collection.create_index(spec["keys"], name=name, **wanted)
+        await collection.drop_index(temporary)
+        return
+    await collection.drop_index(old_name)
+    try:
+        await collection.create_index(spec["keys"], name=name, **wanted)
+    except OperationFailure:
+        await collection.create_index(old["key"], name=old_name, **_options(old))
+        raise
+
+async def _reconcile_one(collection, spec: dict, existing_indexes: dict, rebuild: bool):
+    name = spec["name"]
+    wanted = _options(spec)
+
+    # Same keys under another name count as ours when the options match, otherwise they'd block creation
+    for other_name, other in existing_indexes.items():
+        if other_name != name and _same_keys(other, spec):
+            if _options(other) == wanted:
+                return "ok"
+            if not rebuild:
+                print(f"⚠️ {collection.name}.{other_name} conflicts with {name}: run `python -m app.db.indexes`")
+                return "drifted"
+            print(f"🔧 Replacing {collection.name}.{other_name} (conflicts with {name})")
+            await _replace(collection, other_name, other, spec, wanted)
+            return "created"
+
+    existing = existing_indexes.get(name)
+    if existing and _same_keys(existing, spec):
+        current = _options(existing)
+        if current == wanted:
+            return "ok"
+        # Only the TTL changed: collMod updates it in place, no rebuild needed
+        if {k: v for k, v in current.items() if k != "expireAfterSeconds"} == \
+                {k: v for k, v in wanted.items() if k != "expireAfterSeconds"} and "expireAfterSeconds" in wanted:
+            await collection.database.command(
+                "collMod", collection.name,
+                index={"name": name, "expireAfterSeconds": wanted["expireAfterSeconds"]}
+            )
+            return "updated"
+
+    if existing:
+        if not rebuild:
+            print(f"⚠️ {collection.name}.{name} definition changed: run `python -m app.db.indexes`")
+            return "drifted"
+        print(f"🔧 Rebuilding {collection.name}.{name} (definition changed)")
+        await _replace(collection, name, existing, spec, wanted)
+        return "created"
+
+    await collection.create_index(spec["keys"], name=name, **wanted)
+    return "created"
+
+async def ensure_indexes(database, specs=REQUIRED_INDEXES, rebuild: bool = False):
+    """
+    Creates missing indexes and updates TTLs in place; both are safe for every worker to run at once.
+    An index whose definition drifted is only reported unless `rebuild` is set: rebuilding drops
+    the old index, so it runs from one process (`python -m app.db.indexes`), not from every
+    worker's startup. A failing index (e.g. duplicate usernames blocking the unique index) is
+    logged, not fatal.
+    """
+    summary = {"ok": 0, "created": 0, "updated": 0, "drifted": 0, "failed": 0}
+    existing_by_collection = {}
+    for spec in specs:
+        collection = database[spec["collection"]]
+        try:
+            if spec["collection"] not in existing_by_collection:
+                existing_by_collection[spec["collection"]] = await collection.index_information()
+            outcome = await _reconcile_one(collection, spec, existing_by_collection[spec["collection"]], rebuild)
+        except OperationFailure as e:
+            print(f"❌ Index {spec['collection']}.{spec['name']} failed: {e}")
+            outcome = "failed"
+        summary[outcome] += 1
+    print(f"🗂️ Indexes: {summary['ok']} ok, {summary['created']} created, {summary['updated']} updated, "
+          f"{summary['drifted']} drifted, {summary['failed']} failed")
+    return summary
+
+# --- Query-plan checks ---
+# The queries the routes actually run (with sample values). Each must be served by an index.
+ROUTE_QUERIES = [
+    {"route": "POST /auth/login", "collection": "users", "filter": {"username": "probe@example.com"}},
+    {"route": "GET /timetable/", "collection": "users", "filter": {"username": "probe@example.com"}},
+    {"route": "GET /history/my-logs", "collection": "history", "filter": {"username": "probe@example.com"},
+     "sort": [("timestamp", DESCENDING), ("_id", DESCENDING)], "limit": 11},
+    {"route": "POST /auth/refresh", "collection": "refresh_tokens", "filter": {"token_hash": "0" * 64}},
+    {"route": "POST /ocr/scan", "collection": "ocr_cache", "filter": {"_id": "0" * 64}},
+]
+
+def _plan_stages(plan: dict):
+    stages = [plan.get("stage")]
+    for child_key in ("inputStage", "queryPlan"):
+        if child_key in plan:
+            stages += _plan_stages(plan[child_key])
+    for child in plan.get("inputStages", []):
+        stages += _plan_stages(child)
+    return [stage for stage in stages if stage]
+
+async def explain_route_queries(database, queries=ROUTE_QUERIES):
+    """
+    Runs explain() on each route query and returns {route: [stages of the winning plan]}.
+    """
+    plans = {}
+    for query in queries:
+        cursor = database[query["collection"]].find(query["filter"])
+        if "sort" in query:
+            cursor = cursor.sort(query["sort"])
+        if "limit" in query:
+            cursor = cursor.limit(query["limit"])
+        explain = await cursor.explain()
+        plans[query["route"]] = _plan_stages(explain["queryPlanner"]["winningPlan"])
+    return plans
+
+async def assert_no_collscan(database, queries=ROUTE_QUERIES):
+    """
+    Test helper: raises AssertionError naming every route whose query plan is a COLLSCAN.
+    """
+    plans = await explain_route_queries(database, queries)
+    offenders = {route: stages for route, stages in plans.items() if "COLLSCAN" in stages}
+    if offenders:
+        raise AssertionError(f"Collection scans found: {offenders}")
+    return plans
+
+async def _main():
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description="Reconcile MongoDB indexes (rebuilding drifted ones) "
+                                                 "and check route query plans")
+    parser.add_argument("--check", action="store_true", help="Fail if any route query is a COLLSCAN")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGO_DETAILS)
+    database = client[settings.DATABASE_NAME]
+    try:
+        await ensure_indexes(database, rebuild=True)
+        if args.check:
+            for route, stages in (await assert_no_collscan(database)).items():
+                print(f"✅ {route}: {' <- '.join(stages)}")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(_main())
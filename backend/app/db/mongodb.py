@@ -1,5 +1,10 @@
+import os
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
+from app.core.metrics import mongo_event_listeners
+from app.db.indexes import ensure_indexes
+from app.db.write_buffer import WriteBehindBuffer
+from app.db.summaries import update_summaries
 
 # 1. Define the Database class
 class Database:
@@ -8,14 +13,42 @@ class Database:
 # 2. Instantiate the class
 db = Database()
 
+# MongoClient is not fork-safe: every worker connects on its own startup (connect_to_mongo)
+def _forget_client_after_fork():
+    db.client = None
+
+os.register_at_fork(after_in_child=_forget_client_after_fork)
+
+# Prediction history is written behind the response (see predict_routes);
+# each written batch also bumps the per-user summaries
+history_buffer = WriteBehindBuffer(
+    "history",
+    max_batch=settings.HISTORY_FLUSH_MAX_BATCH,
+    flush_interval=settings.HISTORY_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.HISTORY_BUFFER_MAX,
+    max_retries=settings.HISTORY_FLUSH_MAX_RETRIES,
+    on_written=update_summaries,
+)
+
 async def get_database():
     return db.client[settings.DATABASE_NAME]
 
-async def connect_to_mongo():
+async def connect_to_mongo(client=None):
+    """
+    `client` lets benchmarks hand in a stand-in (e.g. mongomock_motor) instead of a real server.
+    """
     print("⏳ Connecting to MongoDB...")
-    db.client = AsyncIOMotorClient(settings.MONGO_DETAILS)
+    # Listeners feed per-command latency and pool stats into /metrics
+    db.client = client or AsyncIOMotorClient(settings.MONGO_DETAILS, event_listeners=mongo_event_listeners())
     print("✅ Connected to MongoDB")
+    try:
+        await ensure_indexes(db.client[settings.DATABASE_NAME])
+    except Exception as e:
+        print(f"⚠️ Could not reconcile indexes: {e}")
+    history_buffer.start(db.client[settings.DATABASE_NAME])
 
 async def close_mongo_connection():
+    # Drain queued history before the client goes away
+    await history_buffer.stop()
     db.client.close()
     print("🛑 Closed MongoDB connection")
\ No newline at end of file
@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+from pymongo import UpdateOne
+from app.core.config import settings
+
+COLLECTION = "user_summaries"
+
+def is_safe_prediction(prediction: str) -> bool:
+    # "Safe to Bunk 😎" / "Safe" vs "Not Safe ❌" / "Not Safe"
+    return (prediction or "").strip().lower().startswith("safe")
+
+def build_summary_updates(history_logs: list):
+    """
+    One atomic $inc/$set/$push per user for a batch of freshly written history logs.
+    The summary _id is the username, so /history/summary is a single _id lookup.
+    """
+    per_user = {}
+    for log in sorted(history_logs, key=lambda log: log["timestamp"]):
+        summary = per_user.setdefault(log["username"], {
+            "count": 0, "safe": 0, "attendance_sum": 0.0, "recent": [], "latest": None,
+        })
+        safe = is_safe_prediction(log.get("prediction"))
+        summary["count"] += 1
+        summary["safe"] += 1 if safe else 0
+        summary["attendance_sum"] += log["overall_attendance"]
+        summary["recent"].append(log["overall_attendance"])
+        summary["latest"] = log
+
+    window = settings.SUMMARY_ROLLING_WINDOW
+    return [
+        UpdateOne(
+            {"_id": username},
+            {
+                "$inc": {
+                    "prediction_count": s["count"],
+                    "safe_count": s["safe"],
+                    "unsafe_count": s["count"] - s["safe"],
+                    "attendance_sum": s["attendance_sum"],
+                },
+                # Keep only the last N readings for the rolling average
+                "$push": {"recent_attendance": {"$each": s["recent"], "$slice": -window}},
+                "$max": {"last_prediction_at": s["latest"]["timestamp"]},
+                "$set": {
+                    "latest_attendance": s["latest"]["overall_attendance"],
+                    "latest_prediction": s["latest"].get("prediction", "Unknown"),
+                },
+            },
+            upsert=True,
+        )
+        for username, s in per_user.items()
+    ]
+
+async def bump_history_versions(database, usernames, max_retries: int, backoff_base: float = 0.2):
+    """
+    history_version is what the /history/my-logs ETag is built from. Unlike the counters below,
+    an extra bump is harmless (it only costs one full response), so it is retried until it lands.
+    """
+    async def bump(username):
+        for attempt in range(max_retries + 1):
+            try:
+                await database[COLLECTION].update_one({"_id": username}, {"$inc": {"history_version": 1}}, upsert=True)
+                return
+            except Exception as e:
+                error = e
+            if attempt < max_retries:
+                await asyncio.sleep(backoff_base * (2 ** attempt))
+        print(f"❌ history_version bump failed for {username}: {error}")
+
+    await asyncio.gather(*(bump(username) for username in usernames))
+
+async def update_summaries(database, history_logs: list):
+    """
+    Called by the history write-behind buffer after each successful insert_many.
+    """
+    # 1. Version first: a stale ETag would hide the new history behind 304s
+    await bump_history_versions(database, {log["username"] for log in history_logs},
+                                max_retries=settings.HISTORY_FLUSH_MAX_RETRIES)
+
+    # 2. Counters: best effort
+    updates = build_summary_updates(history_logs)
+    if not updates:
+        return
+    try:
+        await database[COLLECTION].bulk_write(updates, ordered=False)
+    except Exception as e:
+        # History itself is safe; `python -m app.db.summaries --backfill` rebuilds the summaries
+        print(f"❌ Summary update failed for {len(updates)} user(s): {e}")
+
+def present_summary(doc: dict):
+    count = doc.get("prediction_count", 0)
+    recent = doc.get("recent_attendance", [])
+    return {
+        "username": doc["_id"],
+        "prediction_count": count,
+        "safe_count": doc.get("safe_count", 0),
+        "unsafe_count": doc.get("unsafe_count", 0),
+        "latest_attendance": doc.get("latest_attendance"),
+        "latest_prediction": doc.get("latest_prediction"),
+        "average_attendance": round(doc.get("attendance_sum", 0.0) / count, 2) if count else None,
+        "rolling_average_attendance": round(sum(recent) / len(recent), 2) if recent else None,
+        "last_prediction_at": doc.get("last_prediction_at"),
+    }
+
+def backfill_pipeline():
+    """
+    Rebuilds every summary from the history collection in one server-side aggregation
+    ($lastN needs MongoDB 5.2+). Overwrites the counters of whatever summaries exist.
+    """
+    return [
+        {"$sort": {"username": 1, "timestamp": 1}},
+        {"$group": {
+            "_id": "$username",
+            "prediction_count": {"$sum": 1},
+            "safe_count": {"$sum": {"$cond": [
+                {"$regexMatch": {"input": {"$ifNull": ["$prediction", ""]}, "regex": "^\\s*safe", "options": "i"}},
+                1, 0
+            ]}},
+            "attendance_sum": {"$sum": "$overall_attendance"},
+            "recent_attendance": {"$lastN": {"n": settings.SUMMARY_ROLLING_WINDOW, "input": "$overall_attendance"}},
+            "latest_attendance": {"$last": "$overall_attendance"},
+            "latest_prediction": {"$last": "$prediction"},
+            "last_prediction_at": {"$last": "$timestamp"},
+        }},
+        {"$set": {"unsafe_count": {"$subtract": ["$prediction_count", "$safe_count"]}}},
+        # "merge", not "replace": history_version (the ETag of /history/my-logs) must survive a backfill
+        {"$merge": {"into": COLLECTION, "on": "_id", "whenMatched": "merge", "whenNotMatched": "insert"}},
+    ]
+
+async def backfill_summaries(database):
+    # allowDiskUse: the $sort over all history can exceed the 100MB in-memory limit
+    await database["history"].aggregate(backfill_pipeline(), allowDiskUse=True).to_list(length=None)
+    return await database[COLLECTION].count_documents({})
+
+async def _main():
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description="Per-user attendance summaries")
+    parser.add_argument("--backfill", action="store_true", help="Rebuild all summaries from history")
+    args = parser.parse_args()
+    if not args.backfill:
+        parser.print_help()
+        return
+
+    client = AsyncIOMotorClient(settings.MONGO_DETAILS)
+    try:
+        total = await backfill_summaries(client[settings.DATABASE_NAME])
+        print(f"✅ Backfilled {total} user summaries")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from pymongo.errors import BulkWriteError
+
+DUPLICATE_KEY = 11000
+
+class WriteBehindBuffer:
+    """
+    Queues documents in memory and writes them with insert_many, either when
+    max_batch documents are waiting or every flush_interval seconds, whichever comes first.
+
+    Mongo errors are retried with exponential backoff. insert_many stamps an _id on each
+    document, so a retry after a partial write only hits duplicate keys, which count as written.
+    When more than max_pending documents are waiting, new ones are dropped (and counted).
+    """
+
+    def __init__(self, collection_name: str, max_batch: int, flush_interval: float,
+                 max_pending: int, max_retries: int, backoff_base: float = 0.2, on_written=None):
+        self.collection_name = collection_name
+        # async (database, documents) callback run after every successful write
+        self.on_written = on_written
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.collection = None
+        self._pending = []
+        self._wake = None
+        self._lock = None
+        self._task = None
+        self._stopping = False
+        # Counters for stats()
+        self.written = 0
+        self.dropped = 0
+        self.failed_attempts = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.last_flush_at = None
+
+    def start(self, database):
+        self.collection = database[self.collection_name]
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stops the background flusher and drains everything still queued.
+        The flusher is asked to finish, not cancelled: a cancelled insert_many would lose
+        the batch it already took off the queue.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        if self.collection is not None:
+            await self.flush()
+
+    def add(self, document: dict):
+        self.add_many([document])
+
+    def add_many(self, documents: list):
+        room = self.max_pending - len(self._pending)
+        if room < len(documents):
+            lost = len(documents) - max(room, 0)
+            self.dropped += lost
+            print(f"⚠️ {self.collection_name} buffer full, dropped {lost} record(s)")
+            documents = documents[:max(room, 0)]
+        self._pending.extend(documents)
+        if self._wake is not None and len(self._pending) >= self.max_batch:
+            self._wake.set()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                try:
+                    await self._write(batch)
+                except asyncio.CancelledError:
+                    # Put the batch back so a later flush (or stop) still writes it
+                    self._pending[:0] = batch
+                    raise
+
+    async def _write(self, batch: list):
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.collection.insert_many(batch, ordered=False)
+                break
+            except BulkWriteError as e:
+                # Already written by an earlier attempt -> fine
+                if all(err.get("code") == DUPLICATE_KEY for err in e.details.get("writeErrors", [])) \
+                        and not e.details.get("writeConcernErrors"):
+                    break
+                error = e
+            except Exception as e:
+                error = e
+            self.failed_attempts += 1
+            if attempt == self.max_retries:
+                self.dropped += len(batch)
+                print(f"❌ Dropped {len(batch)} {self.collection_name} record(s) after "
+                      f"{self.max_retries + 1} attempts: {error}")
+                return
+            await asyncio.sleep(self.backoff_base * (2 ** attempt))
+
+        self.written += len(batch)
+        self.flushes += 1
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+        self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+        self.last_flush_at = time.time()
+        if self.on_written is not None:
+            await self.on_written(self.collection.database, batch)
+
+    def stats(self):
+        return {
+            "collection": self.collection_name,
+            "depth": len(self._pending),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_attempts": self.failed_attempts,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+            "last_flush_at": self.last_flush_at,
+        }
@@ -1,32 +1,121 @@
-import torch
-torch.set_num_threads(1) 
-
+import asyncio
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
-from app.db.mongodb import connect_to_mongo, close_mongo_connection 
+from app.core.metrics import registry, MetricsMiddleware, monitor_event_loop_lag, register_gauge_callback
+from app.core.admission import AdmissionMiddleware, admission_controller
+from app.db.mongodb import db, connect_to_mongo, close_mongo_connection, history_buffer
+from app.ml.model_engine import model_engine
+from app.ml.prediction_cache import prediction_cache
+from app.ml.precompute import verdict_precomputer
+from app.ocr.ocr_jobs import ocr_jobs
+from app.core.upstream import upstream
+from app.core.process_memory import memory_stats
 
 # 👇 UNCOMMENTED PREDICT ROUTES
 from app.api import auth_routes, ocr_routes, history_routes, timetable_routes, predict_routes
 
 app = FastAPI(title=settings.PROJECT_NAME)
 
+# Added first = innermost: shed 429/503 responses still get CORS headers and show up in the metrics
+app.add_middleware(AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paging cursor for /history/my-logs and ETags for conditional GETs have to be readable by the browser
+    expose_headers=["X-Next-Cursor", "ETag"],
+)
+# Added last = outermost, so route latency includes CORS handling
+app.add_middleware(MetricsMiddleware)
+
+register_gauge_callback(
+    "history_buffer", "Write-behind history buffer (depth, written, dropped, last_flush_ms)",
+    lambda: {(key,): value for key, value in history_buffer.stats().items()
+             if key in ("depth", "written", "dropped", "failed_attempts", "last_flush_ms", "max_flush_ms")},
+    labels=("stat",)
+)
+
+# Each worker reports itself; under gunicorn the pid label tells workers apart
+register_gauge_callback(
+    "process_memory_bytes", "Memory of this worker process (rss, pss, shared, private)",
+    lambda: {(str(os.getpid()), kind): value for kind, value in memory_stats().items()},
+    labels=("pid", "kind")
 )
 
 @app.on_event("startup")
 async def startup_db_client():
     await connect_to_mongo()
 
+@app.on_event("startup")
+async def startup_verdict_precompute():
+    # Nightly job; the lease in job_state lets only one worker/instance run it
+    if settings.PRECOMPUTE_ENABLED:
+        verdict_precomputer.start(db.client[settings.DATABASE_NAME])
+
+@app.on_event("startup")
+async def startup_model_engine():
+    # Only pay for xgboost/joblib in RAM when the local model is actually used
+    if settings.PREDICTION_ENGINE == "xgboost":
+        try:
+            model_engine.load()
+            await model_engine.start()
+        except Exception as e:
+            print(f"❌ Local model unavailable, falling back to Gemini: {e}")
+
+@app.on_event("startup")
+async def startup_ocr_jobs():
+    await ocr_jobs.start(db.client[settings.DATABASE_NAME])
+
+@app.on_event("startup")
+async def startup_warm_up():
+    # Connections to the AI providers open in the background after the port is open
+    if settings.WARM_UP_ON_STARTUP:
+        app.state.warm_up_task = asyncio.create_task(warm_up())
+
+async def warm_up():
+    http = upstream.http()
+    for name, provider in upstream.providers.items():
+        try:
+            # Any response is fine: we only want TCP + TLS done before the first real request
+            await http.head(provider.base_url, timeout=5.0)
+        except Exception as e:
+            print(f"⚠️ {name} warm-up failed (will connect on first use): {e}")
+    print("🔥 Warm-up done")
+
+@app.on_event("startup")
+async def startup_loop_lag_monitor():
+    app.state.loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
+
+@app.on_event("shutdown")
+async def shutdown_verdict_precompute():
+    # Stops between batches; the checkpoint lets the next start resume
+    await verdict_precomputer.stop()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     await close_mongo_connection()
 
+@app.on_event("shutdown")
+async def shutdown_model_engine():
+    await model_engine.stop()
+
+@app.on_event("shutdown")
+async def shutdown_ocr_jobs():
+    await ocr_jobs.stop()
+
+@app.on_event("shutdown")
+async def shutdown_loop_lag_monitor():
+    app.state.loop_lag_task.cancel()
+
+@app.on_event("shutdown")
+async def shutdown_upstream_client():
+    await upstream.close()
+
 app.include_router(auth_routes.router, prefix="/api/v1/auth", tags=["Auth"])
 app.include_router(ocr_routes.router, prefix="/api/v1/ocr", tags=["OCR"])
 app.include_router(history_routes.router, prefix="/api/v1/history", tags=["History"])
@@ -37,4 +126,34 @@ app.include_router(predict_routes.router, prefix="/api/v1/predict", tags=["Predi
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to Should I Bunk API"}
\ No newline at end of file
+    return {"message": "Welcome to Should I Bunk API"}
+
+@app.get("/stats/history-buffer", tags=["Ops"])
+def history_buffer_stats():
+    # Is the write-behind buffer keeping up? (depth, flush latency, dropped records)
+    return history_buffer.stats()
+
+@app.get("/stats/prediction-cache", tags=["Ops"])
+def prediction_cache_stats():
+    # Hit ratio and how much model/upstream time the hits saved
+    return prediction_cache.stats()
+
+@app.get("/stats/precompute", tags=["Ops"])
+async def precompute_stats():
+    # Progress / last rows-per-second of the nightly verdict job
+    return await verdict_precomputer.stats()
+
+@app.get("/stats/admission", tags=["Ops"])
+def admission_stats():
+    # In-flight/waiting per route class (rejections are in /metrics: admission_rejections_total)
+    return admission_controller.stats()
+
+@app.get("/stats/worker", tags=["Ops"])
+def worker_stats():
+    # Which worker answered and what it costs (run `python -m app.core.process_memory <master pid>` for all of them)
+    return {"pid": os.getpid(), "parent_pid": os.getppid(), "memory_bytes": memory_stats()}
+
+@app.get("/metrics", tags=["Ops"], include_in_schema=False)
+def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
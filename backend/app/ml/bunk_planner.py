@@ -0,0 +1,168 @@
+import math
+from datetime import date
+import numpy as np
+from app.ml.vintage_batch import vintage_risk_scores
+
+# Same order as date.weekday() (Sunday = 6 has no classes)
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday"]
+
+NO_EXAM_DAYS = 999
+
+def expand_slots(timetable: dict, start: date, days: int):
+    """
+    Every class slot from `start` for `days` days, as parallel NumPy arrays.
+    The weekly template is built once and tiled over the weeks (no per-day Python loop).
+    Returns (slots, subjects) where slots = {"ordinal", "weekday", "period", "subject"}.
+    """
+    subjects = sorted({s for day in WEEKDAYS for s in timetable.get(day, []) if s})
+    subject_index = {name: i for i, name in enumerate(subjects)}
+
+    template = [
+        (weekday, period, subject_index[name])
+        for weekday, day in enumerate(WEEKDAYS)
+        for period, name in enumerate(timetable.get(day, []))
+        if name
+    ]
+    empty = {k: np.empty(0, dtype=np.int64) for k in ("ordinal", "weekday", "period", "subject")}
+    if not template or days <= 0:
+        return empty, subjects
+
+    t_weekday, t_period, t_subject = (np.array(col, dtype=np.int64) for col in zip(*template))
+    week_start = start.toordinal() - start.weekday()
+    weeks = math.ceil((start.weekday() + days) / 7)
+
+    # (weeks x template) grid, flattened week by week
+    ordinal = (week_start + 7 * np.arange(weeks)[:, None] + t_weekday[None, :]).ravel()
+    keep = (ordinal >= start.toordinal()) & (ordinal < start.toordinal() + days)
+    return {
+        "ordinal": ordinal[keep],
+        "weekday": np.tile(t_weekday, weeks)[keep],
+        "period": np.tile(t_period, weeks)[keep],
+        "subject": np.tile(t_subject, weeks)[keep],
+    }, subjects
+
+def days_to_next_exam(ordinals, exam_dates):
+    """
+    Days from each slot to the next exam on/after it (NO_EXAM_DAYS when none is left).
+    """
+    if not exam_dates:
+        return np.full(ordinals.shape[0], NO_EXAM_DAYS, dtype=np.int64)
+    exams = np.sort(np.array([d.toordinal() for d in exam_dates], dtype=np.int64))
+    nxt = np.searchsorted(exams, ordinals, side="left")
+    has_exam = nxt < exams.shape[0]
+    return np.where(has_exam, exams[np.minimum(nxt, exams.shape[0] - 1)] - ordinals, NO_EXAM_DAYS)
+
+def slot_feature_columns(slots, subjects, attendance_pct, exam_dates=(), strictness=None):
+    """
+    Vintage Math inputs for every slot: the subject's current attendance, days to the next exam,
+    labs by name, first period by position. Unknowns use neutral values.
+    """
+    strictness = strictness or {}
+    subject = slots["subject"]
+    is_lab_by_subject = np.array(["lab" in s.lower() for s in subjects], dtype=bool).reshape(-1)
+    strictness_by_subject = np.array([strictness.get(s, 2) for s in subjects], dtype=np.int64)
+    return {
+        "overall_attendance": np.asarray(attendance_pct, dtype=np.float64)[subject],
+        "days_to_exam": days_to_next_exam(slots["ordinal"], list(exam_dates)),
+        "faculty_strictness": strictness_by_subject[subject],
+        "is_lab": is_lab_by_subject[subject],
+        "has_proxy": np.zeros(subject.shape[0], dtype=bool),
+        "bunked_last_class": np.zeros(subject.shape[0], dtype=bool),
+        "is_first_period": slots["period"] == 0,
+    }
+
+def max_bunks(attended, held, remaining, target):
+    """
+    Largest b with (attended + remaining - b) / (held + remaining) >= target, clipped to [0, remaining].
+    """
+    attended, held, remaining = (np.asarray(x, dtype=np.float64) for x in (attended, held, remaining))
+    # Tiny epsilon so exact hits (e.g. 75.0%) aren't lost to float rounding
+    b = np.floor(attended + remaining - target * (held + remaining) + 1e-9)
+    return np.clip(b, 0, remaining).astype(np.int64)
+
+def plan_semester(timetable: dict, attendance: dict, start: date, remaining_weeks: int,
+                  exam_dates=(), strictness=None, target: float = 0.75, include_slots: bool = True):
+    """
+    Whole-semester bunk budget in one vectorized pass.
+    attendance: {subject: {"attended": int, "held": int}} (missing subjects start at 0/0).
+    """
+    slots, subjects = expand_slots(timetable, start, remaining_weeks * 7)
+    k = len(subjects)
+
+    attended = np.array([attendance.get(s, {}).get("attended", 0) for s in subjects], dtype=np.float64)
+    held = np.array([attendance.get(s, {}).get("held", 0) for s in subjects], dtype=np.float64)
+    remaining = np.bincount(slots["subject"], minlength=k)
+
+    # 1. Per subject: how many of the remaining classes can go
+    subject_bunks = max_bunks(attended, held, remaining, target)
+    pct_now = np.where(held > 0, attended / np.maximum(held, 1) * 100, 100.0)
+    pct_if_all_attended = np.where(
+        held + remaining > 0, (attended + remaining) / np.maximum(held + remaining, 1) * 100, 100.0
+    )
+
+    # 2. Per weekday (each on its own): how many whole days can be skipped without any subject
+    #    dropping below target. Each skipped day costs every subject its periods that day.
+    per_day_counts = np.zeros((len(WEEKDAYS), k), dtype=np.int64)
+    np.add.at(per_day_counts, (slots["weekday"], slots["subject"]), 1)
+    class_days = np.unique(slots["ordinal"])
+    # date.fromordinal(1) is a Monday, so (ordinal - 1) % 7 == date.weekday()
+    weeks_left_per_day = np.bincount((class_days - 1) % 7, minlength=7)[:len(WEEKDAYS)]
+    weekly_counts = np.divide(per_day_counts, np.maximum(weeks_left_per_day, 1)[:, None])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days_per_subject = np.where(weekly_counts > 0, np.floor(subject_bunks[None, :] / weekly_counts), np.inf)
+    full_days = np.minimum(days_per_subject.min(axis=1, initial=np.inf), weeks_left_per_day)
+    full_days = np.where(np.isinf(full_days), 0, full_days).astype(np.int64)
+
+    # 3. Score every candidate slot with the Vintage Math rules
+    cols = slot_feature_columns(slots, subjects, pct_now, exam_dates, strictness)
+    risk = vintage_risk_scores(cols)
+    budget_left = subject_bunks[slots["subject"]] > 0
+    safe = (risk < 50) & budget_left
+
+    plan = {
+        "start_date": start.isoformat(),
+        "remaining_weeks": remaining_weeks,
+        "target_percent": target * 100,
+        "total_remaining_classes": int(remaining.sum()),
+        "total_max_bunks": int(max_bunks(attended.sum(), held.sum(), remaining.sum(), target)),
+        "subjects": [
+            {
+                "subject": name,
+                "attended": int(attended[i]),
+                "held": int(held[i]),
+                "current_percent": round(float(pct_now[i]), 2),
+                "remaining_classes": int(remaining[i]),
+                "max_bunks": int(subject_bunks[i]),
+                "best_case_percent": round(float(pct_if_all_attended[i]), 2),
+            }
+            for i, name in enumerate(subjects)
+        ],
+        "days": [
+            {
+                "day": day,
+                "remaining_days": int(weeks_left_per_day[d]),
+                "classes_per_day": int(per_day_counts[d].sum() // max(weeks_left_per_day[d], 1)),
+                "max_full_day_bunks": int(full_days[d]),
+            }
+            for d, day in enumerate(WEEKDAYS)
+            if weeks_left_per_day[d] > 0
+        ],
+        "safe_slot_count": int(safe.sum()),
+    }
+
+    if include_slots:
+        plan["slots"] = [
+            {
+                "date": date.fromordinal(o).isoformat(),
+                "day": WEEKDAYS[wd],
+                "period": p + 1,
+                "subject": subjects[s],
+                "risk": round(r, 1),
+                "safe": sf,
+            }
+            for o, wd, p, s, r, sf in zip(
+                slots["ordinal"].tolist(), slots["weekday"].tolist(), slots["period"].tolist(),
+                slots["subject"].tolist(), risk.tolist(), safe.tolist()
+            )
+        ]
+    return plan
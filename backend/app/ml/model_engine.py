@@ -0,0 +1,134 @@
+import os
+import asyncio
+import time
+from app.core.config import settings
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), "model_pipeline.pkl")
+DEFAULT_COMPILED_TREES_PATH = os.path.join(os.path.dirname(__file__), "model_trees.npz")
+
+class ModelEngine:
+    """
+    Serves the trained XGBoost model in-process.
+
+    Concurrent callers are collected into micro-batches (up to max_batch_size rows,
+    waiting at most max_wait_ms for the batch to fill) and scored with ONE predict_proba call.
+    """
+
+    def __init__(self, model_path: str, compiled_trees_path: str, max_batch_size: int, max_wait_ms: float):
+        self.model_path = model_path
+        self.compiled_trees_path = compiled_trees_path
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.model = None
+        self.feature_names = []
+        self._queue = None
+        self._worker = None
+
+    @property
+    def ready(self):
+        return self.model is not None and self._worker is not None
+
+    def load(self):
+        if self.model is not None:
+            return
+
+        start = time.perf_counter()
+        if self.compiled_trees_path and os.path.exists(self.compiled_trees_path):
+            # Preferred: NumPy-only evaluator, no xgboost/joblib import
+            from app.ml.tree_evaluator import CompiledTrees
+            loaded_from = self.compiled_trees_path
+            self.model = CompiledTrees.load(loaded_from)
+            self.feature_names = self.model.feature_names
+        else:
+            import joblib
+            loaded_from = self.model_path
+            self.model = joblib.load(loaded_from)
+            # Column order the model was trained with (FEATURE_COLUMNS in train_model.py).
+            # Shard-trained models are pickled as a raw Booster instead of an XGBClassifier.
+            booster = self.model.get_booster() if hasattr(self.model, "get_booster") else self.model
+            self.feature_names = list(booster.feature_names)
+        print(f"🌲 Loaded {os.path.basename(loaded_from)} in {(time.perf_counter() - start) * 1000:.1f}ms "
+              f"(features: {', '.join(self.feature_names)})")
+
+    async def start(self):
+        if self.model is None or self._worker is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._batch_loop())
+
+    async def stop(self):
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def row_from_request(self, data):
+        # Bools (is_lab, has_proxy, ...) become 0/1 like the training data
+        return [float(getattr(data, name)) for name in self.feature_names]
+
+    async def predict_safe_proba(self, data) -> float:
+        """
+        Probability that bunking is safe (target == 1) for one PredictionRequest.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((self.row_from_request(data), future))
+        return await future
+
+    def _score(self, rows):
+        import numpy as np
+        X = np.asarray(rows, dtype=np.float32)
+        if hasattr(self.model, "predict_proba"):
+            return self.model.predict_proba(X)[:, 1].tolist()
+        # Raw Booster with binary:logistic already returns P(target == 1)
+        return self.model.inplace_predict(X).tolist()
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # 1. Wait for the first request, then give others a short window to join
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # 2. One predict_proba call for the whole batch (off the event loop)
+            try:
+                probas = await asyncio.to_thread(self._score, [row for row, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), proba in zip(batch, probas):
+                if not future.done():
+                    future.set_result(proba)
+
+model_engine = ModelEngine(
+    model_path=settings.MODEL_PATH or DEFAULT_MODEL_PATH,
+    compiled_trees_path=settings.COMPILED_TREES_PATH or DEFAULT_COMPILED_TREES_PATH,
+    max_batch_size=settings.MODEL_BATCH_MAX_SIZE,
+    max_wait_ms=settings.MODEL_BATCH_WAIT_MS,
+)
+
+def preload_models():
+    """
+    Loads everything read-only the workers need, in the gunicorn master before it forks
+    (see gunicorn.conf.py). Workers then share these pages copy-on-write instead of each
+    loading its own copy; their startup load() becomes a no-op.
+    """
+    if settings.PREDICTION_ENGINE == "xgboost":
+        model_engine.load()
+    # NumPy and the Vintage Math / planner tables
+    import app.ml.vintage_batch
+    import app.ml.bunk_planner
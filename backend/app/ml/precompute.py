@@ -0,0 +1,293 @@
+import argparse
+import asyncio
+import os
+import socket
+import time
+from datetime import date, datetime, timedelta
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.core.config import settings
+from app.db.summaries import COLLECTION as SUMMARY_COLLECTION
+
+# Verdicts for every slot of every saved timetable on the coming morning, computed off-peak so the 8 a.m.
+# rush is served by /predict/today (one indexed read) instead of /predict/ + Gemini per class.
+COLLECTION = "precomputed_verdicts"
+JOB_STATE_COLLECTION = "job_state"
+JOB_NAME = "precompute_verdicts"
+
+def score_batch(users: list, attendance: dict, target: date):
+    """
+    Vintage Math verdicts for the target day of every user in the batch, in one vectorized call.
+    Returns {username: [slot verdicts]}; users without classes that day (or without any
+    attendance reading yet) are left out.
+    """
+    import numpy as np
+    from app.ml.bunk_planner import WEEKDAYS, expand_slots, slot_feature_columns
+    from app.ml.vintage_batch import vintage_verdict_columns
+
+    parts, owners = [], []
+    for user in users:
+        pct = attendance.get(user["username"])
+        if pct is None:
+            continue
+        slots, subjects = expand_slots(user.get("timetable") or {}, target, 1)
+        if slots["subject"].shape[0] == 0:
+            continue
+        parts.append(slot_feature_columns(slots, subjects, np.full(len(subjects), pct)))
+        owners += [(user["username"], WEEKDAYS[wd], p + 1, subjects[s])
+                   for wd, p, s in zip(slots["weekday"].tolist(), slots["period"].tolist(), slots["subject"].tolist())]
+
+    if not parts:
+        return {}
+    cols = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+    verdicts = vintage_verdict_columns(cols)
+
+    per_user = {}
+    for (username, day, period, subject), risk, prediction, confidence, message in zip(
+            owners, verdicts["risk"].tolist(), verdicts["prediction"].tolist(),
+            verdicts["confidence"].tolist(), verdicts["message"].tolist()):
+        per_user.setdefault(username, []).append({
+            "day": day, "period": period, "subject": subject, "risk": round(risk, 1),
+            "prediction": prediction, "confidence": confidence, "message": message,
+        })
+    return per_user
+
+class VerdictPrecomputer:
+    """
+    Daily job: walks `users` with a timetable in _id order, batch by batch, and upserts one
+    precomputed_verdicts document per (username, date).
+
+    - Resumable: the last finished _id is checkpointed in job_state after every batch,
+      so a restart (deploy, crash) continues where it stopped.
+    - One runner: a lease in job_state keeps other workers/instances from running it at the same time.
+      stop() hands the lease back; a crashed runner's lease expires after lease_seconds, and whoever
+      is waiting for that day (_run_until_done) takes over from the checkpoint.
+    - Gentle: scoring runs off the event loop and every batch is followed by a pause that grows
+      with how long MongoDB took to absorb the previous write.
+    """
+
+    def __init__(self, batch_size: int, pause_seconds: float, run_at_hour: int, lease_seconds: int):
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.run_at_hour = run_at_hour
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.database = None
+        self._task = None
+        self.last_run = {}
+
+    def start(self, database):
+        self.database = database
+        self._task = asyncio.create_task(self._schedule())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self._release_lease()
+
+    async def _release_lease(self):
+        # A restarted process is a new owner: without this it would wait out our lease before resuming
+        try:
+            await self.database[JOB_STATE_COLLECTION].update_one(
+                {"_id": JOB_NAME, "owner": self.owner, "status": "running"},
+                {"$set": {"lease_until": datetime.utcnow()}},
+            )
+        except Exception as e:
+            print(f"⚠️ Could not release the verdict precompute lease: {e}")
+
+    def seconds_until_next_run(self, now: datetime = None):
+        now = now or datetime.now()
+        next_run = now.replace(hour=self.run_at_hour, minute=0, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return (next_run - now).total_seconds()
+
+    def target_for_run(self, run_day: date):
+        """
+        The morning a run started on run_day serves: the same day for a night run before noon
+        (02:00 on the 5th computes the 5th), the next day for an evening run (22:00 on the 5th
+        computes the 6th). Either way the verdicts use attendance from just before the rush.
+        """
+        return run_day if self.run_at_hour < 12 else run_day + timedelta(days=1)
+
+    def current_target(self, now: datetime = None):
+        # The day the most recent scheduled run was for; a deploy after it (or on day one) catches up on it
+        now = now or datetime.now()
+        last_run_day = now.date() if now.hour >= self.run_at_hour else now.date() - timedelta(days=1)
+        return self.target_for_run(last_run_day)
+
+    async def _schedule(self):
+        # A run interrupted by a restart resumes right away, and a missed run for a morning that
+        # hasn't passed yet is caught up on; then wait for the off-peak hour
+        state = await self.database[JOB_STATE_COLLECTION].find_one({"_id": JOB_NAME}) or {}
+        if state.get("status") == "running" and state.get("target_date") >= date.today().isoformat():
+            await self._run_until_done(date.fromisoformat(state["target_date"]))
+        if self.current_target() >= date.today():
+            await self._run_until_done(self.current_target())
+        while True:
+            await asyncio.sleep(self.seconds_until_next_run())
+            await self._run_until_done(self.target_for_run(date.today()))
+
+    async def _run_until_done(self, target: date):
+        """
+        Keeps trying the target day until it is done (by us or anyone else) or the day has passed.
+        While someone else holds the lease we sleep until it would expire: a live runner renews it
+        every batch, a crashed one doesn't, and then we continue from its checkpoint.
+        """
+        while target >= date.today():
+            try:
+                if await self.run(target) is not None:
+                    return
+                state = await self.database[JOB_STATE_COLLECTION].find_one({"_id": JOB_NAME}) or {}
+                if state.get("target_date") == target.isoformat() and state.get("status") == "done":
+                    return
+                lease_until = state.get("lease_until") or datetime.utcnow()
+                wait = (lease_until - datetime.utcnow()).total_seconds()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Checkpoint + lease survive; the next attempt continues from the last batch
+                print(f"❌ Verdict precompute for {target} failed: {e}")
+                wait = min(60, self.lease_seconds)
+            await asyncio.sleep(max(1.0, wait + 1.0))
+
+    async def _acquire_lease(self, target: date):
+        """
+        Returns the job state if we may run (lease free, expired or already ours), else None.
+        A state for an older target date starts over from the first user.
+        """
+        now = datetime.utcnow()
+        state_coll = self.database[JOB_STATE_COLLECTION]
+        state = await state_coll.find_one({"_id": JOB_NAME}) or {}
+        if state.get("target_date") == target.isoformat() and state.get("status") == "done":
+            return None
+
+        fresh = state.get("target_date") != target.isoformat()
+        update = {"$set": {"owner": self.owner, "lease_until": now + timedelta(seconds=self.lease_seconds),
+                           "status": "running", "target_date": target.isoformat(), "updated_at": now}}
+        if fresh:
+            update["$set"].update({"last_user_id": None, "processed_users": 0, "written_rows": 0, "started_at": now})
+        try:
+            return await state_coll.find_one_and_update(
+                {"_id": JOB_NAME, "$or": [{"lease_until": {"$lte": now}}, {"owner": self.owner},
+                                          {"lease_until": {"$exists": False}}]},
+                update, upsert=True, return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # The upsert collided with the existing state: someone else holds a live lease
+            return None
+
+    async def run(self, target: date):
+        state = await self._acquire_lease(target)
+        if state is None:
+            return None
+
+        users_coll = self.database["users"]
+        state_coll = self.database[JOB_STATE_COLLECTION]
+        last_id = state.get("last_user_id")
+        processed, written = state.get("processed_users", 0), state.get("written_rows", 0)
+        started = time.perf_counter()
+        run_written = 0
+        print(f"🌙 Precomputing verdicts for {target} (resume after {last_id or 'start'})")
+
+        while True:
+            query = {"timetable": {"$exists": True}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            users = await users_coll.find(query, {"username": 1, "timetable": 1}) \
+                .sort("_id", 1).limit(self.batch_size).to_list(length=self.batch_size)
+            if not users:
+                break
+
+            # 1. Latest attendance per user: the summary keeps it current on every history write
+            summaries = await self.database[SUMMARY_COLLECTION].find(
+                {"_id": {"$in": [user["username"] for user in users]}}, {"latest_attendance": 1}
+            ).to_list(length=len(users))
+            attendance = {s["_id"]: s["latest_attendance"] for s in summaries if s.get("latest_attendance") is not None}
+
+            # 2. Score off the event loop
+            per_user = await asyncio.to_thread(score_batch, users, attendance, target)
+
+            # 3. One unordered bulk upsert per batch
+            write_started = time.perf_counter()
+            now = datetime.utcnow()
+            if per_user:
+                await self.database[COLLECTION].bulk_write([
+                    UpdateOne(
+                        {"username": username, "date": target.isoformat()},
+                        {"$set": {"slots": slots, "overall_attendance": attendance[username], "computed_at": now,
+                                  # TTL index drops the document the day after it was for
+                                  "expires_at": datetime.combine(target + timedelta(days=2), datetime.min.time())}},
+                        upsert=True,
+                    )
+                    for username, slots in per_user.items()
+                ], ordered=False)
+            write_seconds = time.perf_counter() - write_started
+
+            last_id = users[-1]["_id"]
+            processed += len(users)
+            batch_rows = sum(len(slots) for slots in per_user.values())
+            written += batch_rows
+            run_written += batch_rows
+            await state_coll.update_one({"_id": JOB_NAME, "owner": self.owner}, {"$set": {
+                "last_user_id": last_id, "processed_users": processed, "written_rows": written,
+                "lease_until": now + timedelta(seconds=self.lease_seconds), "updated_at": now,
+            }})
+
+            # 4. Back off: at least the configured pause, longer while MongoDB is slow to take writes
+            await asyncio.sleep(max(self.pause_seconds, write_seconds))
+
+        elapsed = time.perf_counter() - started
+        rows_per_second = round(run_written / elapsed, 1) if elapsed > 0 else 0.0
+        self.last_run = {
+            "target_date": target.isoformat(), "processed_users": processed, "written_rows": written,
+            "seconds": round(elapsed, 2), "rows_per_second": rows_per_second,
+        }
+        await state_coll.update_one({"_id": JOB_NAME, "owner": self.owner}, {"$set": {
+            "status": "done", "finished_at": datetime.utcnow(), "rows_per_second": rows_per_second,
+            "lease_until": datetime.utcnow(),
+        }})
+        print(f"✅ Precomputed {written} slot verdicts for {processed} users ({target}) "
+              f"in {elapsed:.1f}s, {rows_per_second} rows/s")
+        return self.last_run
+
+    async def stats(self):
+        state = await self.database[JOB_STATE_COLLECTION].find_one({"_id": JOB_NAME}) if self.database is not None else None
+        return {"last_run_here": self.last_run, "job_state": state}
+
+verdict_precomputer = VerdictPrecomputer(
+    batch_size=settings.PRECOMPUTE_BATCH_SIZE,
+    pause_seconds=settings.PRECOMPUTE_BATCH_PAUSE_SECONDS,
+    run_at_hour=settings.PRECOMPUTE_RUN_AT_HOUR,
+    lease_seconds=settings.PRECOMPUTE_LEASE_SECONDS,
+)
+
+async def _main():
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description="Precompute the coming morning's bunk verdicts")
+    parser.add_argument("--date", type=date.fromisoformat, default=None,
+                        help="Target day (default: the day the scheduled run is for, see PRECOMPUTE_RUN_AT_HOUR)")
+    parser.add_argument("--force", action="store_true", help="Recompute even if that day is already done")
+    args = parser.parse_args()
+    target = args.date or verdict_precomputer.current_target()
+
+    client = AsyncIOMotorClient(settings.MONGO_DETAILS)
+    try:
+        database = client[settings.DATABASE_NAME]
+        if args.force:
+            await database[JOB_STATE_COLLECTION].delete_one({"_id": JOB_NAME, "target_date": target.isoformat()})
+        verdict_precomputer.database = database
+        result = await verdict_precomputer.run(target)
+        if result is None:
+            print(f"Nothing to do: {target} is done or another process holds the lease")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import math
+from bisect import bisect_right
+from datetime import datetime
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import prediction_cache_lookups_total, prediction_cache_saved_seconds_total
+from app.db.mongodb import db
+
+COLLECTION = "prediction_cache"
+# Everything in PredictionRequest that changes the answer (filename doesn't)
+KEY_FIELDS = (
+    "overall_attendance", "is_core_subject", "days_to_exam", "semester_phase", "faculty_strictness",
+    "is_lab", "has_proxy", "bunked_last_class", "is_first_period",
+)
+# Detention line and luxury zone (train_model.py rules): an entry must never span either of them
+ATTENDANCE_THRESHOLDS = (75.0, 85.0)
+
+def normalize_request(data, attendance_step: float):
+    """
+    The feature tuple a prediction depends on. Attendance is floored to `attendance_step`
+    so 80.1% and 80.2% share an answer, and keyed with its side of each threshold so 74.8% and
+    75.2% never do; negative days_to_exam means "exam today", like Vintage Math.
+    """
+    values = []
+    for field in KEY_FIELDS:
+        value = getattr(data, field)
+        if field == "overall_attendance":
+            values.append(bisect_right(ATTENDANCE_THRESHOLDS, value))
+            if attendance_step > 0:
+                value = round(math.floor(value / attendance_step) * attendance_step, 4)
+        elif field == "days_to_exam":
+            value = max(0, value)
+        elif isinstance(value, bool):
+            value = int(value)
+        values.append(value)
+    return tuple(values)
+
+def cache_key(data, engine: str, attendance_step: float) -> str:
+    # Engine is part of the key: a Gemini answer must not be served when running on XGBoost
+    raw = "|".join(str(v) for v in (engine,) + normalize_request(data, attendance_step))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+class PredictionCache:
+    """
+    Model answers per normalized feature tuple: in-process LRU in front of an optional
+    MongoDB collection shared by all workers (TTL index in app/db/indexes.py).
+    Entries remember how long the model took, so hits can report the upstream time they saved.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: int, shared: bool, attendance_step: float):
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self.attendance_step = attendance_step
+        self.local = LRUCache(maxsize, ttl_seconds)
+        self.hits = {"local": 0, "shared": 0}
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._pending_writes = set()
+
+    @property
+    def enabled(self):
+        return self.local.maxsize > 0
+
+    def key(self, data, engine: str) -> str:
+        return cache_key(data, engine, self.attendance_step)
+
+    async def get(self, key: str):
+        entry = self.local.get(key)
+        tier = "local"
+        if entry is None and self.shared:
+            entry = await self._get_shared(key)
+            tier = "shared"
+            if entry is not None:
+                self.local.set(key, entry)
+
+        if entry is None:
+            self.misses += 1
+            prediction_cache_lookups_total.inc(outcome="miss")
+            return None
+
+        self.hits[tier] += 1
+        self.saved_seconds += entry["latency_seconds"]
+        prediction_cache_lookups_total.inc(outcome=f"hit_{tier}")
+        prediction_cache_saved_seconds_total.inc(entry["latency_seconds"])
+        # Callers add their own fields; the cached dict must stay untouched
+        return dict(entry["result"])
+
+    def set(self, key: str, result: dict, latency_seconds: float):
+        entry = {"result": dict(result), "latency_seconds": latency_seconds}
+        self.local.set(key, entry)
+        if self.shared:
+            # Not awaited: the response shouldn't wait for the shared tier
+            task = asyncio.create_task(self._set_shared(key, entry))
+            self._pending_writes.add(task)
+            task.add_done_callback(self._pending_writes.discard)
+
+    async def _get_shared(self, key: str):
+        try:
+            doc = await db.client[settings.DATABASE_NAME][COLLECTION].find_one({"_id": key})
+        except Exception as e:
+            print(f"⚠️ Prediction cache lookup failed: {e}")
+            return None
+        if not doc:
+            return None
+        return {"result": doc["result"], "latency_seconds": doc.get("latency_seconds", 0.0)}
+
+    async def _set_shared(self, key: str, entry: dict):
+        try:
+            await db.client[settings.DATABASE_NAME][COLLECTION].replace_one(
+                {"_id": key},
+                {**entry, "created_at": datetime.utcnow()},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"⚠️ Prediction cache store failed: {e}")
+
+    def stats(self):
+        hits = self.hits["local"] + self.hits["shared"]
+        lookups = hits + self.misses
+        return {
+            "size": len(self.local),
+            "hits_local": self.hits["local"],
+            "hits_shared": self.hits["shared"],
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "saved_upstream_seconds": round(self.saved_seconds, 3),
+        }
+
+prediction_cache = PredictionCache(
+    maxsize=settings.PREDICTION_CACHE_SIZE,
+    ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS,
+    shared=settings.PREDICTION_CACHE_SHARED,
+    attendance_step=settings.PREDICTION_CACHE_ATTENDANCE_STEP,
+)
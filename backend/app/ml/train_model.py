@@ -1,81 +1,261 @@
+import os
+import json
+import math
+import argparse
 import pandas as pd
 import numpy as np
 import xgboost as xgb
 import joblib
 
-def generate_strict_btech_data(n_samples=10000):
+MODEL_PATH = "app/ml/model_pipeline.pkl"
+COMPILED_TREES_PATH = "app/ml/model_trees.npz"
+
+# Order of the model inputs. The extra context columns come straight from PredictionRequest.
+FEATURE_COLUMNS = [
+    'overall_attendance', 'is_core_subject', 'days_to_exam', 'semester_phase',
+    'faculty_strictness', 'is_lab', 'has_proxy', 'is_first_period',
+]
+
+def strict_rule_label(overall_attendance, is_core_subject, days_to_exam):
     """
-    Generates data that follows Strict JNTU/College Rules.
-    No more random guessing.
+    The Strict JNTU/College Rules for ONE row (the "Teacher" Brain).
+    Kept as the readable reference for the vectorized strict_rule_labels below.
     """
-    np.random.seed(42)
-    data = []
+    # RULE 1: The "Detention" Line
+    if overall_attendance < 75.0:
+        return 0 # Danger Zone! Never bunk.
+
+    # RULE 2: The "Exam Panic"
+    elif days_to_exam <= 2:
+        return 0 # Exam is near! Study!
+
+    # RULE 3: The "Safe Zone" (75% - 85%)
+    elif 75.0 <= overall_attendance < 85.0:
+        if is_core_subject == 1:
+            return 0 # Don't miss core subjects in this range
+        else:
+            return 1 # English? Okay to skip.
+
+    # RULE 4: The "Luxury Zone" (85%+)
+    else: # > 85%
+        if days_to_exam < 5 and is_core_subject == 1:
+            return 0 # Keep attendance high for exams
+        else:
+            return 1 # You are the king. Sleep at home.
 
-    for _ in range(n_samples):
-        # --- INPUTS ---
-        overall_attendance = np.random.uniform(60.0, 99.0) # Float for precision
-        
+def strict_rule_labels(overall_attendance, is_core_subject, days_to_exam):
+    """
+    Same rules as strict_rule_label, applied to whole columns with boolean masks.
+    """
+    core = is_core_subject == 1
+    detention = overall_attendance < 75.0                                # RULE 1
+    exam_panic = ~detention & (days_to_exam <= 2)                        # RULE 2
+    safe_zone = ~detention & ~exam_panic & (overall_attendance < 85.0)   # RULE 3
+    luxury_zone = ~detention & ~exam_panic & ~safe_zone                  # RULE 4
+
+    safe = (safe_zone & ~core) | (luxury_zone & ~((days_to_exam < 5) & core))
+    return safe.astype(np.int8)
+
+def generate_strict_btech_chunk(rng, n_samples):
+    """
+    Draws n_samples rows column-by-column (no Python loop) and labels them.
+    Returns a dict of NumPy columns: FEATURE_COLUMNS + 'target'.
+    """
+    # --- INPUTS ---
+    cols = {
+        'overall_attendance': rng.uniform(60.0, 99.0, n_samples), # Float for precision
         # 0=Elective (English/Library), 1=Core (DSA/OS/AIML)
-        is_core_subject = np.random.choice([0, 1], p=[0.3, 0.7])
-        
-        days_to_exam = np.random.randint(0, 40) # 0 means exam is today/tomorrow
-        
+        'is_core_subject': (rng.random(n_samples) < 0.7).astype(np.int8),
+        'days_to_exam': rng.integers(0, 40, n_samples), # 0 means exam is today/tomorrow
         # 0=Start, 1=Mid, 2=End
-        semester_phase = np.random.choice([0, 1, 2])
-        
-        # --- STRICT LOGIC RULES (The "Teacher" Brain) ---
-        safe_to_bunk = 0 # Default NO
-
-        # RULE 1: The "Detention" Line
-        if overall_attendance < 75.0:
-            safe_to_bunk = 0 # Danger Zone! Never bunk.
-        
-        # RULE 2: The "Exam Panic"
-        elif days_to_exam <= 2:
-            safe_to_bunk = 0 # Exam is near! Study!
-            
-        # RULE 3: The "Safe Zone" (75% - 85%)
-        elif 75.0 <= overall_attendance < 85.0:
-            if is_core_subject == 1:
-                safe_to_bunk = 0 # Don't miss core subjects in this range
-            else:
-                safe_to_bunk = 1 # English? Okay to skip.
-
-        # RULE 4: The "Luxury Zone" (85%+)
-        else: # > 85%
-            if days_to_exam < 5 and is_core_subject == 1:
-                 safe_to_bunk = 0 # Keep attendance high for exams
-            else:
-                 safe_to_bunk = 1 # You are the king. Sleep at home.
-
-        data.append([
-            overall_attendance, is_core_subject, days_to_exam, semester_phase, safe_to_bunk
-        ])
-
-    columns = ['overall_attendance', 'is_core_subject', 'days_to_exam', 'semester_phase', 'target']
-    return pd.DataFrame(data, columns=columns)
-
-def train_and_save():
+        'semester_phase': rng.integers(0, 3, n_samples),
+        # 1=Chill, 2=Normal, 3=Strict
+        'faculty_strictness': rng.integers(1, 4, n_samples),
+        'is_lab': (rng.random(n_samples) < 0.25).astype(np.int8),
+        'has_proxy': (rng.random(n_samples) < 0.2).astype(np.int8),
+        'is_first_period': (rng.random(n_samples) < 0.15).astype(np.int8),
+    }
+    # --- STRICT LOGIC RULES ---
+    cols['target'] = strict_rule_labels(cols['overall_attendance'], cols['is_core_subject'], cols['days_to_exam'])
+    return cols
+
+def generate_strict_btech_data(n_samples=10000, seed=42):
+    """
+    Generates data that follows Strict JNTU/College Rules.
+    No more random guessing.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(generate_strict_btech_chunk(rng, n_samples), columns=FEATURE_COLUMNS + ['target'])
+
+def write_training_shards(out_dir, n_samples, chunk_size=1_000_000, seed=42):
+    """
+    Streams n_samples rows to disk as fixed-size .npy shards (X_00000.npy / y_00000.npy, ...).
+    Only one chunk is ever in RAM. Each chunk gets its own child seed, so the data
+    is identical for a given seed no matter how it is consumed later.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    n_chunks = math.ceil(n_samples / chunk_size)
+    shards = []
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        rows = min(chunk_size, n_samples - i * chunk_size)
+        cols = generate_strict_btech_chunk(np.random.default_rng(child), rows)
+        X = np.column_stack([cols[name] for name in FEATURE_COLUMNS]).astype(np.float32)
+        x_path = os.path.join(out_dir, f"X_{i:05d}.npy")
+        y_path = os.path.join(out_dir, f"y_{i:05d}.npy")
+        np.save(x_path, X)
+        np.save(y_path, cols['target'].astype(np.float32))
+        shards.append((x_path, y_path))
+        print(f"   -> Shard {i + 1}/{n_chunks}: {rows:,} rows")
+    return shards
+
+def list_training_shards(shard_dir):
+    x_files = sorted(f for f in os.listdir(shard_dir) if f.startswith("X_") and f.endswith(".npy"))
+    return [(os.path.join(shard_dir, f), os.path.join(shard_dir, "y_" + f[2:])) for f in x_files]
+
+class ShardIterator(xgb.DataIter):
+    """
+    Feeds .npy shards to XGBoost one at a time (external-memory training).
+    """
+
+    def __init__(self, shards, cache_prefix):
+        self._shards = shards
+        self._it = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._it == len(self._shards):
+            return 0
+        x_path, y_path = self._shards[self._it]
+        input_data(data=np.load(x_path), label=np.load(y_path), feature_names=FEATURE_COLUMNS)
+        self._it += 1
+        return 1
+
+    def reset(self):
+        self._it = 0
+
+MODEL_PARAMS = dict(
+    n_estimators=100,
+    max_depth=6,
+    learning_rate=0.1,
+    eval_metric='logloss'
+)
+
+def train_on_shards(shard_dir):
+    """
+    Trains past RAM: XGBoost pulls the shards through ShardIterator and keeps
+    its quantized pages in an on-disk cache next to them.
+    """
+    it = ShardIterator(list_training_shards(shard_dir), cache_prefix=os.path.join(shard_dir, "xgb_cache"))
+    # XGBoost 3.x has a dedicated external-memory matrix, 2.x builds one from the iterator
+    ext_matrix = getattr(xgb, "ExtMemQuantileDMatrix", None)
+    dtrain = ext_matrix(it) if ext_matrix else xgb.DMatrix(it)
+
+    params = {
+        "objective": "binary:logistic",
+        "tree_method": "hist",
+        "max_depth": MODEL_PARAMS["max_depth"],
+        "learning_rate": MODEL_PARAMS["learning_rate"],
+        "eval_metric": MODEL_PARAMS["eval_metric"],
+    }
+    return xgb.train(params, dtrain, num_boost_round=MODEL_PARAMS["n_estimators"])
+
+def train_and_save(shard_dir=None):
     print("🧠 Training Strict B.Tech Model...")
-    df = generate_strict_btech_data()
-    
-    X = df.drop('target', axis=1)
-    y = df['target']
-    
-    # We use a deeper tree (max_depth=6) to capture these strict IF-ELSE rules
-    model = xgb.XGBClassifier(
-        n_estimators=100,
-        max_depth=6, 
-        learning_rate=0.1,
-        use_label_encoder=False, 
-        eval_metric='logloss'
-    )
-    model.fit(X, y)
+
+    if shard_dir:
+        # Big runs: shards written by write_training_shards, never loaded all at once
+        model = train_on_shards(shard_dir)
+    else:
+        df = generate_strict_btech_data()
+
+        X = df.drop('target', axis=1)
+        y = df['target']
+
+        # We use a deeper tree (max_depth=6) to capture these strict IF-ELSE rules
+        model = xgb.XGBClassifier(**MODEL_PARAMS)
+        model.fit(X, y)
     
-    save_path = "app/ml/model_pipeline.pkl"
+    save_path = MODEL_PATH
     joblib.dump(model, save_path)
     print(f"✅ Model saved to {save_path}")
     print("   -> Logic: <75% = DETENTION RISK detected.")
 
+    export_compiled_trees(model, COMPILED_TREES_PATH)
+
+def _parse_base_score(raw):
+    # XGBoost 1.x writes "5E-1", 2.x/3.x may write "[5E-1]"
+    return float(str(raw).strip("[]"))
+
+def export_compiled_trees(model, save_path=COMPILED_TREES_PATH):
+    """
+    Dumps the booster's trees into flat arrays (.npz) that app/ml/tree_evaluator.py
+    can score with NumPy only. Node ids become global indexes across all trees.
+    """
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    learner = json.loads(booster.save_raw(raw_format="json"))["learner"]
+
+    objective = learner["objective"]["name"]
+    if objective != "binary:logistic":
+        raise ValueError(f"Only binary:logistic models can be exported (got {objective})")
+    gbm = learner["gradient_booster"]
+    if gbm["name"] != "gbtree":
+        raise ValueError(f"Only gbtree boosters can be exported (got {gbm['name']})")
+
+    feature, threshold, left, right, missing, value, roots = [], [], [], [], [], [], []
+    max_depth = 0
+    for tree in gbm["model"]["trees"]:
+        offset = len(feature)
+        roots.append(offset)
+        lefts, rights = tree["left_children"], tree["right_children"]
+        conditions = tree["split_conditions"]
+
+        depth = [0] * len(lefts)
+        for i, (l, r) in enumerate(zip(lefts, rights)):
+            is_leaf = l == -1
+            feature.append(-1 if is_leaf else tree["split_indices"][i])
+            # For leaves XGBoost stores the leaf weight in split_conditions
+            threshold.append(0.0 if is_leaf else conditions[i])
+            value.append(conditions[i] if is_leaf else 0.0)
+            left.append(offset + (i if is_leaf else l))
+            right.append(offset + (i if is_leaf else r))
+            missing.append(offset + (i if is_leaf else (l if tree["default_left"][i] else r)))
+            if not is_leaf:
+                depth[l] = depth[r] = depth[i] + 1
+        max_depth = max(max_depth, max(depth))
+
+    base_score = _parse_base_score(learner["learner_model_param"]["base_score"])
+    num_feature = int(learner["learner_model_param"]["num_feature"])
+    feature_names = learner.get("feature_names") or [f"f{i}" for i in range(num_feature)]
+    np.savez(
+        save_path,
+        feature_names=np.array(feature_names),
+        roots=np.array(roots, dtype=np.int32),
+        feature=np.array(feature, dtype=np.int32),
+        threshold=np.array(threshold, dtype=np.float32),
+        left=np.array(left, dtype=np.int32),
+        right=np.array(right, dtype=np.int32),
+        missing=np.array(missing, dtype=np.int32),
+        value=np.array(value, dtype=np.float32),
+        base_margin=np.float64(math.log(base_score / (1 - base_score))),
+        max_depth=np.int32(max_depth),
+    )
+    print(f"✅ Compiled {len(roots)} trees ({len(feature)} nodes) to {save_path}")
+
 if __name__ == "__main__":
-    train_and_save()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--export-only", action="store_true",
+                        help="Re-export the trees of an already trained pickle without retraining")
+    parser.add_argument("--shard-dir", help="Train from .npy shards in this directory (external memory)")
+    parser.add_argument("--generate-rows", type=int, default=0,
+                        help="Write this many synthetic rows as shards into --shard-dir first")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    if args.export_only:
+        export_compiled_trees(joblib.load(MODEL_PATH))
+    else:
+        if args.generate_rows:
+            if not args.shard_dir:
+                parser.error("--generate-rows needs --shard-dir")
+            write_training_shards(args.shard_dir, args.generate_rows, chunk_size=args.chunk_size)
+        train_and_save(shard_dir=args.shard_dir)
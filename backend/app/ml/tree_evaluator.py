@@ -0,0 +1,65 @@
+import numpy as np
+
+class CompiledTrees:
+    """
+    Scores rows with the trees exported by train_model.export_compiled_trees.
+
+    Every tree node lives in flat NumPy arrays, so we only need NumPy at runtime
+    (no xgboost, no joblib, no pickle). All trees are walked together, one depth level per step.
+    """
+
+    def __init__(self, feature_names, roots, feature, threshold, left, right, missing, value, base_margin, max_depth):
+        self.feature_names = list(feature_names)
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing = missing
+        self.value = value
+        self.base_margin = float(base_margin)
+        self.max_depth = int(max_depth)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path, allow_pickle=False) as f:
+            return cls(
+                feature_names=[str(name) for name in f["feature_names"]],
+                roots=f["roots"],
+                feature=f["feature"],
+                threshold=f["threshold"],
+                left=f["left"],
+                right=f["right"],
+                missing=f["missing"],
+                value=f["value"],
+                base_margin=f["base_margin"],
+                max_depth=f["max_depth"],
+            )
+
+    def predict_margin(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        rows = np.arange(X.shape[0])[:, None]
+        # One cursor per (row, tree), starting at every tree's root
+        node = np.broadcast_to(self.roots, (X.shape[0], self.roots.shape[0])).copy()
+
+        for _ in range(self.max_depth):
+            feat = self.feature[node]
+            is_leaf = feat < 0
+            if is_leaf.all():
+                break
+            x = X[rows, np.where(is_leaf, 0, feat)]
+            # XGBoost rule: go left when x < split_condition, NaN follows the default branch
+            nxt = np.where(x < self.threshold[node], self.left[node], self.right[node])
+            nxt = np.where(np.isnan(x), self.missing[node], nxt)
+            node = np.where(is_leaf, node, nxt)
+
+        return self.value[node].sum(axis=1, dtype=np.float32) + np.float32(self.base_margin)
+
+    def predict_proba(self, X):
+        """
+        Same shape as XGBClassifier.predict_proba: column 0 = target 0, column 1 = target 1.
+        """
+        p = 1.0 / (1.0 + np.exp(-self.predict_margin(X).astype(np.float64)))
+        return np.column_stack([1.0 - p, p])
@@ -0,0 +1,110 @@
+import numpy as np
+
+# Same reasons (and order) as calculate_vintage_risk in predict_routes.
+# Each row gets a 4-bit mask and we look its message up instead of joining strings per row.
+REASONS = ["Exam imminent", "Low attendance", "Lab session", "Proxy available"]
+MESSAGE_TABLE = [
+    ", ".join(r for bit, r in enumerate(REASONS) if mask & (1 << bit)) or "Standard conditions"
+    for mask in range(1 << len(REASONS))
+]
+
+COLUMNS = [
+    "overall_attendance", "days_to_exam", "faculty_strictness",
+    "is_lab", "has_proxy", "bunked_last_class", "is_first_period",
+]
+
+def requests_to_columns(rows):
+    """
+    Turns a list of PredictionRequest rows into one NumPy array per feature.
+    """
+    return {
+        "overall_attendance": np.fromiter((r.overall_attendance for r in rows), dtype=np.float64, count=len(rows)),
+        "days_to_exam": np.fromiter((r.days_to_exam for r in rows), dtype=np.int64, count=len(rows)),
+        "faculty_strictness": np.fromiter((r.faculty_strictness for r in rows), dtype=np.int64, count=len(rows)),
+        "is_lab": np.fromiter((r.is_lab for r in rows), dtype=bool, count=len(rows)),
+        "has_proxy": np.fromiter((r.has_proxy for r in rows), dtype=bool, count=len(rows)),
+        "bunked_last_class": np.fromiter((r.bunked_last_class for r in rows), dtype=bool, count=len(rows)),
+        "is_first_period": np.fromiter((r.is_first_period for r in rows), dtype=bool, count=len(rows)),
+    }
+
+def vintage_risk_scores(cols):
+    """
+    Vectorized port of the Vintage Math rules. Returns the clipped risk (0-100) per row.
+    The additions happen in the same order as the scalar version so the floats match exactly.
+    """
+    attendance = np.asarray(cols["overall_attendance"], dtype=np.float64)
+    # 1. Sanitize Inputs (No negative days)
+    days = np.maximum(np.asarray(cols["days_to_exam"]), 0)
+    strictness = np.asarray(cols["faculty_strictness"])
+
+    # 2. Initialize Score ONCE
+    score = np.zeros(attendance.shape[0], dtype=np.float64)
+
+    # 3. Attendance Impact (The Foundation)
+    score += np.where(attendance < 75, (75 - attendance) * 2.5, np.where(attendance > 85, -10.0, 0.0))
+
+    # 4. Exam Panic (Cumulative)
+    score += np.where(days <= 3, 60.0, np.where(days <= 7, 30.0, 0.0))
+
+    # 5. Contextual Weights
+    score += np.where(cols["is_lab"], 25.0, 0.0)
+    score += np.where(strictness == 3, 20.0, 0.0)
+    score += np.where(strictness == 1, -10.0, 0.0)
+    score += np.where(cols["bunked_last_class"], 15.0, 0.0)
+
+    # 6. The Saviors
+    score += np.where(cols["has_proxy"], -45.0, 0.0)
+    score += np.where(cols["is_first_period"], -10.0, 0.0)
+
+    # 7. Final Calculations
+    return np.clip(score, 0, 100)
+
+def reason_masks(cols):
+    days = np.maximum(np.asarray(cols["days_to_exam"]), 0)
+    return (
+        (days <= 3).astype(np.int64)
+        | ((np.asarray(cols["overall_attendance"]) < 75).astype(np.int64) << 1)
+        | (np.asarray(cols["is_lab"], dtype=bool).astype(np.int64) << 2)
+        | (np.asarray(cols["has_proxy"], dtype=bool).astype(np.int64) << 3)
+    )
+
+# "Calculated Risk: {int(risk)}%. {reasons}." for every whole risk (0-100) and reason mask
+MESSAGE_BY_RISK_AND_MASK = np.array(
+    [f"Calculated Risk: {risk}%. {message}." for risk in range(101) for message in MESSAGE_TABLE], dtype=object
+)
+PREDICTIONS = np.array(["Not Safe ❌", "Safe to Bunk 😎"], dtype=object)
+
+def vintage_verdict_columns(cols):
+    """
+    Columnar verdicts: {"risk", "prediction", "confidence", "message"} arrays, one entry per row,
+    with the same strings calculate_vintage_risk builds. Nothing is formatted per row:
+    - message: table lookup by (whole risk, reason mask)
+    - confidence: formatted once per distinct risk value (real batches repeat a few thousand at most)
+    """
+    final_risk = vintage_risk_scores(cols)
+    is_safe = final_risk < 50
+    masks = reason_masks(cols)
+
+    distinct, inverse = np.unique(final_risk, return_inverse=True)
+    confidence_table = np.array(
+        [f"{100 - risk:.1f}%" if risk < 50 else f"{risk:.1f}% Risk" for risk in distinct.tolist()], dtype=object
+    )
+    return {
+        "risk": final_risk,
+        "prediction": PREDICTIONS[is_safe.astype(np.int64)],
+        "confidence": confidence_table[inverse.reshape(-1)],
+        # int(risk) truncates; risk is clipped to 0-100, so astype does the same
+        "message": MESSAGE_BY_RISK_AND_MASK[final_risk.astype(np.int64) * len(MESSAGE_TABLE) + masks],
+    }
+
+def calculate_vintage_risk_batch(cols, **extra):
+    """
+    Scores every row in one pass and returns the same dicts calculate_vintage_risk would,
+    plus any `extra` fields (e.g. engine="vintage") on every row.
+    """
+    verdicts = vintage_verdict_columns(cols)
+    return [
+        {"prediction": prediction, "confidence": confidence, "message": message, **extra}
+        for prediction, confidence, message in zip(
+            verdicts["prediction"].tolist(), verdicts["confidence"].tolist(), verdicts["message"].tolist())
+    ]
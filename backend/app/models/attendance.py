@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
+
+# --- Attendance table as read from a screenshot (app/ocr/table_parser.py) ---
+
+class SubjectAttendanceRow(BaseModel):
+    subject: str = Field(min_length=1)
+    attended: int = Field(ge=0)
+    held: int = Field(ge=0)
+    percent: Optional[float] = Field(default=None, ge=0, le=100)
+
+    @model_validator(mode="after")
+    def attended_within_held(self):
+        if self.attended > self.held:
+            raise ValueError(f"{self.subject}: attended ({self.attended}) > held ({self.held})")
+        return self
+
+class AttendanceTotals(BaseModel):
+    attended: Optional[int] = Field(default=None, ge=0)
+    held: Optional[int] = Field(default=None, ge=0)
+    percent: Optional[float] = Field(default=None, ge=0, le=100)
+
+class AttendanceTable(BaseModel):
+    subjects: List[SubjectAttendanceRow] = Field(default_factory=list)
+    total: AttendanceTotals = Field(default_factory=AttendanceTotals)
+    # Rows (or the TOTAL) that failed validation and were left out, one message each
+    rejected: List[str] = Field(default_factory=list)
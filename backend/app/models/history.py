@@ -11,4 +11,15 @@ class ScanLog(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     
     class Config:
-        populate_by_name = True
\ No newline at end of file
+        populate_by_name = True
+
+class UserSummary(BaseModel):
+    username: str
+    prediction_count: int = 0
+    safe_count: int = 0
+    unsafe_count: int = 0
+    latest_attendance: Optional[float] = None
+    latest_prediction: Optional[str] = None
+    average_attendance: Optional[float] = None
+    rolling_average_attendance: Optional[float] = None
+    last_prediction_at: Optional[datetime] = None
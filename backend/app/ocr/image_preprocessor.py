@@ -0,0 +1,75 @@
+import io
+from app.core.config import settings
+
+FORMAT_TO_MIME = {"JPEG": "image/jpeg", "PNG": "image/png"}
+
+def sniff_mime_type(file_bytes: bytes, fallback: str = "image/jpeg"):
+    if file_bytes.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if file_bytes.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    return fallback
+
+def preprocess_image(file_bytes: bytes, crop_roi: bool = None):
+    """
+    Shrinks an upload before it goes to the vision model:
+    decode -> (optional) crop to the bottom-right TOTAL cell -> downscale -> re-encode.
+
+    CPU-bound (Pillow), so call it from a worker thread.
+    Returns {"image_bytes", "mime_type", "original_bytes", "sent_bytes", "bytes_saved"}.
+    """
+    if crop_roi is None:
+        crop_roi = settings.OCR_CROP_TOTAL_ROI
+    original_size = len(file_bytes)
+    result = {
+        "image_bytes": file_bytes,
+        "mime_type": sniff_mime_type(file_bytes),
+        "original_bytes": original_size,
+        "sent_bytes": original_size,
+        "bytes_saved": 0,
+    }
+
+    try:
+        from PIL import Image, ImageOps
+
+        # 1. Decode (and respect phone camera rotation)
+        img = Image.open(io.BytesIO(file_bytes))
+        image_format = img.format if img.format in FORMAT_TO_MIME else "JPEG"
+        img = ImageOps.exif_transpose(img)
+        changed = False
+
+        # 2. Region of interest: the TOTAL cell lives in the bottom-right corner
+        if crop_roi:
+            width, height = img.size
+            left = int(width * (1 - settings.OCR_ROI_WIDTH_FRACTION))
+            top = int(height * (1 - settings.OCR_ROI_HEIGHT_FRACTION))
+            img = img.crop((left, top, width, height))
+            changed = True
+
+        # 3. Downscale (never upscale) to the configured max side
+        max_side = settings.OCR_MAX_IMAGE_SIDE
+        if max(img.size) > max_side:
+            img.thumbnail((max_side, max_side), Image.LANCZOS)
+            changed = True
+
+        # 4. Re-encode in the upload's own format (PNG screenshots keep sharp text)
+        out = io.BytesIO()
+        if image_format == "PNG":
+            img.save(out, format="PNG", optimize=True)
+        else:
+            if img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            img.save(out, format="JPEG", quality=settings.OCR_JPEG_QUALITY, optimize=True)
+        encoded = out.getvalue()
+
+        # Keep the original if re-encoding an untouched image only made it bigger
+        if changed or len(encoded) < original_size:
+            result["image_bytes"] = encoded
+        result["mime_type"] = FORMAT_TO_MIME[image_format]
+
+    except Exception as e:
+        print(f"⚠️ Image preprocessing skipped: {e}")
+
+    result["sent_bytes"] = len(result["image_bytes"])
+    result["bytes_saved"] = original_size - result["sent_bytes"]
+    return result
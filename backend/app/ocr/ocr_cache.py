@@ -0,0 +1,61 @@
+import hashlib
+from datetime import datetime
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.db.mongodb import db
+
+COLLECTION = "ocr_cache"
+# Cached field -> value when an old entry doesn't have it
+CACHED_FIELDS = {"overall_attendance": 0.0, "subjects": [], "raw_text": "", "table_check": None}
+
+def image_digest(image_bytes: bytes) -> str:
+    return hashlib.sha256(image_bytes).hexdigest()
+
+def is_cacheable(data: dict) -> bool:
+    # Never remember failures (errors, or "nothing found" when the key is missing), nor a table
+    # that didn't add up: a retry of the same screenshot should get a fresh read, not this one for a week
+    check = data.get("table_check")
+    return "error" not in data and data.get("overall_attendance", 0.0) > 0 and (check is None or check.get("ok"))
+
+class OCRResultCache:
+    """
+    Content-addressed OCR results: in-process LRU in front of a MongoDB collection
+    whose TTL index (see app/db/indexes.py) expires old entries for us.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.local = LRUCache(maxsize, ttl_seconds)
+
+    async def get(self, digest: str):
+        data = self.local.get(digest)
+        if data is not None:
+            return data
+
+        try:
+            doc = await db.client[settings.DATABASE_NAME][COLLECTION].find_one({"_id": digest})
+        except Exception as e:
+            print(f"⚠️ OCR cache lookup failed: {e}")
+            return None
+        if not doc:
+            return None
+
+        data = {field: doc.get(field, default) for field, default in CACHED_FIELDS.items()}
+        self.local.set(digest, data)
+        return data
+
+    async def set(self, digest: str, data: dict):
+        if not is_cacheable(data):
+            return
+        entry = {field: data.get(field, default) for field, default in CACHED_FIELDS.items()}
+        self.local.set(digest, entry)
+        try:
+            await db.client[settings.DATABASE_NAME][COLLECTION].replace_one(
+                {"_id": digest},
+                {**entry, "created_at": datetime.utcnow()},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"⚠️ OCR cache store failed: {e}")
+
+ocr_cache = OCRResultCache(settings.OCR_CACHE_SIZE, settings.OCR_CACHE_TTL_SECONDS)
@@ -0,0 +1,101 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.ocr.ocr_service import scan_image, OCRError
+
+COLLECTION = "ocr_jobs"
+
+class OCRJobQueue:
+    """
+    FIFO of OCR uploads for POST /ocr/scan?async=true.
+
+    A fixed number of workers pull jobs in arrival order; the actual model calls still
+    share the Groq concurrency cap (app/core/upstream.py) with the synchronous route.
+    The image stays in the process that received it, but the job's status and result live in
+    MongoDB: under gunicorn the poll (GET /ocr/jobs/{id}) usually lands on another worker.
+    Finished jobs are kept for job_ttl_seconds (TTL index on expires_at) so clients can poll.
+    """
+
+    def __init__(self, workers: int, max_queued: int, job_ttl_seconds: int):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.job_ttl_seconds = job_ttl_seconds
+        self.collection = None
+        self._queue = None
+        self._tasks = []
+
+    async def start(self, database):
+        if self._tasks:
+            return
+        self.collection = database[COLLECTION]
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _expires_at(self):
+        return datetime.utcnow() + timedelta(seconds=self.job_ttl_seconds)
+
+    async def submit(self, image_bytes: bytes, username: str):
+        """
+        Stores the job and queues the image. Raises asyncio.QueueFull when this worker's backlog is full.
+        """
+        if self._queue.full():
+            raise asyncio.QueueFull
+        job = {
+            "_id": uuid.uuid4().hex,
+            "username": username,
+            "status": "queued",
+            "result": None,
+            "error": None,
+            "created_at": datetime.utcnow(),
+            "finished_at": None,
+            "expires_at": self._expires_at(),
+        }
+        await self.collection.insert_one(job)
+        self._queue.put_nowait((job["_id"], image_bytes))
+        return job
+
+    async def get(self, job_id: str):
+        return await self.collection.find_one({"_id": job_id})
+
+    def public_view(self, job: dict):
+        view = {"id": job["_id"], **{k: job[k] for k in ("status", "result", "error")}}
+        if job["status"] == "queued":
+            # Only known to the worker holding the image; a poll served elsewhere shows this worker's queue
+            view["queue_depth"] = self._queue.qsize() if self._queue is not None else None
+        return view
+
+    async def _finish(self, job_id: str, **fields):
+        try:
+            await self.collection.update_one({"_id": job_id}, {"$set": {
+                **fields, "finished_at": datetime.utcnow(), "expires_at": self._expires_at(),
+            }})
+        except Exception as e:
+            print(f"❌ Could not store the outcome of OCR job {job_id}: {e}")
+
+    async def _worker(self):
+        while True:
+            job_id, image_bytes = await self._queue.get()
+            try:
+                await self.collection.update_one({"_id": job_id}, {"$set": {"status": "running"}})
+                result = await scan_image(image_bytes)
+                await self._finish(job_id, status="done", result=result)
+            except OCRError as e:
+                await self._finish(job_id, status="failed", error=e.detail)
+            except Exception as e:
+                print(f"🔥 OCR job {job_id} crashed: {e}")
+                await self._finish(job_id, status="failed", error="AI Model Error. Please enter manually.")
+            finally:
+                self._queue.task_done()
+
+ocr_jobs = OCRJobQueue(
+    workers=settings.OCR_MAX_CONCURRENCY,
+    max_queued=settings.OCR_JOB_QUEUE_MAX,
+    job_ttl_seconds=settings.OCR_JOB_TTL_SECONDS,
+)
@@ -1,69 +1,103 @@
-import os
-import json
 import base64
-import re
-from groq import Groq
+from app.core.config import settings
+from app.core.upstream import upstream, UpstreamUnavailable
+from app.ocr.table_parser import (
+    TABLE_PROMPT, parse_table_response, check_consistency, overall_percent, parse_total_percent
+)
 
-# Setup Groq Client
-api_key = os.getenv("GROQ_API_KEY")
-client = Groq(api_key=api_key) if api_key else None
+# 🟢 UPDATED MODEL ID: Llama 4 Scout (Replaces Llama 3.2 Vision)
+VISION_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
 
-def extract_attendance_from_image(file_bytes: bytes):
-    result_data = {"overall_attendance": 0.0, "subjects": [], "raw_text": ""}
-
-    if not client:
-        print("❌ Groq API Key missing! Check Environment Variables.")
-        return result_data
+TOTAL_PROMPT = "Look at the bottom right of this table. Find the 'TOTAL' percentage. Return ONLY the number (e.g., 92.16)."
 
-    try:
-        # 1. Convert Image to Base64
-        base64_image = base64.b64encode(file_bytes).decode('utf-8')
-        
-        # 2. Ask Llama 4 Scout (The new Vision Standard)
-        chat_completion = client.chat.completions.create(
-            messages=[
+async def ask_vision_model(prompt: str, base64_image: str, mime_type: str, **options):
+    # Ask Llama 4 Scout (The new Vision Standard) via Groq's OpenAI-compatible API
+    chat_completion = await upstream.post_json(
+        "groq",
+        "/openai/v1/chat/completions",
+        {
+            "messages": [
                 {
                     "role": "user",
                     "content": [
-                        {"type": "text", "text": "Look at the bottom right of this table. Find the 'TOTAL' percentage. Return ONLY the number (e.g., 92.16)."},
+                        {"type": "text", "text": prompt},
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image}",
+                                "url": f"data:{mime_type};base64,{base64_image}",
                             },
                         },
                     ],
                 }
             ],
-            # 🟢 UPDATED MODEL ID: Llama 4 Scout (Replaces Llama 3.2 Vision)
-            model="meta-llama/llama-4-scout-17b-16e-instruct", 
-            temperature=0,
-        )
+            "model": VISION_MODEL,
+            "temperature": 0,
+            **options,
+        },
+        headers={"Authorization": f"Bearer {settings.GROQ_API_KEY}"},
+    )
+    return chat_completion["choices"][0]["message"]["content"]
 
-        # 3. Get the Response
-        content = chat_completion.choices[0].message.content
-        print(f"🦙 Llama 4 Output: {content}")
-        
-        # 4. Extract the Number (Robust Regex)
-        matches = re.findall(r"(\d+\.\d+)", content)
-        
-        if matches:
-            percent = float(matches[-1])
-            if 0 <= percent <= 100:
-                result_data["overall_attendance"] = percent
-                result_data["raw_text"] = content
-                return result_data
+def table_result(content: str):
+    """
+    Whole-table answer -> scan result. Falls back to the TOTAL percentage when the JSON is unusable.
+    """
+    try:
+        table = parse_table_response(content)
+    except ValueError as e:
+        print(f"⚠️ OCR table unusable, falling back to the TOTAL number: {e}")
+        return {
+            "overall_attendance": parse_total_percent(content),
+            "subjects": [],
+            "raw_text": content,
+            "table_check": {"ok": False, "rows": 0, "issues": [str(e)]},
+        }
 
-        # Fallback for Integers
-        int_matches = re.findall(r"(\d+)", content)
-        if int_matches:
-             valid_ints = [int(x) for x in int_matches if 50 <= int(x) <= 100]
-             if valid_ints:
-                 result_data["overall_attendance"] = float(valid_ints[-1])
+    check = check_consistency(table)
+    if check["issues"]:
+        print(f"⚠️ OCR table doesn't add up: {'; '.join(check['issues'])}")
+    return {
+        "overall_attendance": overall_percent(table),
+        "subjects": [row.model_dump() for row in table.subjects],
+        "raw_text": content,
+        "table_check": check,
+    }
+
+async def extract_attendance_from_image(file_bytes: bytes, mime_type: str = "image/jpeg", table_mode: bool = None):
+    result_data = {"overall_attendance": 0.0, "subjects": [], "raw_text": ""}
+    if table_mode is None:
+        table_mode = settings.OCR_TABLE_MODE
 
+    if not settings.GROQ_API_KEY:
+        print("❌ Groq API Key missing! Check Environment Variables.")
+        return result_data
+
+    try:
+        # 1. Convert Image to Base64
+        base64_image = base64.b64encode(file_bytes).decode('utf-8')
+
+        # 2a. Every subject row in one call (JSON mode, capped output)
+        if table_mode:
+            content = await ask_vision_model(
+                TABLE_PROMPT, base64_image, mime_type,
+                response_format={"type": "json_object"},
+                max_tokens=settings.OCR_TABLE_MAX_TOKENS,
+            )
+            print(f"🦙 Llama 4 Output: {content[:200]}")
+            return table_result(content)
+
+        # 2b. Only the TOTAL percentage
+        content = await ask_vision_model(TOTAL_PROMPT, base64_image, mime_type)
+        print(f"🦙 Llama 4 Output: {content}")
+        result_data["overall_attendance"] = parse_total_percent(content)
+        result_data["raw_text"] = content
         return result_data
 
+    except UpstreamUnavailable as e:
+        print(f"⛔ Groq skipped: {e}")
+        return {"overall_attendance": 0.0, "error": "OCR is busy right now. Please try again or enter manually."}
+
     except Exception as e:
         print(f"🔥 Llama OCR Error: {str(e)}")
         # Fallback to Manual Entry prompt on frontend if specific error
-        return {"overall_attendance": 0.0, "error": "AI Model Error. Please enter manually."}
\ No newline at end of file
+        return {"overall_attendance": 0.0, "error": "AI Model Error. Please enter manually."}
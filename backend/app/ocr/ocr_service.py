@@ -0,0 +1,63 @@
+import asyncio
+from app.core.config import settings
+from app.ocr.ocr_processor import extract_attendance_from_image
+from app.ocr.image_preprocessor import preprocess_image
+from app.ocr.ocr_cache import ocr_cache, image_digest
+
+class OCRError(Exception):
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+async def scan_image(image_bytes: bytes):
+    """
+    Full OCR pipeline for one upload: cache -> preprocess -> vision model -> cache.
+    Returns the /ocr/scan response body, raises OCRError when the model fails.
+    """
+    # 1. Same screenshot as before? Answer from the cache, no model call
+    # (table and TOTAL-only results are cached separately)
+    table_mode = settings.OCR_TABLE_MODE
+    digest = image_digest(image_bytes) + (":table" if table_mode else "")
+    cached = await ocr_cache.get(digest)
+    if cached is not None:
+        return build_scan_response(cached, cache_status="hit")
+
+    # 2. Shrink the image in a worker thread (Pillow is CPU-bound)
+    # Table mode needs every row, so no crop to the TOTAL cell
+    prepared = await asyncio.to_thread(preprocess_image, image_bytes, False if table_mode else None)
+    print(f"🖼️ OCR upload {prepared['original_bytes']} -> {prepared['sent_bytes']} bytes "
+          f"(saved {prepared['bytes_saved']})")
+
+    # 3. Run OCR. Every Groq call (sync route AND background jobs) goes through the shared
+    # upstream client, which never runs more than OCR_MAX_CONCURRENCY calls at once.
+    try:
+        # returns a dictionary: {"overall_attendance": 85.0, "subjects": [...], "raw_text": "...", "table_check": {...}}
+        data = await extract_attendance_from_image(prepared["image_bytes"], prepared["mime_type"], table_mode)
+    except Exception as e:
+        raise OCRError(f"OCR Engine Error: {str(e)}")
+
+    # 4. Check if we found anything (the processor returns valid JSON structure even on failure)
+    if "error" in data:
+        raise OCRError(data["error"])
+
+    await ocr_cache.set(digest, data)
+    return build_scan_response(data, cache_status="miss", prepared=prepared)
+
+def build_scan_response(data: dict, cache_status: str, prepared: dict = None):
+    # We removed the "ai_analysis" (Prediction) part because it requires heavy libraries.
+    # The Frontend will use this data to fill the form, then the User clicks "Predict".
+    return {
+        "extracted_data": {
+            "overall_attendance": data.get("overall_attendance", 0.0),
+            "subject_attendances": data.get("subjects", [])
+        },
+        "raw_text": data.get("raw_text", ""),
+        # Whether the rows add up to the TOTAL row (None in TOTAL-only mode)
+        "table_check": data.get("table_check"),
+        "cache": cache_status,
+        "preprocessing": {
+            "original_bytes": prepared["original_bytes"],
+            "sent_bytes": prepared["sent_bytes"],
+            "bytes_saved": prepared["bytes_saved"],
+        } if prepared else None
+    }
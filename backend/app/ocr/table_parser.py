@@ -0,0 +1,133 @@
+import json
+import re
+from pydantic import ValidationError
+from app.models.attendance import AttendanceTable, AttendanceTotals, SubjectAttendanceRow
+
+# One vision call for the whole table. Rows are positional arrays instead of objects:
+# about half the output tokens of {"subject": ..., "attended": ...}, and output tokens
+# are what this call's latency grows with.
+TABLE_PROMPT = (
+    "Read the attendance table in this image. Reply with JSON only, in exactly this shape: "
+    '{"rows": [["<subject>", <attended>, <held>, <percent>], ...], "total": [<attended>, <held>, <percent>]}. '
+    "One entry per subject row, top to bottom. Numbers exactly as printed; null for a missing or unreadable cell. "
+    "The total comes from the TOTAL row."
+)
+
+# Rounding in the printed table (e.g. 92.156 shown as 92.16, or as 92)
+PERCENT_TOLERANCE = 0.6
+
+def _json_object(content: str) -> dict:
+    # Tolerate ```json fences or a sentence around the object
+    start, end = content.find("{"), content.rfind("}")
+    if start < 0 or end <= start:
+        raise ValueError("no JSON object in the response")
+    return json.loads(content[start:end + 1])
+
+def _row(entry):
+    if isinstance(entry, dict):
+        return entry
+    subject, attended, held, percent = (list(entry) + [None] * 4)[:4]
+    return {"subject": subject, "attended": attended, "held": held, "percent": percent}
+
+def _row_label(entry):
+    subject = entry.get("subject") if isinstance(entry, dict) else (entry[0] if isinstance(entry, list) and entry else None)
+    return subject if isinstance(subject, str) and subject else "?"
+
+def _total(entry):
+    if isinstance(entry, dict) or entry is None:
+        return entry or {}
+    attended, held, percent = (list(entry) + [None] * 3)[:3]
+    return {"attended": attended, "held": held, "percent": percent}
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in e['loc']) or 'row'}: {e['msg']}" for e in error.errors())
+
+def parse_table_response(content: str) -> AttendanceTable:
+    """
+    Model output -> validated AttendanceTable, row by row: an unreadable cell (null) or a misread
+    row only drops that row, listed in `rejected`. Raises ValueError when it isn't the table we
+    asked for, or when nothing usable is left.
+    """
+    try:
+        raw = _json_object(content)
+        entries = raw.get("rows", raw.get("subjects", []))
+        raw_total = raw.get("total")
+        if not isinstance(entries, list):
+            raise TypeError("rows is not a list")
+    except (json.JSONDecodeError, TypeError, AttributeError) as e:
+        raise ValueError(f"invalid attendance table: {e}")
+
+    table = AttendanceTable()
+    for number, entry in enumerate(entries, start=1):
+        try:
+            table.subjects.append(SubjectAttendanceRow(**_row(entry)))
+        except (ValidationError, TypeError) as e:
+            detail = _validation_message(e) if isinstance(e, ValidationError) else str(e)
+            table.rejected.append(f"row {number} ({_row_label(entry)}) skipped: {detail}")
+    try:
+        table.total = AttendanceTotals(**_total(raw_total))
+    except (ValidationError, TypeError) as e:
+        detail = _validation_message(e) if isinstance(e, ValidationError) else str(e)
+        table.rejected.append(f"TOTAL skipped: {detail}")
+
+    if not table.subjects and table.total.percent is None:
+        raise ValueError(f"invalid attendance table: no usable rows ({'; '.join(table.rejected) or 'empty'})")
+
+    # Fill in percentages the model left out
+    for row in table.subjects:
+        if row.percent is None and row.held > 0:
+            row.percent = round(row.attended / row.held * 100, 2)
+    return table
+
+def check_consistency(table: AttendanceTable) -> dict:
+    """
+    Does the table add up? Row sums vs the TOTAL row, and every percentage vs attended/held.
+    """
+    issues = list(table.rejected)
+    attended = sum(row.attended for row in table.subjects)
+    held = sum(row.held for row in table.subjects)
+    total = table.total
+
+    if total.attended is not None and total.attended != attended:
+        issues.append(f"attended: rows add up to {attended}, TOTAL says {total.attended}")
+    if total.held is not None and total.held != held:
+        issues.append(f"held: rows add up to {held}, TOTAL says {total.held}")
+
+    for row in table.subjects:
+        if row.held > 0 and abs(row.attended / row.held * 100 - row.percent) > PERCENT_TOLERANCE:
+            issues.append(f"{row.subject}: {row.attended}/{row.held} is not {row.percent}%")
+
+    total_attended = total.attended if total.attended is not None else attended
+    total_held = total.held if total.held is not None else held
+    if total.percent is not None and total_held > 0 and \
+            abs(total_attended / total_held * 100 - total.percent) > PERCENT_TOLERANCE:
+        issues.append(f"TOTAL: {total_attended}/{total_held} is not {total.percent}%")
+
+    return {"ok": not issues and bool(table.subjects), "rows": len(table.subjects),
+            "attended": attended, "held": held, "issues": issues}
+
+def overall_percent(table: AttendanceTable) -> float:
+    # The printed TOTAL wins; otherwise work it out from the counts
+    total = table.total
+    if total.percent is not None:
+        return float(total.percent)
+    attended = total.attended if total.attended is not None else sum(row.attended for row in table.subjects)
+    held = total.held if total.held is not None else sum(row.held for row in table.subjects)
+    return round(attended / held * 100, 2) if held else 0.0
+
+def parse_total_percent(content: str) -> float:
+    """
+    The last percentage-looking number in free text (the single-number prompt and the fallback
+    when a table can't be parsed). 0.0 when nothing plausible is found.
+    """
+    # 1. Extract the Number (Robust Regex)
+    matches = re.findall(r"(\d+\.\d+)", content)
+    if matches:
+        percent = float(matches[-1])
+        if 0 <= percent <= 100:
+            return percent
+
+    # Fallback for Integers
+    int_matches = re.findall(r"(\d+)", content)
+    valid_ints = [int(x) for x in int_matches if 50 <= int(x) <= 100]
+    return float(valid_ints[-1]) if valid_ints else 0.0
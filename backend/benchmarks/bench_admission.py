@@ -0,0 +1,127 @@
+"""
+Admission control under abuse: do well-behaved users keep their latency while one client hammers
+the expensive routes?
+
+Same in-process stack as benchmarks.load_test (real app, fake Gemini/Groq, Mongo stand-in).
+--users well-behaved users predict / read history / read the timetable with think time, in 3 phases:
+1. baseline:   no abuser, admission control on
+2. unprotected: one abusive client (--abuser-concurrency parallel loops at --abuser-rps in total,
+                ignores Retry-After) on /predict/ and /ocr/scan, admission control off
+3. protected:  same abuser, admission control on
+p99 of the well-behaved users should stay close to the baseline in phase 3 while the abuser
+collects 429s (its own token bucket) and, if it still gets through, 503s (class queue full).
+
+Run from backend/:  python -m benchmarks.bench_admission --users 40 --duration 20
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.load_test import Recorder, VirtualUser, in_process_app, parse_mix
+from benchmarks.report import summarize, print_table, save_results
+
+WELL_BEHAVED_MIX = "predict=4,history=1,timetable=1"
+
+async def hammer(abuser, deadline, ocr_every, interval):
+    # Paced, not a tight loop: in-process, an unpaced client would mostly measure its own CPU use
+    sent = 0
+    next_at = time.perf_counter()
+    while time.perf_counter() < deadline:
+        sent += 1
+        if sent % ocr_every == 0:
+            await abuser.ocr()
+        else:
+            await abuser.predict()
+        next_at += interval
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+
+async def run_phase(name, users, abuser, abusive, args, mix, admission):
+    from app.core.admission import admission_controller
+
+    admission_controller.enabled = admission
+    good, bad = Recorder(), Recorder()
+    for user in users:
+        user.recorder = good
+    abuser.recorder = bad
+
+    print(f"▶️  {name}: admission {'on' if admission else 'off'}, abuser {'on' if abusive else 'off'}")
+    started = time.perf_counter()
+    deadline = started + args.duration
+    tasks = [user.run(deadline, mix, args.think_ms) for user in users]
+    if abusive:
+        interval = args.abuser_concurrency / args.abuser_rps
+        tasks += [hammer(abuser, deadline, args.abuser_ocr_every, interval) for _ in range(args.abuser_concurrency)]
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    everything = [ms for latencies in good.latencies.values() for ms in latencies]
+    results = {
+        route: summarize(latencies, elapsed, good.errors.get(route, 0))
+        for route, latencies in sorted(good.latencies.items())
+    }
+    results["ALL (well-behaved)"] = summarize(everything, elapsed, sum(good.errors.values()))
+    abuse_statuses = {}
+    for statuses in bad.statuses.values():
+        for status, count in statuses.items():
+            abuse_statuses[status] = abuse_statuses.get(status, 0) + count
+    return {"well_behaved": results, "abuser_statuses": abuse_statuses,
+            "abuser_requests": sum(abuse_statuses.values())}
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=40, help="Well-behaved users")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per phase")
+    parser.add_argument("--think-ms", type=float, default=1500.0, help="Mean pause between a user's requests")
+    parser.add_argument("--abuser-concurrency", type=int, default=64, help="Parallel request loops of the abuser")
+    parser.add_argument("--abuser-rps", type=float, default=100.0, help="Requests/second the abuser aims for")
+    parser.add_argument("--abuser-ocr-every", type=int, default=5, help="Every Nth abusive request is an OCR scan")
+    parser.add_argument("--mongo-url", default=None)
+    parser.add_argument("--gemini-latency-ms", type=float, default=400.0)
+    parser.add_argument("--groq-latency-ms", type=float, default=1200.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--unlimited-providers", action="store_true",
+                        help="Lift the Gemini/Groq rate limits (by default the abuser competes for the real quotas)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+    # Provider quotas are the shared resource an abuser takes from everyone else
+    args.real_rate_limits = not args.unlimited_providers
+    # Starts off so sign-ups (all from one address) aren't throttled; the phases switch it
+    args.admission = False
+
+    mix = parse_mix(WELL_BEHAVED_MIX)
+    async with in_process_app(args) as (client, fake, config):
+        users = [VirtualUser(client, i, Recorder(), args.seed) for i in range(args.users)]
+        abuser = VirtualUser(client, args.users, Recorder(), args.seed)
+        semaphore = asyncio.Semaphore(10)
+
+        async def setup(user):
+            async with semaphore:
+                await user.setup()
+
+        print(f"👥 Signing up {len(users)} users + 1 abuser...")
+        await asyncio.gather(*(setup(user) for user in users + [abuser]))
+
+        results = {}
+        for name, abusive, admission in (("baseline", False, True), ("unprotected", True, False),
+                                         ("protected", True, True)):
+            results[name] = await run_phase(name, users, abuser, abusive, args, mix, admission)
+        config["fake_provider_calls"] = dict(fake.state.calls)
+
+    for name, phase in results.items():
+        print(f"\n=== {name} (abuser: {phase['abuser_requests']} requests, {phase['abuser_statuses']}) ===")
+        print_table(phase["well_behaved"])
+
+    baseline_p99 = results["baseline"]["well_behaved"]["ALL (well-behaved)"]["p99_ms"]
+    print()
+    for name in ("unprotected", "protected"):
+        p99 = results[name]["well_behaved"]["ALL (well-behaved)"]["p99_ms"]
+        ratio = p99 / baseline_p99 if baseline_p99 else 0.0
+        print(f"{name:>12}: well-behaved p99 {p99:8.1f}ms ({ratio:.2f}x baseline {baseline_p99:.1f}ms)")
+
+    if not args.no_save:
+        save_results("admission", results, config=config)
+
+if __name__ == "__main__":
+    asyncio.run(main())
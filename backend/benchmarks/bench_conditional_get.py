@@ -0,0 +1,103 @@
+"""
+Conditional GETs on the polled routes: checks the 304 behaviour and measures bytes saved.
+
+Needs a running API (and MongoDB). Signs up a throwaway user, then for /timetable/ and
+/history/my-logs: plain GET -> ETag, repeat with If-None-Match -> 304, change the data -> 200 again.
+
+Run from backend/:  python -m benchmarks.bench_conditional_get --base-url http://127.0.0.1:8000 --polls 200
+"""
+import argparse
+import time
+import uuid
+
+import httpx
+
+API = "/api/v1"
+
+def wire_bytes(response: httpx.Response) -> int:
+    # Body plus header lines as sent by the server
+    headers = sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+    return len(response.content) + headers
+
+def login(client: httpx.Client) -> dict:
+    username = f"bench-{uuid.uuid4().hex[:10]}@example.com"
+    password = "bench-password"
+    client.post(f"{API}/auth/signup", json={
+        "full_name": "Bench User", "username": username, "password": password,
+        "roll_number": "BENCH", "branch": "CSE",
+    }).raise_for_status()
+    token = client.post(f"{API}/auth/login", data={"username": username, "password": password})
+    token.raise_for_status()
+    return {"Authorization": f"Bearer {token.json()['access_token']}"}
+
+def poll(client, path, headers, polls):
+    """
+    Returns (bytes, seconds) for `polls` plain GETs and for `polls` conditional GETs.
+    """
+    first = client.get(path, headers=headers)
+    first.raise_for_status()
+    etag = first.headers.get("ETag")
+    assert etag, f"{path}: no ETag header"
+
+    results = {}
+    for mode, extra in (("plain", {}), ("conditional", {"If-None-Match": etag})):
+        total, start = 0, time.perf_counter()
+        for _ in range(polls):
+            response = client.get(path, headers={**headers, **extra})
+            expected = 304 if extra else 200
+            assert response.status_code == expected, f"{path}: {mode} got {response.status_code}"
+            if extra:
+                assert response.headers.get("ETag") == etag and not response.content
+            total += wire_bytes(response)
+        results[mode] = (total, time.perf_counter() - start)
+    return etag, results
+
+def report(path, results, polls):
+    plain_bytes, plain_s = results["plain"]
+    cond_bytes, cond_s = results["conditional"]
+    print(f"{path}")
+    print(f"  plain:       {plain_bytes / polls:8.0f} B/poll  {plain_s / polls * 1000:6.2f} ms/poll")
+    print(f"  conditional: {cond_bytes / polls:8.0f} B/poll  {cond_s / polls * 1000:6.2f} ms/poll"
+          f"  ({(1 - cond_bytes / plain_bytes) * 100:.0f}% fewer bytes)")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--polls", type=int, default=100)
+    parser.add_argument("--flush-wait", type=float, default=1.0, help="Seconds to let the history buffer flush")
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.base_url, timeout=30) as client:
+        headers = login(client)
+
+        # 1. Timetable
+        timetable = {day: ["Maths", "Physics", "DSA Lab", "DSA Lab", "OS", "DBMS"]
+                     for day in ("monday", "tuesday", "wednesday", "thursday", "friday")}
+        client.post(f"{API}/timetable/", json=timetable, headers=headers).raise_for_status()
+        etag, results = poll(client, f"{API}/timetable/", headers, args.polls)
+        report("/timetable/", results, args.polls)
+
+        client.post(f"{API}/timetable/", json={**timetable, "saturday": ["OS"]}, headers=headers).raise_for_status()
+        after = client.get(f"{API}/timetable/", headers={**headers, "If-None-Match": etag})
+        assert after.status_code == 200 and after.headers["ETag"] != etag, "timetable update did not change the ETag"
+        print("  ✅ update -> 200 with a new ETag")
+
+        # 2. History (needs some logs; /predict/batch only uses Vintage Math)
+        row = {
+            "overall_attendance": 80.0, "is_core_subject": 1, "days_to_exam": 20, "semester_phase": 1,
+            "faculty_strictness": 2, "is_lab": False, "has_proxy": False, "bunked_last_class": False,
+            "is_first_period": False, "filename": "bench.png",
+        }
+        client.post(f"{API}/predict/batch", json=[row] * 10, headers=headers).raise_for_status()
+        time.sleep(args.flush_wait)
+        etag, results = poll(client, f"{API}/history/my-logs?limit=10", headers, args.polls)
+        report("/history/my-logs", results, args.polls)
+
+        client.post(f"{API}/predict/batch", json=[row], headers=headers).raise_for_status()
+        time.sleep(args.flush_wait)
+        after = client.get(f"{API}/history/my-logs?limit=10", headers={**headers, "If-None-Match": etag})
+        assert after.status_code == 200 and after.headers["ETag"] != etag, "new history did not change the ETag"
+        print("  ✅ new prediction -> 200 with a new ETag")
+
+if __name__ == "__main__":
+    main()
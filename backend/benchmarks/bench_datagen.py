@@ -0,0 +1,23 @@
+"""
+Times the vectorized generator (seed stability and rule parity: tests/test_training_data.py).
+
+Run from backend/:  python -m benchmarks.bench_datagen --rows 5000000
+"""
+import argparse
+import time
+
+from app.ml.train_model import generate_strict_btech_data
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    generate_strict_btech_data(args.rows, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"Generated {args.rows:,} rows in {elapsed:.2f}s ({args.rows / elapsed:,.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+What a login storm does to every OTHER request on the worker.
+
+A probe coroutine stands in for a cheap route (history, timetable, ...): it sleeps 5ms in a loop
+and records how late it wakes up. We run it while N concurrent logins verify bcrypt hashes,
+first inline on the event loop (old behaviour) and then on the bounded hashing pool.
+
+Run from backend/:  python -m benchmarks.bench_login_storm --logins 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.security import get_password_hash, verify_password, verify_password_async, hashing_pool
+
+PROBE_INTERVAL = 0.005
+
+async def probe(stop: asyncio.Event, delays: list):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        delays.append((loop.time() - start - PROBE_INTERVAL) * 1000)
+
+async def storm(mode: str, logins: int, concurrency: int, hashed: str):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def inline_login():
+        async with semaphore:
+            verify_password("correct horse", hashed)
+            await asyncio.sleep(0)
+
+    async def pooled_login():
+        async with semaphore:
+            await verify_password_async("correct horse", hashed)
+
+    login = inline_login if mode == "inline" else pooled_login
+    stop, delays = asyncio.Event(), []
+    probe_task = asyncio.create_task(probe(stop, delays))
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+    return elapsed, delays
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    hashed = get_password_hash("correct horse")
+    print(f"bcrypt pool: {hashing_pool._max_workers} threads")
+    for mode in ("inline", "pooled"):
+        elapsed, delays = await storm(mode, args.logins, args.concurrency, hashed)
+        delays = delays or [0.0]
+        print(f"{mode:>6}: {args.logins / elapsed:6.1f} logins/s | other-route extra latency "
+              f"p50={statistics.median(delays):7.1f}ms p99={percentile(delays, 99):7.1f}ms "
+              f"max={max(delays):7.1f}ms ({len(delays)} probes)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
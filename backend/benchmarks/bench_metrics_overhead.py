@@ -0,0 +1,63 @@
+"""
+Cost of the metrics layer: raw observe(), a timing span, and the ASGI middleware
+wrapped around a no-op app (what every request pays).
+
+Run from backend/:  python -m benchmarks.bench_metrics_overhead
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.metrics import Histogram, MetricsMiddleware, track_upstream, registry
+
+class _Route:
+    path = "/api/v1/predict/"
+
+async def noop_app(scope, receive, send):
+    scope["route"] = _Route()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+async def send(message):
+    pass
+
+def per_call_ns(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e9
+
+async def per_request_ns(app, n):
+    scope = {"type": "http", "method": "POST", "path": "/api/v1/predict/"}
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / n * 1e9
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=200_000)
+    args = parser.parse_args()
+
+    histogram = Histogram("bench_seconds", "bench", labels=("route",))
+    print(f"Histogram.observe:      {per_call_ns(lambda: histogram.observe(0.012, route='/x'), args.n):8.0f} ns")
+
+    def span():
+        with track_upstream("bench"):
+            pass
+    print(f"track_upstream span:    {per_call_ns(span, args.n):8.0f} ns")
+
+    bare = asyncio.run(per_request_ns(noop_app, args.n))
+    wrapped = asyncio.run(per_request_ns(MetricsMiddleware(noop_app), args.n))
+    print(f"ASGI request (bare):    {bare:8.0f} ns")
+    print(f"ASGI request (metrics): {wrapped:8.0f} ns  -> +{wrapped - bare:.0f} ns per request")
+
+    start = time.perf_counter()
+    body = registry.render()
+    print(f"/metrics render:        {(time.perf_counter() - start) * 1000:8.2f} ms ({len(body):,} bytes)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Microbenchmarks for the per-request hot paths: Vintage Math, JWT create/verify, password hashing.
+
+Run from backend/:  python -m benchmarks.bench_micro --repeat 5000
+"""
+import argparse
+import asyncio
+from datetime import timedelta
+
+from jose import jwt
+
+from app.api.predict_routes import PredictionRequest, calculate_vintage_risk
+from app.core.config import settings
+from app.core.security import (
+    create_access_token, decode_token_claims, get_current_user, get_password_hash, verify_password
+)
+from benchmarks.report import summarize, time_calls, print_table, save_results
+
+def sample_request():
+    return PredictionRequest(
+        overall_attendance=72.5, is_core_subject=1, days_to_exam=5, semester_phase=1, faculty_strictness=3,
+        is_lab=True, has_proxy=False, bunked_last_class=True, is_first_period=False, filename="bench.png",
+    )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5000)
+    parser.add_argument("--hash-repeat", type=int, default=20, help="bcrypt is slow; fewer rounds")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    data = sample_request()
+
+    # 1. Vintage Math (the copy mirrors predict_risk, which scores data.model_copy())
+    latencies, elapsed = time_calls(lambda: calculate_vintage_risk(data.model_copy()), args.repeat)
+    results["calculate_vintage_risk"] = summarize(latencies, elapsed)
+
+    # 2. JWTs
+    claims = {"sub": "bench@example.com", "role": "student"}
+    expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    latencies, elapsed = time_calls(lambda: create_access_token(claims, expires), args.repeat)
+    results["create_access_token"] = summarize(latencies, elapsed)
+
+    token = create_access_token(claims, expires)
+    latencies, elapsed = time_calls(
+        lambda: jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]), args.repeat)
+    results["jwt.decode (uncached)"] = summarize(latencies, elapsed)
+
+    latencies, elapsed = time_calls(lambda: decode_token_claims(token), args.repeat)
+    results["decode_token_claims (cached)"] = summarize(latencies, elapsed)
+
+    loop = asyncio.new_event_loop()
+    try:
+        latencies, elapsed = time_calls(lambda: loop.run_until_complete(get_current_user(token)), args.repeat)
+    finally:
+        loop.close()
+    results["get_current_user"] = summarize(latencies, elapsed)
+
+    # 3. Password hashing at the configured bcrypt cost
+    latencies, elapsed = time_calls(lambda: get_password_hash("correct horse"), args.hash_repeat)
+    results[f"bcrypt hash (cost {settings.BCRYPT_ROUNDS})"] = summarize(latencies, elapsed)
+
+    hashed = get_password_hash("correct horse")
+    latencies, elapsed = time_calls(lambda: verify_password("correct horse", hashed), args.hash_repeat)
+    results[f"bcrypt verify (cost {settings.BCRYPT_ROUNDS})"] = summarize(latencies, elapsed)
+
+    print_table(results)
+    if not args.no_save:
+        save_results("micro", results, config=vars(args))
+
+if __name__ == "__main__":
+    main()
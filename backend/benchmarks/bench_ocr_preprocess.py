@@ -0,0 +1,50 @@
+"""
+Bytes saved and time spent by the OCR preprocessing stage.
+
+Run from backend/:
+    python -m benchmarks.bench_ocr_preprocess path/to/screenshot.png path/to/photo.jpg
+With no paths it renders synthetic attendance tables (phone-photo and screenshot sized).
+"""
+import argparse
+import io
+import time
+
+from app.ocr.image_preprocessor import preprocess_image
+
+def synthetic_samples():
+    from PIL import Image, ImageDraw
+
+    samples = {}
+    for name, size, fmt in [("photo_4000x3000.jpg", (4000, 3000), "JPEG"),
+                            ("screenshot_1170x2532.png", (1170, 2532), "PNG")]:
+        img = Image.new("RGB", size, "white")
+        draw = ImageDraw.Draw(img)
+        rows = 12
+        for r in range(rows + 1):
+            y = int(size[1] * 0.1 + r * size[1] * 0.8 / rows)
+            draw.line([(0, y), (size[0], y)], fill="black", width=3)
+            draw.text((20, y + 10), f"SUBJECT {r}    {30 + r}    {40 + r}    {75 + r}.{r}0", fill="black")
+        draw.text((int(size[0] * 0.75), int(size[1] * 0.88)), "TOTAL 82.35", fill="black")
+        out = io.BytesIO()
+        img.save(out, format=fmt, quality=95)
+        samples[name] = out.getvalue()
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("images", nargs="*")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = {path: open(path, "rb").read() for path in args.images} or synthetic_samples()
+    for name, data in samples.items():
+        for crop in (False, True):
+            start = time.perf_counter()
+            for _ in range(args.repeats):
+                result = preprocess_image(data, crop_roi=crop)
+            ms = (time.perf_counter() - start) / args.repeats * 1000
+            print(f"{name:<28} crop={str(crop):<5} {result['original_bytes']:>10,} -> {result['sent_bytes']:>9,} bytes "
+                  f"({result['bytes_saved'] / result['original_bytes']:.0%} saved, {result['mime_type']}) in {ms:.1f}ms")
+
+if __name__ == "__main__":
+    main()
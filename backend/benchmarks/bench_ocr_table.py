@@ -0,0 +1,82 @@
+"""
+Full-table OCR vs the TOTAL-only prompt.
+
+Offline (default): parse + validate + consistency-check cost of a table answer, and how many output
+tokens the compact row arrays save over a verbose JSON shape (output tokens drive the call's latency).
+
+Live (--image, needs GROQ_API_KEY): sends the same screenshot with both prompts --repeat times and
+compares end-to-end latency and what came back.
+
+Run from backend/:
+    python -m benchmarks.bench_ocr_table
+    python -m benchmarks.bench_ocr_table --image screenshot.png --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from app.ocr.table_parser import parse_table_response, check_consistency, overall_percent
+from benchmarks.fake_providers import FAKE_TABLE
+
+def approx_tokens(text: str) -> int:
+    # ~4 characters per token for English/JSON is close enough for a comparison
+    return max(1, len(text) // 4)
+
+def verbose_shape(table):
+    return {
+        "subjects": [dict(zip(("subject", "attended", "held", "percent"), row)) for row in table["rows"]],
+        "total": dict(zip(("attended", "held", "percent"), table["total"])),
+    }
+
+def offline(repeat):
+    compact = json.dumps(FAKE_TABLE)
+    verbose = json.dumps(verbose_shape(FAKE_TABLE))
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        table = parse_table_response(compact)
+        check = check_consistency(table)
+    parse_us = (time.perf_counter() - start) / repeat * 1e6
+
+    print(f"rows: {len(table.subjects)}  overall: {overall_percent(table)}%  consistent: {check['ok']}")
+    print(f"parse + validate + check: {parse_us:.1f}us per table")
+    print(f"output tokens (approx): TOTAL-only {approx_tokens('82.68')}, "
+          f"table compact {approx_tokens(compact)}, table verbose {approx_tokens(verbose)}")
+
+async def live(image_path, repeat):
+    from app.ocr.image_preprocessor import preprocess_image
+    from app.ocr.ocr_processor import extract_attendance_from_image
+    from app.core.upstream import upstream
+
+    with open(image_path, "rb") as f:
+        image_bytes = f.read()
+    try:
+        for table_mode in (False, True):
+            prepared = preprocess_image(image_bytes, crop_roi=False if table_mode else None)
+            latencies, data = [], {}
+            for _ in range(repeat):
+                start = time.perf_counter()
+                data = await extract_attendance_from_image(prepared["image_bytes"], prepared["mime_type"], table_mode)
+                latencies.append((time.perf_counter() - start) * 1000)
+            label = "table" if table_mode else "TOTAL-only"
+            print(f"{label:>10}: p50 {statistics.median(latencies):7.0f}ms  max {max(latencies):7.0f}ms  "
+                  f"sent {prepared['sent_bytes']} bytes  overall {data.get('overall_attendance')}  "
+                  f"rows {len(data.get('subjects', []))}  check {data.get('table_check')}")
+    finally:
+        await upstream.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--image", help="Attendance screenshot for the live comparison")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.image:
+        asyncio.run(live(args.image, min(args.repeat, 10)))
+    else:
+        offline(args.repeat)
+
+if __name__ == "__main__":
+    main()
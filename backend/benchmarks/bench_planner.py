@@ -0,0 +1,103 @@
+"""
+Full-semester /predict/plan benchmark: one vectorized plan vs. the old "one /predict/ per class" loop.
+Also checks that every slot's risk matches the scalar Vintage Math function.
+
+Run from backend/:  python -m benchmarks.bench_planner --weeks 18
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from app.api.predict_routes import PredictionRequest, calculate_vintage_risk
+from app.ml.bunk_planner import WEEKDAYS, NO_EXAM_DAYS, plan_semester
+
+SUBJECTS = ["Maths", "Physics", "Chemistry", "DSA", "DBMS", "OS", "Networks", "Physics Lab", "DSA Lab"]
+
+def random_timetable(periods_per_day=7, seed=42):
+    rng = random.Random(seed)
+    return {day: [rng.choice(SUBJECTS + [""]) for _ in range(periods_per_day)] for day in WEEKDAYS}
+
+def random_attendance(seed=42):
+    rng = random.Random(seed)
+    attendance = {}
+    for name in SUBJECTS:
+        held = rng.randint(20, 60)
+        attendance[name] = {"attended": rng.randint(int(held * 0.6), held), "held": held}
+    return attendance
+
+def scalar_plan_risks(timetable, attendance, start, weeks, exam_dates, strictness):
+    """
+    What the frontend did before: one Vintage Math call per remaining class.
+    """
+    exams = sorted(exam_dates)
+    risks = []
+    for offset in range(weeks * 7):
+        day = start + timedelta(days=offset)
+        if day.weekday() >= len(WEEKDAYS):
+            continue
+        upcoming = [e for e in exams if e >= day]
+        for period, name in enumerate(timetable.get(WEEKDAYS[day.weekday()], [])):
+            if not name:
+                continue
+            counts = attendance.get(name, {"attended": 0, "held": 0})
+            pct = counts["attended"] / counts["held"] * 100 if counts["held"] else 100.0
+            row = PredictionRequest(
+                overall_attendance=pct,
+                is_core_subject=1,
+                days_to_exam=(upcoming[0] - day).days if upcoming else NO_EXAM_DAYS,
+                semester_phase=1,
+                faculty_strictness=strictness.get(name, 2),
+                is_lab="lab" in name.lower(),
+                has_proxy=False,
+                bunked_last_class=False,
+                is_first_period=period == 0,
+                filename="plan",
+            )
+            message = calculate_vintage_risk(row)["message"]
+            risks.append(float(message.split("Risk: ")[1].split("%")[0]))
+    return risks
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weeks", type=int, default=18)
+    parser.add_argument("--periods", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    start = date(2026, 7, 6)
+    timetable = random_timetable(args.periods)
+    attendance = random_attendance()
+    exam_dates = [start + timedelta(weeks=8), start + timedelta(weeks=args.weeks)]
+    strictness = {"Maths": 3, "OS": 1}
+
+    # 1. Parity: the message only carries int(risk) and slots carry round(risk, 1), so allow 1 apart
+    plan = plan_semester(timetable, attendance, start, args.weeks, exam_dates, strictness)
+    scalar = scalar_plan_risks(timetable, attendance, start, args.weeks, exam_dates, strictness)
+    vector = [slot["risk"] for slot in plan["slots"]]
+    if len(vector) != len(scalar) or any(abs(v - s) > 1 for v, s in zip(vector, scalar)):
+        raise AssertionError("Slot risks differ between the planner and calculate_vintage_risk")
+    print(f"✅ Parity OK on {len(scalar)} slots ({args.weeks} weeks x {args.periods} periods)")
+
+    # 2. Timing
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        plan_semester(timetable, attendance, start, args.weeks, exam_dates, strictness)
+    planner_ms = (time.perf_counter() - t0) / args.repeat * 1000
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        plan_semester(timetable, attendance, start, args.weeks, exam_dates, strictness, include_slots=False)
+    summary_ms = (time.perf_counter() - t0) / args.repeat * 1000
+
+    t0 = time.perf_counter()
+    scalar_plan_risks(timetable, attendance, start, args.weeks, exam_dates, strictness)
+    scalar_ms = (time.perf_counter() - t0) * 1000
+
+    print(f"plan_semester (with slots): {planner_ms:8.2f} ms")
+    print(f"plan_semester (summary):    {summary_ms:8.2f} ms")
+    print(f"per-slot scalar loop:       {scalar_ms:8.2f} ms  ({len(scalar)} calls, no HTTP round trips counted)")
+    print(f"total_max_bunks={plan['total_max_bunks']} safe_slots={plan['safe_slot_count']}")
+
+if __name__ == "__main__":
+    main()
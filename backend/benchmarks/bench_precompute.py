@@ -0,0 +1,109 @@
+"""
+Nightly verdict precompute: scoring throughput, and a full run against MongoDB.
+
+1. score_batch alone (pure NumPy scoring of one batch of users), in slot verdicts per second.
+2. VerdictPrecomputer.run over --users synthetic users with timetables + summaries, through
+   the real batching/checkpoint/pause loop. Uses the in-memory stand-in unless --mongo-url is given.
+   The run is stopped halfway (like a deploy) and a second precomputer with another owner,
+   standing in for the restarted process, resumes it from the checkpoint.
+
+Run from backend/:  python -m benchmarks.bench_precompute --users 20000
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+from app.ml.precompute import VerdictPrecomputer, score_batch, COLLECTION, JOB_STATE_COLLECTION, JOB_NAME
+from app.db.summaries import COLLECTION as SUMMARY_COLLECTION
+from benchmarks.bench_planner import random_timetable
+from benchmarks.mongo_standin import create_mongo_client, describe
+from benchmarks.report import save_results
+
+def synthetic_users(n, seed=3):
+    rng = random.Random(seed)
+    users = [{"username": f"student{i}@example.com", "timetable": random_timetable(seed=seed + i)} for i in range(n)]
+    attendance = {user["username"]: round(rng.uniform(55, 99), 2) for user in users}
+    return users, attendance
+
+async def seed_database(database, users, attendance):
+    await database["users"].delete_many({})
+    await database[SUMMARY_COLLECTION].delete_many({})
+    await database[COLLECTION].delete_many({})
+    await database[JOB_STATE_COLLECTION].delete_many({})
+    for start in range(0, len(users), 1000):
+        chunk = users[start:start + 1000]
+        await database["users"].insert_many([dict(user) for user in chunk])
+        await database[SUMMARY_COLLECTION].insert_many(
+            [{"_id": user["username"], "latest_attendance": attendance[user["username"]]} for user in chunk])
+
+async def interrupt_after(precomputer, task, users_before_stop):
+    while not task.done():
+        state = await precomputer.database[JOB_STATE_COLLECTION].find_one({"_id": JOB_NAME}) or {}
+        if state.get("processed_users", 0) >= users_before_stop:
+            return state["processed_users"]
+        await asyncio.sleep(0.01)
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.0, help="Pause between batches (prod default 0.2s)")
+    parser.add_argument("--mongo-url", default=None)
+    parser.add_argument("--database", default="bench_precompute")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    target = date.today() + timedelta(days=1)
+    users, attendance = synthetic_users(args.users)
+    results = {}
+
+    # 1. Scoring only
+    batch = users[:args.batch_size]
+    start = time.perf_counter()
+    per_user = score_batch(batch, attendance, target)
+    elapsed = time.perf_counter() - start
+    rows = sum(len(slots) for slots in per_user.values())
+    results["score_batch"] = {"users": len(batch), "rows": rows, "seconds": round(elapsed, 4),
+                              "rows_per_second": round(rows / elapsed, 1)}
+    print(f"score_batch: {len(batch)} users, {rows} slot verdicts in {elapsed * 1000:.1f}ms "
+          f"({rows / elapsed:,.0f} rows/s)")
+
+    # 2. Full run, interrupted halfway and resumed
+    client = create_mongo_client(args.mongo_url)
+    database = client[args.database]
+    try:
+        await seed_database(database, users, attendance)
+        precomputer = VerdictPrecomputer(batch_size=args.batch_size, pause_seconds=args.pause,
+                                         run_at_hour=2, lease_seconds=600)
+        precomputer.database = database
+
+        # Run it as the scheduler would, so stop() behaves like a shutdown (cancel + release the lease)
+        precomputer._task = asyncio.create_task(precomputer.run(target))
+        stopped_at = await interrupt_after(precomputer, precomputer._task, args.users // 2)
+        await precomputer.stop()
+        print(f"⏸️  Stopped after {stopped_at} users, resuming in a new process...")
+
+        restarted = VerdictPrecomputer(batch_size=args.batch_size, pause_seconds=args.pause,
+                                       run_at_hour=2, lease_seconds=600)
+        restarted.owner = f"{precomputer.owner}-restarted"
+        restarted.database = database
+        summary = await restarted.run(target)
+        assert summary is not None, "restarted process could not take over the lease"
+        stored = await database[COLLECTION].count_documents({"date": target.isoformat()})
+        assert summary["processed_users"] == args.users, summary
+        print(f"✅ {stored} verdict documents for {target} ({describe(args.mongo_url)}); "
+              f"resumed run: {summary['rows_per_second']:,.0f} rows/s")
+        results["run"] = {**summary, "documents": stored, "interrupted_after_users": stopped_at,
+                          "mongo": describe(args.mongo_url)}
+    finally:
+        if args.mongo_url:
+            await client.drop_database(args.database)
+        client.close()
+
+    if not args.no_save:
+        save_results("precompute", results, config=vars(args))
+
+if __name__ == "__main__":
+    asyncio.run(main())
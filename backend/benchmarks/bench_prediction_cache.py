@@ -0,0 +1,70 @@
+"""
+Prediction cache: hit ratio per attendance bucket size on a synthetic request stream, plus lookup cost.
+
+Requests imitate a class: a few hundred students, attendance clustered around 70-90%,
+re-submissions of the same form, and a handful of exam/lab/proxy combinations.
+Each miss "costs" a Gemini call of --upstream-ms, which is what the hits save.
+
+Run from backend/:  python -m benchmarks.bench_prediction_cache --requests 20000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from app.api.predict_routes import PredictionRequest
+from app.ml.prediction_cache import PredictionCache
+
+def request_stream(n, students=300, seed=7):
+    rng = random.Random(seed)
+    profiles = [
+        dict(
+            overall_attendance=min(100.0, max(40.0, rng.gauss(80, 8))),
+            is_core_subject=rng.choice([0, 1]),
+            semester_phase=rng.choice([0, 1, 2]),
+            faculty_strictness=rng.choice([1, 2, 3]),
+        )
+        for _ in range(students)
+    ]
+    for _ in range(n):
+        profile = rng.choice(profiles)
+        yield PredictionRequest(
+            # Readings drift a little between submissions (new screenshot, manual edits)
+            overall_attendance=round(profile["overall_attendance"] + rng.uniform(-0.3, 0.3), 2),
+            is_core_subject=profile["is_core_subject"],
+            days_to_exam=rng.choice([2, 5, 10, 20, 30]),
+            semester_phase=profile["semester_phase"],
+            faculty_strictness=profile["faculty_strictness"],
+            is_lab=rng.random() < 0.2,
+            has_proxy=rng.random() < 0.15,
+            bunked_last_class=rng.random() < 0.3,
+            is_first_period=rng.random() < 0.2,
+            filename=f"scan-{rng.randint(0, 10**6)}.png",
+        )
+
+async def run(step, requests, upstream_ms):
+    cache = PredictionCache(maxsize=4096, ttl_seconds=3600, shared=False, attendance_step=step)
+    lookup_s = 0.0
+    for data in request_stream(requests):
+        start = time.perf_counter()
+        key = cache.key(data, "gemini")
+        cached = await cache.get(key)
+        lookup_s += time.perf_counter() - start
+        if cached is None:
+            cache.set(key, {"prediction": "Safe to Bunk 😎", "engine": "gemini"}, upstream_ms / 1000)
+    return cache.stats(), lookup_s / requests * 1e6
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--upstream-ms", type=float, default=900.0, help="Typical Gemini latency")
+    args = parser.parse_args()
+
+    print(f"{'step':>6} {'hit ratio':>10} {'entries':>8} {'saved upstream':>15} {'lookup':>10}")
+    for step in (0.01, 0.1, 0.5, 1.0, 2.0):
+        stats, lookup_us = await run(step, args.requests, args.upstream_ms)
+        print(f"{step:>6} {stats['hit_ratio']:>10.1%} {stats['size']:>8} "
+              f"{stats['saved_upstream_seconds']:>13.0f} s {lookup_us:>8.1f}us")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""
+Import-time / memory budget for `import app.main` (what a scale-to-zero cold start pays).
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter, reports the slowest
+top-level imports, and exits 1 when the total import time or the max RSS goes over budget,
+so it can gate CI:
+
+    cd backend && python -m benchmarks.bench_startup --budget-ms 1500 --budget-rss-mb 120
+
+Budgets default to STARTUP_IMPORT_BUDGET_MS / STARTUP_RSS_BUDGET_MB from the environment.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# Heavy modules that must NOT be imported at startup any more
+FORBIDDEN = ("torch", "numpy", "pandas", "xgboost", "joblib", "PIL")
+
+PROBE = "import resource, app.main; print('RSS_KB', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def run_probe():
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        capture_output=True, text=True, cwd=backend_dir,
+        # Warm-up and Mongo don't run on import, but keep the probe from picking up a real .env
+        env={**os.environ, "WARM_UP_ON_STARTUP": "false"},
+    )
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        raise SystemExit(f"❌ import app.main failed (exit {proc.returncode})")
+
+    imports = []
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            _, cumulative_us, indent, module = match.groups()
+            imports.append((module, int(cumulative_us), len(indent)))
+    rss_kb = int(re.search(r"RSS_KB (\d+)", proc.stdout).group(1))
+    return imports, rss_kb
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500")))
+    parser.add_argument("--budget-rss-mb", type=float, default=float(os.getenv("STARTUP_RSS_BUDGET_MB", "120")))
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    imports, rss_kb = run_probe()
+    top_level = [(module, us) for module, us, depth in imports if depth == 1]
+    total_ms = sum(us for _, us in top_level) / 1000
+    rss_mb = rss_kb / 1024
+
+    print("Slowest top-level imports:")
+    for module, us in sorted(top_level, key=lambda x: -x[1])[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {module}")
+
+    loaded = {module for module, _, _ in imports}
+    heavy = sorted(m for m in FORBIDDEN if m in loaded)
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.0f}ms > {args.budget_ms:.0f}ms")
+    if rss_mb > args.budget_rss_mb:
+        failures.append(f"RSS {rss_mb:.0f}MB > {args.budget_rss_mb:.0f}MB")
+    if heavy:
+        failures.append(f"heavy modules imported at startup: {', '.join(heavy)}")
+
+    print(f"import app.main: {total_ms:.0f}ms, max RSS {rss_mb:.0f}MB")
+    if failures:
+        print("❌ Over budget: " + "; ".join(failures))
+        sys.exit(1)
+    print("✅ Within startup budget")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Compiled tree evaluator vs joblib.load(model_pipeline.pkl): parity, load time, memory, per-row latency.
+
+Run from backend/ (needs xgboost + joblib for the reference side):
+    python -m app.ml.train_model --export-only
+    python -m benchmarks.bench_tree_evaluator
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from app.ml.model_engine import DEFAULT_MODEL_PATH, DEFAULT_COMPILED_TREES_PATH
+
+# Each loader runs in a fresh interpreter so import cost and RSS are measured honestly
+LOADERS = {
+    "joblib": f"import joblib; m = joblib.load({DEFAULT_MODEL_PATH!r})",
+    "compiled": f"from app.ml.tree_evaluator import CompiledTrees; m = CompiledTrees.load({DEFAULT_COMPILED_TREES_PATH!r})",
+}
+
+# /proc/self/status, not getrusage: ru_maxrss survives fork+exec, so every child would report
+# the benchmark process's own peak. VmRSS/VmHWM belong to the child's fresh address space.
+PROBE = """
+import json, time
+def status_mb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+before_mb = status_mb("VmRSS")
+start = time.perf_counter()
+{loader}
+load_ms = (time.perf_counter() - start) * 1000
+rss_mb = status_mb("VmRSS")
+print(json.dumps({{"load_ms": load_ms, "rss_mb": rss_mb, "peak_rss_mb": status_mb("VmHWM"),
+                  "loaded_mb": rss_mb - before_mb}}))
+"""
+
+def measure_load(name):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(loader=LOADERS[name])],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def random_features(n, feature_names, seed=7):
+    rng = np.random.default_rng(seed)
+    ranges = {
+        "overall_attendance": (40.0, 100.0), "days_to_exam": (0, 40), "semester_phase": (0, 3),
+        "faculty_strictness": (1, 4),
+    }
+    cols = []
+    for name in feature_names:
+        low, high = ranges.get(name, (0, 2))
+        if isinstance(low, float):
+            cols.append(rng.uniform(low, high, n))
+        else:
+            cols.append(rng.integers(low, high, n).astype(np.float64))
+    return np.column_stack(cols).astype(np.float32)
+
+def per_row_us(predict, X, repeats):
+    start = time.perf_counter()
+    for i in range(repeats):
+        predict(X[i % len(X)][None, :])
+    return (time.perf_counter() - start) / repeats * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--tolerance", type=float, default=1e-5)
+    parser.add_argument("--repeats", type=int, default=2_000)
+    args = parser.parse_args()
+
+    import joblib
+    from app.ml.tree_evaluator import CompiledTrees
+
+    reference = joblib.load(DEFAULT_MODEL_PATH)
+    compiled = CompiledTrees.load(DEFAULT_COMPILED_TREES_PATH)
+    X = random_features(args.rows, compiled.feature_names)
+
+    # 1. Parity
+    expected = reference.predict_proba(X)[:, 1]
+    got = compiled.predict_proba(X)[:, 1]
+    max_err = float(np.max(np.abs(expected - got)))
+    status = "✅" if max_err <= args.tolerance else "❌"
+    print(f"{status} Parity on {args.rows} rows: max |Δp| = {max_err:.2e} (tolerance {args.tolerance:.0e})")
+
+    # 2. Load time + memory (fresh process each)
+    for name in LOADERS:
+        stats = measure_load(name)
+        print(f"{name:>9}: load {stats['load_ms']:.1f}ms, RSS {stats['rss_mb']:.1f}MB "
+              f"(+{stats['loaded_mb']:.1f}MB for the model, peak {stats['peak_rss_mb']:.1f}MB)")
+
+    # 3. Latency
+    print(f"   joblib: {per_row_us(reference.predict_proba, X, args.repeats):.1f}µs/row (single-row calls)")
+    print(f" compiled: {per_row_us(compiled.predict_proba, X, args.repeats):.1f}µs/row (single-row calls)")
+    start = time.perf_counter()
+    compiled.predict_proba(X)
+    print(f" compiled: {(time.perf_counter() - start) / args.rows * 1e6:.2f}µs/row (one {args.rows}-row batch)")
+
+    if max_err > args.tolerance:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Shared upstream client against the fake providers: what a Gemini outage costs with the breaker.
+
+Starts benchmarks.fake_providers in-process on a free port, points the client at it, then runs
+three phases (healthy -> failing -> recovered) and prints latency and breaker state per phase.
+
+Run from backend/:  python -m benchmarks.bench_upstream --calls 200
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import time
+
+import uvicorn
+
+from app.core.upstream import UpstreamClient, UpstreamError, _provider
+from benchmarks.fake_providers import create_fake_app
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def run_phase(client, name, calls, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors, skipped = [], 0, 0
+
+    async def one():
+        nonlocal errors, skipped
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await client.post_json("gemini", "/v1beta/models/fake:generateContent",
+                                       {"contents": [{"parts": [{"text": "Proxy: True"}]}]})
+            except UpstreamError as e:
+                if "circuit open" in str(e) or "rate limit" in str(e):
+                    skipped += 1
+                else:
+                    errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    provider = client.providers["gemini"]
+    print(f"{name:>10}: p50={statistics.median(latencies):7.1f}ms max={max(latencies):7.1f}ms "
+          f"errors={errors:3d} skipped={skipped:3d} breaker={provider.breaker.state}")
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--failing-latency-ms", type=float, default=1500.0)
+    args = parser.parse_args()
+
+    port = free_port()
+    fake = create_fake_app(latency_ms=args.latency_ms)
+    server = uvicorn.Server(uvicorn.Config(fake, host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    provider = _provider("gemini", f"http://127.0.0.1:{port}", max_concurrency=args.concurrency, timeout_seconds=1.0)
+    provider.bucket.rate = provider.bucket.burst = provider.bucket.tokens = 10_000
+    provider.breaker.cooldown_seconds = 1.0
+    client = UpstreamClient({"gemini": provider})
+
+    try:
+        await run_phase(client, "healthy", args.calls, args.concurrency)
+        fake.state.behaviour["gemini"].update(latency_ms=args.failing_latency_ms, error_rate=0.5)
+        await run_phase(client, "failing", args.calls, args.concurrency)
+        fake.state.behaviour["gemini"].update(latency_ms=args.latency_ms, error_rate=0.0)
+        await asyncio.sleep(provider.breaker.cooldown_seconds)
+        await run_phase(client, "recovered", args.calls, args.concurrency)
+        print(f"fake gemini saw {fake.state.calls['gemini']} calls for {3 * args.calls} requests")
+    finally:
+        await client.close()
+        server.should_exit = True
+        await server_task
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+"""
+Throughput benchmark for the vectorized Vintage Math engine (parity: tests/test_vintage_batch.py).
+
+Run from backend/:  python -m benchmarks.bench_vintage_batch --rows 100000
+"""
+import argparse
+import random
+import time
+
+from app.api.predict_routes import PredictionRequest, calculate_vintage_risk
+from app.ml.vintage_batch import requests_to_columns, calculate_vintage_risk_batch
+
+def random_rows(n, seed=42):
+    rng = random.Random(seed)
+    return [
+        PredictionRequest(
+            overall_attendance=round(rng.uniform(40.0, 100.0), rng.choice([0, 1, 2])),
+            is_core_subject=rng.choice([0, 1]),
+            days_to_exam=rng.randint(-5, 60),
+            semester_phase=rng.choice([0, 1, 2]),
+            faculty_strictness=rng.choice([1, 2, 3]),
+            is_lab=rng.random() < 0.3,
+            has_proxy=rng.random() < 0.2,
+            bunked_last_class=rng.random() < 0.4,
+            is_first_period=rng.random() < 0.2,
+            filename="bench.png",
+        )
+        for _ in range(n)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = random_rows(args.rows)
+
+    start = time.perf_counter()
+    for row in rows:
+        calculate_vintage_risk(row.model_copy())
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cols = requests_to_columns(rows)
+    columns = time.perf_counter() - start
+    calculate_vintage_risk_batch(cols)
+    batch = time.perf_counter() - start
+
+    print(f"Scalar: {args.rows / scalar:,.0f} rows/s ({scalar:.3f}s)")
+    print(f"Batch:  {args.rows / batch:,.0f} rows/s ({batch:.3f}s, {columns:.3f}s of it reading the requests)"
+          f"  -> {scalar / batch:.1f}x")
+
+if __name__ == "__main__":
+    main()
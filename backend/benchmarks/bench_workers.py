@@ -0,0 +1,150 @@
+"""
+Throughput scaling of the multi-worker mode from 1 to N workers.
+
+For each worker count, starts `gunicorn app.main:app` (gunicorn.conf.py, preload on) on a free port,
+hammers a CPU-bound route from several client processes, then reports requests/s, the speedup over
+one worker and the master + worker memory (PSS). Needs MONGO_DETAILS (history writes go to MongoDB).
+
+The default route is /predict/batch with PREDICTION_ENGINE=vintage: pure Vintage Math on NumPy,
+so the numbers show the server's CPU scaling rather than Gemini latency.
+
+Run from backend/:  python -m benchmarks.bench_workers --max-workers 4 --duration 15
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from datetime import timedelta
+
+import httpx
+
+from benchmarks.report import summarize, save_results
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def batch_payload(rows):
+    return [
+        {
+            "overall_attendance": 60 + (i % 40), "is_core_subject": i % 2, "days_to_exam": i % 30,
+            "semester_phase": i % 3, "faculty_strictness": 1 + i % 3, "is_lab": i % 5 == 0,
+            "has_proxy": i % 7 == 0, "bunked_last_class": i % 2 == 0, "is_first_period": i % 4 == 0,
+            "filename": "bench.png",
+        }
+        for i in range(rows)
+    ]
+
+async def client_loop(base_url, token, rows, connections, duration):
+    payload = batch_payload(rows)
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        async def one_connection():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/api/v1/predict/batch", json=payload, headers=headers)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.gather(*(one_connection() for _ in range(connections)))
+    return latencies, errors
+
+def client_process(args):
+    # One OS process per client so the load generator isn't the bottleneck
+    return asyncio.run(client_loop(*args))
+
+def wait_until_up(base_url, proc, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("gunicorn exited during start-up")
+        try:
+            if httpx.get(base_url + "/", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("gunicorn did not come up")
+
+def memory_report(master_pid):
+    from app.core.process_memory import worker_report
+    rows = worker_report(master_pid)
+    return {
+        "master_pss_mib": round(rows[0][2]["pss"] / 1024 / 1024, 1),
+        "workers_pss_mib": [round(s["pss"] / 1024 / 1024, 1) for _, _, s in rows[1:]],
+        "total_pss_mib": round(sum(s["pss"] for _, _, s in rows) / 1024 / 1024, 1),
+        "total_rss_mib": round(sum(s["rss"] for _, _, s in rows) / 1024 / 1024, 1),
+    }
+
+def run_workers(workers, args, token):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ, "WEB_CONCURRENCY": str(workers), "PORT": str(port),
+        "PREDICTION_ENGINE": "vintage", "WARM_UP_ON_STARTUP": "false",
+        # All the load comes from one token: with admission control on, most of it would be cheap 429s
+        "ADMISSION_ENABLED": "false",
+    }
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "app.main:app", "--log-level", "warning"], env=env)
+    try:
+        wait_until_up(base_url, proc)
+        time.sleep(1.0)  # let every worker finish its startup events
+
+        jobs = [(base_url, token, args.rows, args.connections, args.duration)] * args.clients
+        started = time.perf_counter()
+        with multiprocessing.Pool(args.clients) as pool:
+            outputs = pool.map(client_process, jobs)
+        elapsed = time.perf_counter() - started
+
+        latencies = [ms for output, _ in outputs for ms in output]
+        errors = sum(e for _, e in outputs)
+        return {**summarize(latencies, elapsed, errors), **memory_report(proc.pid)}
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=60)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--rows", type=int, default=200, help="Rows per /predict/batch request")
+    parser.add_argument("--clients", type=int, default=max(2, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--connections", type=int, default=16, help="Concurrent connections per client")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    if not os.getenv("MONGO_DETAILS"):
+        raise SystemExit("Set MONGO_DETAILS: the workers write prediction history to MongoDB")
+
+    from app.core.security import create_access_token
+    token = create_access_token({"sub": "bench-workers@example.com", "role": "student"}, timedelta(hours=1))
+
+    counts = sorted({1, 2, 4, 8, args.max_workers} & set(range(1, args.max_workers + 1)))
+    results = {}
+    for workers in counts:
+        results[f"workers={workers}"] = run_workers(workers, args, token)
+        r = results[f"workers={workers}"]
+        base = results["workers=1"]["throughput_per_s"]
+        print(f"{workers:>2} workers: {r['throughput_per_s']:>8.1f} req/s  x{r['throughput_per_s'] / base:4.2f}  "
+              f"p99 {r['p99_ms']:7.1f}ms  errors {r['errors']}  "
+              f"pss master {r['master_pss_mib']} MiB + workers {r['workers_pss_mib']} = {r['total_pss_mib']} MiB "
+              f"(rss {r['total_rss_mib']} MiB)")
+
+    if not args.no_save:
+        save_results("workers", results, config=vars(args))
+
+if __name__ == "__main__":
+    main()
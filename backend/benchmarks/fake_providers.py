@@ -0,0 +1,103 @@
+"""
+Local stand-ins for Gemini and Groq with configurable latency and error rate.
+
+Run from backend/:
+    python -m benchmarks.fake_providers --port 9100 --latency-ms 300 --error-rate 0.1
+then start the API with
+    GEMINI_BASE_URL=http://127.0.0.1:9100 GROQ_BASE_URL=http://127.0.0.1:9100 GEMINI_API_KEY=fake GROQ_API_KEY=fake
+
+Both providers live on one server; their behaviour can also be changed at runtime with
+POST /_control {"gemini": {"latency_ms": 50, "error_rate": 0.5}, "groq": {...}}.
+"""
+import argparse
+import asyncio
+import json
+import random
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# What the vision model returns for the full-table prompt (rows add up to the TOTAL)
+FAKE_TABLE = {
+    "rows": [
+        ["Mathematics", 38, 45, 84.44], ["Physics", 30, 40, 75.0], ["Data Structures", 41, 44, 93.18],
+        ["DBMS", 33, 42, 78.57], ["DSA Lab", 20, 22, 90.91], ["Operating Systems", 29, 38, 76.32],
+    ],
+    "total": [191, 231, 82.68],
+}
+
+def create_fake_app(latency_ms: float = 200.0, error_rate: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+    app = FastAPI(title="Fake AI Providers")
+    rng = random.Random(seed)
+    app.state.behaviour = {
+        name: {"latency_ms": latency_ms, "error_rate": error_rate, "jitter_ms": jitter_ms}
+        for name in ("gemini", "groq")
+    }
+    app.state.calls = {"gemini": 0, "groq": 0}
+
+    async def behave(name: str):
+        app.state.calls[name] += 1
+        behaviour = app.state.behaviour[name]
+        delay = behaviour["latency_ms"] + rng.uniform(-1, 1) * behaviour["jitter_ms"]
+        await asyncio.sleep(max(0.0, delay) / 1000)
+        if rng.random() < behaviour["error_rate"]:
+            return JSONResponse({"error": {"message": f"fake {name} failure"}}, status_code=503)
+        return None
+
+    @app.post("/v1beta/models/{model_action}")
+    async def gemini_generate(model_action: str, request: Request):
+        failure = await behave("gemini")
+        if failure:
+            return failure
+        body = await request.json()
+        prompt = body["contents"][0]["parts"][0]["text"]
+        safe = "Proxy: True" in prompt
+        answer = {
+            "prediction": "Safe" if safe else "Not Safe",
+            "confidence": "80%",
+            "message": "Fake advisor says so"
+        }
+        return {"candidates": [{"content": {"parts": [{"text": "```json\n" + json.dumps(answer) + "\n```"}]}}]}
+
+    @app.post("/openai/v1/chat/completions")
+    async def groq_chat(request: Request):
+        failure = await behave("groq")
+        if failure:
+            return failure
+        body = await request.json()
+        # JSON mode = the full-table prompt (app/ocr/table_parser.py), otherwise just the TOTAL
+        content = json.dumps(FAKE_TABLE) if "response_format" in body else "82.35"
+        return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+    @app.head("/")
+    async def head():
+        return None
+
+    @app.get("/_control")
+    async def get_control():
+        return {"behaviour": app.state.behaviour, "calls": app.state.calls}
+
+    @app.post("/_control")
+    async def set_control(request: Request):
+        for name, changes in (await request.json()).items():
+            app.state.behaviour[name].update(changes)
+        return {"behaviour": app.state.behaviour}
+
+    return app
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    uvicorn.run(create_fake_app(args.latency_ms, args.error_rate, args.jitter_ms),
+                host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
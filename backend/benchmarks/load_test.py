@@ -0,0 +1,296 @@
+"""
+End-to-end load generator: virtual users drive /auth/login, /predict/, /ocr/scan, /history/my-logs
+and /timetable/ concurrently against the real FastAPI app.
+
+By default everything runs in this process:
+- the app is called through httpx's ASGI transport (no sockets; uvicorn's HTTP parsing is not measured)
+- Gemini and Groq are the fake providers from benchmarks.fake_providers on a local port
+- MongoDB is mongomock_motor unless --mongo-url is given (see benchmarks.mongo_standin)
+With --base-url the same scenario is sent to an already running server instead.
+
+Reports throughput and p50/p95/p99 per route and saves them to benchmarks/results/load-*.json.
+
+Run from backend/:
+    python -m benchmarks.load_test --users 50 --duration 30
+    python -m benchmarks.load_test --gemini-latency-ms 3000      # slower than the Gemini budget
+    python -m benchmarks.report compare results/load-A.json results/load-B.json
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+import httpx
+
+from benchmarks.report import summarize, print_table, save_results
+
+API = "/api/v1"
+DEFAULT_MIX = "login=1,predict=5,ocr=1,history=3,timetable=3"
+TIMETABLE = {
+    "monday": ["Maths", "Physics", "DSA Lab", "DSA Lab", "OS"],
+    "tuesday": ["DBMS", "Maths", "Networks", "OS"],
+    "wednesday": ["Physics", "DSA", "DBMS", "Maths"],
+    "thursday": ["Networks", "OS", "Physics Lab", "Physics Lab"],
+    "friday": ["Maths", "DSA", "DBMS"],
+    "saturday": ["OS"],
+}
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, weight = part.split("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+def screenshot_bytes(seed: int) -> bytes:
+    # A plain image per user: each user re-uploads the same "screenshot", like the real app
+    from PIL import Image
+    rng = random.Random(seed)
+    image = Image.new("RGB", (1280, 960), tuple(rng.randint(0, 255) for _ in range(3)))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def random_prediction(rng: random.Random):
+    return {
+        "overall_attendance": round(rng.uniform(55.0, 98.0), 2),
+        "is_core_subject": rng.choice([0, 1]),
+        "days_to_exam": rng.choice([1, 3, 6, 10, 20, 40]),
+        "semester_phase": rng.choice([0, 1, 2]),
+        "faculty_strictness": rng.choice([1, 2, 3]),
+        "is_lab": rng.random() < 0.2,
+        "has_proxy": rng.random() < 0.2,
+        "bunked_last_class": rng.random() < 0.3,
+        "is_first_period": rng.random() < 0.2,
+        "filename": "load-test.png",
+    }
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.statuses = {}
+
+    def record(self, route, started, response=None, error=None):
+        self.latencies.setdefault(route, []).append((time.perf_counter() - started) * 1000)
+        status = response.status_code if response is not None else type(error).__name__
+        self.statuses.setdefault(route, {}).setdefault(str(status), 0)
+        self.statuses[route][str(status)] += 1
+        if error is not None or response.status_code >= 400:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, index: int, recorder: Recorder, seed: int):
+        self.client = client
+        self.recorder = recorder
+        self.rng = random.Random(seed + index)
+        self.username = f"load-{uuid.uuid4().hex[:10]}@example.com"
+        self.password = "load-test-password"
+        self.headers = {}
+        self.image = screenshot_bytes(seed + index)
+        self.etags = {}
+
+    async def setup(self):
+        response = await self.client.post(f"{API}/auth/signup", json={
+            "full_name": "Load Test", "username": self.username, "password": self.password,
+            "roll_number": "LOAD", "branch": "CSE",
+        })
+        response.raise_for_status()
+        await self.login(record=False)
+        response = await self.client.post(f"{API}/timetable/", json=TIMETABLE, headers=self.headers)
+        response.raise_for_status()
+
+    async def call(self, route, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except Exception as e:
+            self.recorder.record(route, started, error=e)
+            return None
+        self.recorder.record(route, started, response)
+        return response
+
+    async def login(self, record=True):
+        data = {"username": self.username, "password": self.password}
+        if record:
+            response = await self.call("POST /auth/login", "POST", f"{API}/auth/login", data=data)
+        else:
+            response = await self.client.post(f"{API}/auth/login", data=data)
+        if response is not None and response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def predict(self):
+        await self.call("POST /predict/", "POST", f"{API}/predict/",
+                        json=random_prediction(self.rng), headers=self.headers)
+
+    async def ocr(self):
+        await self.call("POST /ocr/scan", "POST", f"{API}/ocr/scan", headers=self.headers,
+                        files={"file": ("screenshot.png", self.image, "image/png")})
+
+    async def poll(self, route, url):
+        # Clients keep the ETag of the last read, like the app does between screen loads
+        headers = dict(self.headers)
+        if url in self.etags:
+            headers["If-None-Match"] = self.etags[url]
+        response = await self.call(route, "GET", url, headers=headers)
+        if response is not None and response.headers.get("ETag"):
+            self.etags[url] = response.headers["ETag"]
+
+    async def history(self):
+        await self.poll("GET /history/my-logs", f"{API}/history/my-logs?limit=10")
+
+    async def timetable(self):
+        await self.poll("GET /timetable/", f"{API}/timetable/")
+
+    async def run(self, deadline, mix, think_ms):
+        actions = list(mix)
+        weights = [mix[name] for name in actions]
+        while time.perf_counter() < deadline:
+            await getattr(self, self.rng.choices(actions, weights)[0])()
+            if think_ms:
+                await asyncio.sleep(self.rng.uniform(0, 2 * think_ms) / 1000)
+
+async def run_load(client, args, mix):
+    recorder = Recorder()
+    users = [VirtualUser(client, i, recorder, args.seed) for i in range(args.users)]
+
+    # Sign-ups are setup, not load (bcrypt-bound and not what we poll for)
+    semaphore = asyncio.Semaphore(10)
+
+    async def setup(user):
+        async with semaphore:
+            await user.setup()
+
+    print(f"👥 Signing up {len(users)} users...")
+    await asyncio.gather(*(setup(user) for user in users))
+
+    print(f"🚀 Running for {args.duration}s ({DEFAULT_MIX if args.mix is None else args.mix})")
+    started = time.perf_counter()
+    await asyncio.gather(*(user.run(started + args.duration, mix, args.think_ms) for user in users))
+    elapsed = time.perf_counter() - started
+
+    results = {
+        route: {**summarize(latencies, elapsed, recorder.errors.get(route, 0)), "statuses": recorder.statuses[route]}
+        for route, latencies in sorted(recorder.latencies.items())
+    }
+    everything = [ms for latencies in recorder.latencies.values() for ms in latencies]
+    results["ALL"] = summarize(everything, elapsed, sum(recorder.errors.values()))
+    return results
+
+def configure_environment(args, fake_port):
+    # Must happen before anything under app/ is imported: settings are read at import time
+    fake_url = f"http://127.0.0.1:{fake_port}"
+    os.environ.update({
+        "GEMINI_BASE_URL": fake_url, "GROQ_BASE_URL": fake_url,
+        "GEMINI_API_KEY": "fake", "GROQ_API_KEY": "fake",
+        "WARM_UP_ON_STARTUP": "false",
+        # Per-user admission limits would shape the numbers; --admission keeps them on
+        "ADMISSION_ENABLED": "true" if args.admission else "false",
+    })
+    if not args.real_rate_limits:
+        # The fake providers have no quota; keep the client-side limits out of the measurement
+        os.environ.update({
+            "GEMINI_RATE_PER_SECOND": "100000", "GEMINI_RATE_BURST": "100000",
+            "GROQ_RATE_PER_SECOND": "100000", "GROQ_RATE_BURST": "100000",
+        })
+
+@asynccontextmanager
+async def in_process_app(args):
+    """
+    Fake providers + the real app on the Mongo stand-in; yields (client, fake_app, config).
+    """
+    import uvicorn
+    from benchmarks.fake_providers import create_fake_app
+    from benchmarks.mongo_standin import create_mongo_client, describe
+
+    port = free_port()
+    fake = create_fake_app(latency_ms=args.gemini_latency_ms, error_rate=args.error_rate,
+                           jitter_ms=args.jitter_ms, seed=args.seed)
+    fake.state.behaviour["groq"].update(latency_ms=args.groq_latency_ms)
+    server = uvicorn.Server(uvicorn.Config(fake, host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    configure_environment(args, port)
+    from app.main import app
+    from app.core.config import settings
+    from app.core.upstream import upstream
+    from app.db.mongodb import db, connect_to_mongo, close_mongo_connection
+    from app.ml.model_engine import model_engine
+    from app.ocr.ocr_jobs import ocr_jobs
+
+    # Same start-up as app/main.py, with the Mongo client swapped for the stand-in
+    await connect_to_mongo(client=create_mongo_client(args.mongo_url))
+    if settings.PREDICTION_ENGINE == "xgboost":
+        model_engine.load()
+        await model_engine.start()
+    await ocr_jobs.start(db.client[settings.DATABASE_NAME])
+
+    config = {
+        **vars(args), "mongo": describe(args.mongo_url), "transport": "asgi",
+        "prediction_engine": settings.PREDICTION_ENGINE, "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+    }
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=60) as client:
+            yield client, fake, config
+    finally:
+        await ocr_jobs.stop()
+        await model_engine.stop()
+        await close_mongo_connection()
+        await upstream.close()
+        server.should_exit = True
+        await server_task
+
+async def run_in_process(args, mix):
+    async with in_process_app(args) as (client, fake, config):
+        results = await run_load(client, args, mix)
+        config["fake_provider_calls"] = dict(fake.state.calls)
+    return results, config
+
+async def run_against_server(args, mix):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        results = await run_load(client, args, mix)
+    return results, {**vars(args), "transport": "http"}
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load after sign-up")
+    parser.add_argument("--mix", default=None, help=f"Weighted actions (default {DEFAULT_MIX})")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Mean pause between a user's requests")
+    parser.add_argument("--base-url", default=None, help="Load an already running server instead")
+    parser.add_argument("--mongo-url", default=None, help="Real MongoDB instead of the in-memory stand-in")
+    parser.add_argument("--gemini-latency-ms", type=float, default=400.0)
+    parser.add_argument("--groq-latency-ms", type=float, default=1200.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--real-rate-limits", action="store_true", help="Keep the configured provider rate limits")
+    parser.add_argument("--admission", action="store_true", help="Keep per-user admission control on")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix or DEFAULT_MIX)
+    if args.base_url:
+        results, config = await run_against_server(args, mix)
+    else:
+        results, config = await run_in_process(args, mix)
+
+    print_table(results)
+    if not args.no_save:
+        save_results("load", results, config=config)
+
+if __name__ == "__main__":
+    asyncio.run(main())
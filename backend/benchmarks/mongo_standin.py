@@ -0,0 +1,38 @@
+"""
+MongoDB for benchmarks: a real server when a URL is given, otherwise an in-memory stand-in.
+
+The in-memory client is mongomock_motor (`pip install mongomock-motor`), which speaks the Motor API
+without a server. It covers every query the routes make; server-only features (collMod, $merge)
+are skipped by their callers' error handling. Numbers measured against it exclude network and
+storage time, so compare runs against the same backend.
+"""
+import inspect
+from motor.motor_asyncio import AsyncIOMotorClient
+
+def _accept_update_sort():
+    # pymongo 4.11+ passes sort= to the bulk builder for UpdateOne; older mongomock doesn't take it,
+    # which made every bulk_write of UpdateOne (summaries, precompute) fail against the stand-in
+    from mongomock.collection import BulkOperationBuilder
+    add_update = BulkOperationBuilder.add_update
+    if "sort" in inspect.signature(add_update).parameters:
+        return
+
+    def add_update_without_sort(self, *args, sort=None, **kwargs):
+        return add_update(self, *args, **kwargs)
+
+    BulkOperationBuilder.add_update = add_update_without_sort
+
+def create_mongo_client(url: str = None):
+    if url:
+        return AsyncIOMotorClient(url)
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise SystemExit(
+            "No MongoDB for the benchmark: pass --mongo-url mongodb://... or `pip install mongomock-motor`"
+        )
+    _accept_update_sort()
+    return AsyncMongoMockClient()
+
+def describe(url: str = None):
+    return "mongodb" if url else "mongomock_motor (in-memory)"
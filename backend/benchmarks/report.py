@@ -0,0 +1,107 @@
+"""
+Shared helpers for the benchmark scripts: latency summaries and JSON result files.
+
+Every run is saved as benchmarks/results/<name>-<timestamp>.json (with the git revision),
+so two runs can be compared with:  python -m benchmarks.report compare OLD.json NEW.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+def percentile(values, p):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+def summarize(latencies_ms, elapsed_s=None, errors=0):
+    """
+    count, throughput and p50/p95/p99 (ms) for one route or one microbenchmark.
+    """
+    summary = {
+        "count": len(latencies_ms),
+        "errors": errors,
+        "mean_ms": round(statistics.fmean(latencies_ms), 3) if latencies_ms else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+        "max_ms": round(max(latencies_ms), 3) if latencies_ms else 0.0,
+    }
+    if elapsed_s:
+        summary["throughput_per_s"] = round(len(latencies_ms) / elapsed_s, 1)
+    return summary
+
+def time_calls(fn, repeat):
+    """
+    Latency of `repeat` calls to fn(), in ms, plus the total wall time.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return latencies, time.perf_counter() - start
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return "unknown"
+
+def save_results(name, results, config=None, out_dir=None):
+    out_dir = out_dir or RESULTS_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(out_dir, f"{name}-{stamp}.json")
+    payload = {
+        "benchmark": name,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "config": config or {},
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, default=str)
+    print(f"💾 Saved {path}")
+    return path
+
+def print_table(results):
+    print(f"{'name':<34} {'count':>7} {'err':>5} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, s in results.items():
+        print(f"{name:<34} {s['count']:>7} {s['errors']:>5} {s.get('throughput_per_s', 0):>9.1f} "
+              f"{s['p50_ms']:>7.2f}ms {s['p95_ms']:>7.2f}ms {s['p99_ms']:>7.2f}ms")
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)["results"]
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+    print(f"{'name':<34} {'p50 old→new':>22} {'p99 old→new':>22} {'req/s old→new':>22}")
+    for name in sorted(set(old) & set(new)):
+        a, b = old[name], new[name]
+        print(f"{name:<34} {a['p50_ms']:>9.2f} → {b['p50_ms']:<9.2f}ms {a['p99_ms']:>9.2f} → {b['p99_ms']:<9.2f}ms "
+              f"{a.get('throughput_per_s', 0):>9.1f} → {b.get('throughput_per_s', 0):<9.1f}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmp_parser = sub.add_parser("compare", help="Compare two saved result files")
+    cmp_parser.add_argument("old")
+    cmp_parser.add_argument("new")
+    args = parser.parse_args()
+    if args.command == "compare":
+        compare(args.old, args.new)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Multi-worker serving: one gunicorn master, WEB_CONCURRENCY uvicorn workers.
+
+Run from backend/:  gunicorn app.main:app          (this file is picked up automatically)
+
+- preload_app: the master imports the app and loads the models once (preload_models), then forks.
+  Workers share those read-only pages copy-on-write; gc.freeze() keeps the garbage collector
+  from touching (and so copying) them in every worker.
+- Every worker opens its own MongoDB client and upstream connections in its startup events;
+  fork hooks in app/db/mongodb.py and app/core/upstream.py drop anything inherited from the master.
+- Workers create missing indexes at startup but only report drifted ones: run
+  `python -m app.db.indexes` once per deploy to rebuild those (dropping an index isn't safe
+  with every worker doing it at the same time).
+- Anything a later request may read goes through MongoDB, not worker memory: e.g. async OCR jobs
+  (POST /ocr/scan?async=true is usually polled on a different worker).
+- workers defaults to the CPUs the container may use (config.available_cpus), not the host's count.
+- Graceful restarts: `kill -HUP <master>` replaces workers one by one, each finishing in-flight
+  requests and draining its history buffer within GRACEFUL_TIMEOUT_SECONDS. (With preload_app,
+  new code needs a full restart or `kill -USR2` instead.)
+- Memory per worker: `python -m app.core.process_memory <master pid>`, or /stats/worker.
+"""
+import gc
+
+from app.core.config import settings
+
+wsgi_app = "app.main:app"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = settings.WEB_CONCURRENCY
+bind = f"0.0.0.0:{settings.PORT}"
+preload_app = True
+
+graceful_timeout = settings.GRACEFUL_TIMEOUT_SECONDS
+timeout = max(60, 2 * settings.GRACEFUL_TIMEOUT_SECONDS)
+keepalive = 5
+max_requests = settings.WORKER_MAX_REQUESTS
+max_requests_jitter = settings.WORKER_MAX_REQUESTS // 10
+
+def on_starting(server):
+    # Runs in the master after the preloaded app import, before any fork
+    from app.ml.model_engine import preload_models
+    from app.core.process_memory import memory_stats
+
+    preload_models()
+    # Everything allocated so far is long-lived: move it out of the GC's reach
+    gc.collect()
+    gc.freeze()
+    rss = memory_stats()["rss"] / 1024 / 1024
+    server.log.info(f"Preloaded models in master (rss {rss:.1f} MiB), forking {workers} workers")
+
+def post_fork(server, worker):
+    if settings.SPLIT_RATE_LIMITS_ACROSS_WORKERS and workers > 1:
+        from app.core.upstream import upstream
+        upstream.share_rate_limits(workers)
+    # Admission concurrency/queue limits are server-wide numbers too; per-client rates stay as they are
+    if settings.ADMISSION_SPLIT_ACROSS_WORKERS and workers > 1:
+        from app.core.admission import admission_controller
+        admission_controller.share_limits(workers)
+
+def post_worker_init(worker):
+    from app.core.process_memory import memory_stats
+
+    stats = memory_stats()
+    worker.log.info(
+        f"Worker {worker.pid} ready: rss {stats['rss'] / 1024 / 1024:.1f} MiB, "
+        f"pss {stats['pss'] / 1024 / 1024:.1f} MiB, private {stats['private'] / 1024 / 1024:.1f} MiB"
+    )
+
+def worker_exit(server, worker):
+    server.log.info(f"Worker {worker.pid} exited")
@@ -0,0 +1,50 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+
+# Settings are read when app/ is first imported: cheap bcrypt, no AI providers, no background jobs
+os.environ.update({
+    "BCRYPT_ROUNDS": "4",
+    "PREDICTION_ENGINE": "vintage",
+    "GEMINI_API_KEY": "", "GROQ_API_KEY": "",
+    "WARM_UP_ON_STARTUP": "false",
+    "PRECOMPUTE_ENABLED": "false",
+    "ADMISSION_ENABLED": "false",
+    "HISTORY_FLUSH_INTERVAL_SECONDS": "0.05",
+})
+
+@pytest.fixture
+def run_api():
+    """
+    run_api(scenario): runs `await scenario(client)` against the real app (httpx ASGI transport,
+    lifespan skipped) on the same in-memory MongoDB stand-in as benchmarks/load_test.py.
+    """
+    def run(scenario):
+        async def main():
+            from app.main import app
+            from app.db.mongodb import connect_to_mongo, close_mongo_connection
+            from benchmarks.mongo_standin import create_mongo_client
+
+            await connect_to_mongo(client=create_mongo_client())
+            try:
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    return await scenario(client)
+            finally:
+                await close_mongo_connection()
+
+        return asyncio.run(main())
+
+    return run
+
+async def signed_up(client, username="student@example.com", password="correct-horse"):
+    response = await client.post("/api/v1/auth/signup", json={
+        "full_name": "Test Student", "username": username, "password": password,
+        "roll_number": "T1", "branch": "CSE",
+    })
+    assert response.status_code == 201, response.text
+    response = await client.post("/api/v1/auth/login", data={"username": username, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,40 @@
+from app.core.admission import forwarded_client
+
+def headers(*values):
+    return [(b"x-forwarded-for", value.encode()) for value in values]
+
+def test_spoofed_entries_left_of_the_proxy_are_ignored():
+    # Client sent "1.2.3.4"; our one proxy appended the real peer address
+    assert forwarded_client(headers("1.2.3.4, 203.0.113.7"), trusted_hops=1) == "203.0.113.7"
+    assert forwarded_client(headers("9.9.9.9, 203.0.113.7"), trusted_hops=1) == "203.0.113.7"
+
+def test_chain_of_proxies_and_repeated_headers():
+    assert forwarded_client(headers("1.2.3.4, 203.0.113.7", "10.0.0.2"), trusted_hops=2) == "203.0.113.7"
+
+def test_header_shorter_than_the_proxy_chain_is_not_trusted():
+    assert forwarded_client(headers("203.0.113.7"), trusted_hops=2) is None
+    assert forwarded_client([], trusted_hops=1) is None
+
+def test_class_limits_are_split_across_workers_but_client_rates_are_not():
+    from app.core.admission import AdmissionController, RouteClass
+
+    controller = AdmissionController(
+        classes=[RouteClass("predict", rate_per_minute=60, burst=20, concurrency=64, queue_size=128),
+                 RouteClass("ocr", rate_per_minute=6, burst=3, concurrency=8, queue_size=16)],
+        max_wait_seconds=2, max_tracked_clients=100,
+    )
+    controller.share_limits(4)
+    predict, ocr = controller.classes["predict"], controller.classes["ocr"]
+    assert (predict.concurrency, predict.queue_size) == (16, 32)
+    assert (ocr.concurrency, ocr.queue_size) == (2, 4)
+    # A keep-alive client stays on one worker: it keeps its whole allowance there
+    assert (predict.rate * 60, predict.burst) == (60, 20)
+    assert (ocr.rate * 60, ocr.burst) == (6, 3)
+    assert controller.bucket_for(ocr, "user:a").burst == 3
+
+def test_split_never_goes_below_one_slot():
+    from app.core.admission import RouteClass
+
+    auth = RouteClass("auth", rate_per_minute=10, burst=5, concurrency=2, queue_size=3)
+    auth.share(8)
+    assert (auth.concurrency, auth.queue_size) == (1, 1)
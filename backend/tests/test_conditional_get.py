@@ -0,0 +1,57 @@
+from app.db.mongodb import history_buffer
+from tests.conftest import signed_up
+
+API = "/api/v1"
+TIMETABLE = {"monday": ["Maths", "Physics", "OS"], "tuesday": ["DBMS", "Maths"]}
+PREDICTION = {
+    "overall_attendance": 81.5, "is_core_subject": 1, "days_to_exam": 10, "semester_phase": 1,
+    "faculty_strictness": 2, "is_lab": False, "has_proxy": False, "bunked_last_class": False,
+    "is_first_period": False, "filename": "test.png",
+}
+
+def test_timetable_304_until_it_changes(run_api):
+    async def scenario(client):
+        headers = await signed_up(client)
+        assert (await client.post(f"{API}/timetable/", json=TIMETABLE, headers=headers)).status_code == 200
+
+        first = await client.get(f"{API}/timetable/", headers=headers)
+        assert first.status_code == 200
+        etag = first.headers["ETag"]
+
+        again = await client.get(f"{API}/timetable/", headers={**headers, "If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+        assert len(first.content) > 0
+
+        await client.post(f"{API}/timetable/", json={**TIMETABLE, "friday": ["DSA"]}, headers=headers)
+        changed = await client.get(f"{API}/timetable/", headers={**headers, "If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+
+    run_api(scenario)
+
+def test_history_etag_changes_with_every_write(run_api):
+    async def scenario(client):
+        headers = await signed_up(client)
+        url = f"{API}/history/my-logs?limit=10"
+
+        empty = await client.get(url, headers=headers)
+        etag = empty.headers["ETag"]
+        assert (await client.get(url, headers={**headers, "If-None-Match": etag})).status_code == 304
+
+        for expected in (1, 2):
+            assert (await client.post(f"{API}/predict/", json=PREDICTION, headers=headers)).status_code == 200
+            await history_buffer.flush()
+
+            fresh = await client.get(url, headers={**headers, "If-None-Match": etag})
+            assert fresh.status_code == 200
+            assert len(fresh.json()) == expected
+            assert fresh.headers["ETag"] != etag
+            etag = fresh.headers["ETag"]
+            assert (await client.get(url, headers={**headers, "If-None-Match": etag})).status_code == 304
+
+        # The counters (best effort) were written too, not just the version
+        summary = await client.get(f"{API}/history/summary", headers=headers)
+        assert summary.json()["prediction_count"] == 2
+
+    run_api(scenario)
@@ -0,0 +1,26 @@
+import json
+from datetime import datetime
+from app.db.mongodb import history_buffer
+from tests.conftest import signed_up
+from tests.test_conditional_get import PREDICTION
+
+def test_export_has_the_my_logs_fields_with_iso_datetimes(run_api):
+    async def scenario(client):
+        headers = await signed_up(client)
+        for _ in range(2):
+            assert (await client.post("/api/v1/predict/", json=PREDICTION, headers=headers)).status_code == 200
+        await history_buffer.flush()
+        logs = await client.get("/api/v1/history/my-logs", headers=headers)
+        export = await client.get("/api/v1/history/export", headers=headers)
+        return logs.json(), export
+
+    logs, export = run_api(scenario)
+    assert export.status_code == 200
+    lines = [json.loads(line) for line in export.text.splitlines()]
+    assert len(lines) == 2
+    # No confidence/message/engine: only what ScanLog returns
+    assert [set(line) for line in lines] == [set(log) for log in logs]
+    assert [line["_id"] for line in lines] == [log["_id"] for log in logs]
+    for line in lines:
+        assert "T" in line["timestamp"]
+        datetime.fromisoformat(line["timestamp"])
@@ -0,0 +1,47 @@
+import asyncio
+from pymongo import ASCENDING
+from app.db.indexes import ensure_indexes
+
+USERNAME_UNIQUE = {"collection": "users", "name": "username_unique", "keys": [("username", ASCENDING)], "unique": True}
+
+def database():
+    from benchmarks.mongo_standin import create_mongo_client
+    return create_mongo_client()["test"]
+
+def test_startup_reports_drift_without_dropping_anything():
+    async def scenario():
+        users = database()["users"]
+        await users.create_index([("username", ASCENDING)], name="username_unique")
+        summary = await ensure_indexes(users.database, specs=[USERNAME_UNIQUE])
+        return summary, await users.index_information()
+
+    summary, indexes = asyncio.run(scenario())
+    assert summary["drifted"] == 1
+    assert "username_unique" in indexes and not indexes["username_unique"].get("unique")
+
+def test_failed_rebuild_keeps_the_old_index():
+    async def scenario():
+        users = database()["users"]
+        await users.create_index([("username", ASCENDING)], name="username_unique")
+        # Duplicate usernames: the unique version can't be built
+        await users.insert_many([{"username": "a@example.com"}, {"username": "a@example.com"}])
+        summary = await ensure_indexes(users.database, specs=[USERNAME_UNIQUE], rebuild=True)
+        return summary, await users.index_information()
+
+    summary, indexes = asyncio.run(scenario())
+    assert summary["failed"] == 1
+    assert indexes["username_unique"]["key"] == [("username", ASCENDING)]
+
+def test_rebuild_with_new_keys_swaps_in_the_new_index():
+    async def scenario():
+        history = database()["history"]
+        await history.create_index([("username", ASCENDING)], name="username_timestamp")
+        spec = {"collection": "history", "name": "username_timestamp",
+                "keys": [("username", ASCENDING), ("timestamp", -1), ("_id", -1)]}
+        summary = await ensure_indexes(history.database, specs=[spec], rebuild=True)
+        return summary, await history.index_information()
+
+    summary, indexes = asyncio.run(scenario())
+    assert summary["created"] == 1
+    assert [k for k, _ in indexes["username_timestamp"]["key"]] == ["username", "timestamp", "_id"]
+    assert "username_timestamp_rebuild" not in indexes
@@ -0,0 +1,45 @@
+from tests.conftest import signed_up
+from tests.test_conditional_get import PREDICTION
+
+def test_routes_are_labelled_with_their_full_template(run_api, monkeypatch):
+    # Admission control answers 429 before the router runs, so the metrics have to find the route themselves
+    from app.core.admission import admission_controller
+    from app.core.metrics import registry
+
+    predict = admission_controller.classes["predict"]
+    monkeypatch.setattr(predict, "burst", 1)
+    monkeypatch.setattr(predict, "rate", 1 / 3600)
+    monkeypatch.setattr(admission_controller, "_buckets", type(admission_controller._buckets)(100))
+
+    async def scenario(client):
+        headers = await signed_up(client)
+        monkeypatch.setattr(admission_controller, "enabled", True)
+        first = await client.post("/api/v1/predict/", json=PREDICTION, headers=headers)
+        second = await client.post("/api/v1/predict/", json=PREDICTION, headers=headers)
+        logs = await client.get("/api/v1/history/my-logs", headers=headers)
+        return first, second, logs
+
+    first, second, logs = run_api(scenario)
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert int(second.headers["Retry-After"]) >= 1
+    assert logs.status_code == 200
+
+    rendered = registry.render()
+    assert 'method="POST",route="/api/v1/predict/",status="200"' in rendered
+    assert 'method="POST",route="/api/v1/predict/",status="429"' in rendered
+    assert 'method="POST",route="/api/v1/auth/signup",status="201"' in rendered
+    assert 'method="GET",route="/api/v1/history/my-logs",status="200"' in rendered
+    assert 'route="/"' not in rendered
+    assert 'route="unmatched"' not in rendered
+
+def test_shed_requests_match_routes_inside_included_routers():
+    from app.core.metrics import route_template
+    from app.main import app
+
+    def scope(method, path):
+        return {"type": "http", "method": method, "path": path, "root_path": "", "app": app, "headers": []}
+
+    assert route_template(scope("POST", "/api/v1/ocr/scan")) == "/api/v1/ocr/scan"
+    assert route_template(scope("POST", "/api/v1/auth/login")) == "/api/v1/auth/login"
+    assert route_template(scope("GET", "/nowhere")) == "unmatched"
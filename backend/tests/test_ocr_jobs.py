@@ -0,0 +1,34 @@
+import asyncio
+from app.ocr import ocr_jobs as ocr_jobs_module
+from app.ocr.ocr_jobs import OCRJobQueue
+from benchmarks.mongo_standin import create_mongo_client
+
+def test_job_submitted_to_one_worker_can_be_polled_from_another(monkeypatch):
+    async def fake_scan(image_bytes):
+        await asyncio.sleep(0.01)
+        return {"overall_attendance": 82.5, "subjects": []}
+
+    monkeypatch.setattr(ocr_jobs_module, "scan_image", fake_scan)
+
+    async def scenario():
+        database = create_mongo_client()["test"]
+        # Two gunicorn workers: same database, separate processes' in-memory state
+        submitter = OCRJobQueue(workers=1, max_queued=4, job_ttl_seconds=60)
+        poller = OCRJobQueue(workers=1, max_queued=4, job_ttl_seconds=60)
+        await submitter.start(database)
+        await poller.start(database)
+        try:
+            job = await submitter.submit(b"image", "student@example.com")
+            for _ in range(100):
+                seen = await poller.get(job["_id"])
+                if seen["status"] == "done":
+                    return poller.public_view(seen)
+                await asyncio.sleep(0.01)
+            raise AssertionError(f"job never finished: {seen}")
+        finally:
+            await submitter.stop()
+            await poller.stop()
+
+    view = asyncio.run(scenario())
+    assert view["status"] == "done"
+    assert view["result"]["overall_attendance"] == 82.5
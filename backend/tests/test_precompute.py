@@ -0,0 +1,93 @@
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+from app.db.summaries import COLLECTION as SUMMARY_COLLECTION
+from app.ml.precompute import VerdictPrecomputer, COLLECTION, JOB_STATE_COLLECTION, JOB_NAME
+
+USERS = 30
+
+def precomputer(database, owner):
+    job = VerdictPrecomputer(batch_size=5, pause_seconds=0.2, run_at_hour=2, lease_seconds=600)
+    job.owner = owner
+    job.database = database
+    return job
+
+async def seeded_database():
+    from benchmarks.bench_planner import random_timetable
+    from benchmarks.mongo_standin import create_mongo_client
+
+    database = create_mongo_client()["test"]
+    users = [{"username": f"student{i}@example.com", "timetable": random_timetable(seed=i)} for i in range(USERS)]
+    await database["users"].insert_many(users)
+    await database[SUMMARY_COLLECTION].insert_many(
+        [{"_id": user["username"], "latest_attendance": 80.0} for user in users])
+    return database
+
+def test_restarted_process_resumes_after_stop():
+    target = date.today() + timedelta(days=1)
+
+    async def scenario():
+        database = await seeded_database()
+        first = precomputer(database, "host:111")
+        first._task = asyncio.create_task(first.run(target))
+        while ((await database[JOB_STATE_COLLECTION].find_one({"_id": JOB_NAME})) or {}).get("processed_users", 0) < 10:
+            await asyncio.sleep(0.01)
+        await first.stop()
+
+        # New pid = new owner: must not have to wait out the old lease
+        return await precomputer(database, "host:222").run(target), database
+
+    summary, database = asyncio.run(scenario())
+    assert summary is not None
+    assert summary["processed_users"] == USERS
+
+def test_waits_out_a_crashed_runners_lease():
+    target = date.today() + timedelta(days=1)
+
+    async def scenario():
+        database = await seeded_database()
+        # host:111 died mid-run: its lease is still live for a moment and never renewed
+        await database[JOB_STATE_COLLECTION].insert_one({
+            "_id": JOB_NAME, "owner": "host:111", "status": "running", "target_date": target.isoformat(),
+            "lease_until": datetime.utcnow() + timedelta(seconds=1), "last_user_id": None,
+            "processed_users": 0, "written_rows": 0,
+        })
+        started = time.perf_counter()
+        await precomputer(database, "host:222")._run_until_done(target)
+        state = await database[JOB_STATE_COLLECTION].find_one({"_id": JOB_NAME})
+        documents = await database[COLLECTION].count_documents({"date": target.isoformat()})
+        return state, documents, time.perf_counter() - started
+
+    state, documents, elapsed = asyncio.run(scenario())
+    assert state["status"] == "done" and state["owner"] == "host:222"
+    assert documents == USERS
+    assert elapsed >= 1.0
+
+def test_a_night_run_computes_the_same_morning():
+    night = VerdictPrecomputer(batch_size=5, pause_seconds=0, run_at_hour=2, lease_seconds=600)
+    evening = VerdictPrecomputer(batch_size=5, pause_seconds=0, run_at_hour=22, lease_seconds=600)
+    assert night.target_for_run(date(2026, 3, 5)) == date(2026, 3, 5)
+    assert evening.target_for_run(date(2026, 3, 5)) == date(2026, 3, 6)
+    # Deployed at 09:00 on the 5th: the 02:00 run for the 5th was missed and is caught up on
+    assert night.current_target(datetime(2026, 3, 5, 9)) == date(2026, 3, 5)
+    assert evening.current_target(datetime(2026, 3, 5, 9)) == date(2026, 3, 5)
+    assert evening.current_target(datetime(2026, 3, 5, 23)) == date(2026, 3, 6)
+
+def test_first_start_catches_up_on_the_current_morning():
+    async def scenario():
+        database = await seeded_database()
+        job = precomputer(database, "host:111")
+        # Midnight run: the current morning is always today, whatever time the test runs at
+        job.pause_seconds, job.run_at_hour = 0, 0
+        job.start(database)
+        try:
+            while ((await database[JOB_STATE_COLLECTION].find_one({"_id": JOB_NAME})) or {}).get("status") != "done":
+                await asyncio.sleep(0.01)
+        finally:
+            await job.stop()
+        return await database[JOB_STATE_COLLECTION].find_one({"_id": JOB_NAME}), job.current_target()
+
+    # Without waiting for the next 02:00 (a Sunday target may have no classes, so check the job state)
+    state, target = asyncio.run(scenario())
+    assert state["target_date"] == target.isoformat()
+    assert state["processed_users"] == USERS
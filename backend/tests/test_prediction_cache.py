@@ -0,0 +1,43 @@
+from app.api.predict_routes import PredictionRequest
+from app.ml.prediction_cache import cache_key
+from tests.test_conditional_get import PREDICTION
+
+def key(attendance, step=0.5):
+    return cache_key(PredictionRequest(**{**PREDICTION, "overall_attendance": attendance}), "gemini", step)
+
+def test_nearby_attendance_shares_an_entry():
+    assert key(80.1) == key(80.2)
+    assert key(80.1) != key(80.6)
+
+def test_entries_never_span_a_threshold():
+    # Round-to-nearest put 74.8 and 75.2 in the same 75.0 entry
+    assert key(74.8) != key(75.2)
+    assert key(74.99) != key(75.0)
+    assert key(84.9) != key(85.0)
+    # Even with a step that doesn't divide the thresholds
+    assert key(74.5, step=3) != key(75.5, step=3)
+    assert key(84.5, step=7) != key(85.5, step=7)
+
+def test_only_gemini_answers_are_cached(run_api, monkeypatch):
+    from app.core.config import settings
+    from app.ml.model_engine import ModelEngine, model_engine
+    from app.ml.prediction_cache import prediction_cache
+    from tests.conftest import signed_up
+
+    async def predict_safe_proba(data):
+        return 0.9
+
+    # A loaded local model, without loading it
+    monkeypatch.setattr(settings, "PREDICTION_ENGINE", "xgboost")
+    monkeypatch.setattr(ModelEngine, "ready", True)
+    monkeypatch.setattr(model_engine, "predict_safe_proba", predict_safe_proba)
+    before = prediction_cache.stats()
+
+    async def scenario(client):
+        headers = await signed_up(client)
+        return await client.post("/api/v1/predict/", json=PREDICTION, headers=headers)
+
+    response = run_api(scenario)
+    assert response.status_code == 200 and response.json()["engine"] == "xgboost"
+    after = prediction_cache.stats()
+    assert (after["misses"], after["size"]) == (before["misses"], before["size"])
@@ -0,0 +1,8 @@
+from benchmarks.bench_startup import FORBIDDEN, run_probe
+
+def test_no_heavy_modules_at_import():
+    # Fresh interpreter under -X importtime: NumPy, XGBoost, Pillow etc. load on first use, not at startup
+    imports, _ = run_probe()
+    loaded = {module for module, _, _ in imports}
+    assert "app.main" in loaded
+    assert sorted(m for m in FORBIDDEN if m in loaded) == []
@@ -0,0 +1,30 @@
+import json
+from app.ocr.ocr_cache import is_cacheable
+from app.ocr.ocr_processor import table_result
+from app.ocr.table_parser import parse_table_response
+
+def answer(rows, total):
+    return json.dumps({"rows": rows, "total": total})
+
+def test_bad_rows_are_dropped_and_reported():
+    table = parse_table_response(answer(
+        [["Maths", 40, 45, 88.89], ["OS", None, 38, 80.0], ["DSA", 50, 40, None], ["DBMS", 30, 36, 83.33]],
+        [None, None, 82.0],
+    ))
+    assert [row.subject for row in table.subjects] == ["Maths", "DBMS"]
+    assert len(table.rejected) == 2
+    assert "OS" in table.rejected[0] and "DSA" in table.rejected[1]
+
+def test_partial_table_is_reported_and_not_cached():
+    result = table_result(answer([["Maths", 40, 45, 88.89], ["OS", None, 38, 80.0], ["DBMS", 30, 36, 83.33]],
+                                 [70, 81, 86.42]))
+    assert [row["subject"] for row in result["subjects"]] == ["Maths", "DBMS"]
+    assert result["table_check"]["ok"] is False
+    assert any("OS" in issue for issue in result["table_check"]["issues"])
+    assert not is_cacheable(result)
+
+def test_consistent_table_is_cached():
+    result = table_result(answer([["Maths", 40, 45, 88.89], ["DBMS", 30, 36, 83.33]], [70, 81, 86.42]))
+    assert result["table_check"]["ok"] is True
+    assert result["overall_attendance"] == 86.42
+    assert is_cacheable(result)
@@ -0,0 +1,51 @@
+import numpy as np
+from app.ml.train_model import (
+    FEATURE_COLUMNS, generate_strict_btech_data, list_training_shards, strict_rule_label, train_on_shards,
+    write_training_shards,
+)
+
+def test_same_seed_same_rows():
+    assert generate_strict_btech_data(20_000, seed=42).equals(generate_strict_btech_data(20_000, seed=42))
+    assert not generate_strict_btech_data(1_000, seed=42).equals(generate_strict_btech_data(1_000, seed=43))
+
+def test_labels_follow_the_scalar_rules():
+    df = generate_strict_btech_data(100_000, seed=42)
+    expected = np.array([
+        strict_rule_label(att, core, days)
+        for att, core, days in zip(df['overall_attendance'], df['is_core_subject'], df['days_to_exam'])
+    ])
+    bad = np.flatnonzero(expected != df['target'].to_numpy())
+    assert bad.size == 0, f"{bad.size} labels differ, first: {df.iloc[bad[0]].to_dict()}"
+
+    # Every rule boundary is actually exercised
+    assert (df['overall_attendance'] < 75).any()
+    assert ((df['overall_attendance'] >= 75) & (df['days_to_exam'] <= 2)).any()
+    assert ((df['overall_attendance'] >= 85) & df['days_to_exam'].between(3, 4)).any()
+
+def load_shards(shard_dir):
+    shards = list_training_shards(shard_dir)
+    return np.concatenate([np.load(x) for x, _ in shards]), np.concatenate([np.load(y) for _, y in shards])
+
+def test_shards_are_seed_stable_and_follow_the_rules(tmp_path):
+    write_training_shards(tmp_path / "a", 2_500, chunk_size=1_000, seed=7)
+    write_training_shards(tmp_path / "b", 2_500, chunk_size=1_000, seed=7)
+    X, y = load_shards(tmp_path / "a")
+    X_again, y_again = load_shards(tmp_path / "b")
+
+    assert len(list_training_shards(tmp_path / "a")) == 3
+    assert X.shape == (2_500, len(FEATURE_COLUMNS)) and X.dtype == np.float32
+    assert np.array_equal(X, X_again) and np.array_equal(y, y_again)
+
+    columns = {name: X[:, i] for i, name in enumerate(FEATURE_COLUMNS)}
+    expected = [strict_rule_label(att, core, days) for att, core, days in
+                zip(columns['overall_attendance'], columns['is_core_subject'], columns['days_to_exam'])]
+    assert np.array_equal(np.array(expected, dtype=np.float32), y)
+
+def test_training_from_shards_learns_the_rules(tmp_path):
+    import xgboost as xgb
+
+    write_training_shards(tmp_path, 6_000, chunk_size=2_000, seed=7)
+    model = train_on_shards(str(tmp_path))
+    X, y = load_shards(tmp_path)
+    predicted = model.predict(xgb.DMatrix(X, feature_names=FEATURE_COLUMNS)) >= 0.5
+    assert (predicted == y.astype(bool)).mean() > 0.97
@@ -0,0 +1,27 @@
+from app.api.predict_routes import PredictionRequest, calculate_vintage_risk
+from app.ml.vintage_batch import requests_to_columns, calculate_vintage_risk_batch
+from benchmarks.bench_vintage_batch import random_rows
+from tests.test_conditional_get import PREDICTION
+
+def assert_same_as_scalar(rows):
+    batch = calculate_vintage_risk_batch(requests_to_columns(rows))
+    for i, (row, got) in enumerate(zip(rows, batch)):
+        assert got == calculate_vintage_risk(row.model_copy()), f"row {i}: {row}"
+
+def test_batch_matches_the_scalar_rules():
+    assert_same_as_scalar(random_rows(20_000))
+
+def test_boundaries_and_rounding_match():
+    # Thresholds (75/85 attendance, 3/7 days, risk 50) and risks ending in .x5
+    attendances = [0.0, 54.98, 55.0, 74.99, 75.0, 75.01, 84.99, 85.0, 85.01, 100.0, 62.33, 71.11]
+    rows = [
+        PredictionRequest(**{**PREDICTION, "overall_attendance": attendance, "days_to_exam": days,
+                             "faculty_strictness": strictness, "is_lab": lab, "has_proxy": proxy})
+        for attendance in attendances for days in (-2, 3, 4, 7, 8)
+        for strictness in (1, 2, 3) for lab in (False, True) for proxy in (False, True)
+    ]
+    assert_same_as_scalar(rows)
+
+def test_extra_fields_land_on_every_row():
+    rows = random_rows(3)
+    assert all(row["engine"] == "vintage" for row in calculate_vintage_risk_batch(requests_to_columns(rows), engine="vintage"))
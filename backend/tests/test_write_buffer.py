@@ -0,0 +1,28 @@
+import asyncio
+from app.db.write_buffer import WriteBehindBuffer
+
+class SlowCollection:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.documents = []
+        self.database = None
+
+    async def insert_many(self, batch, ordered=False):
+        await asyncio.sleep(self.delay)
+        self.documents += batch
+
+def test_stop_drains_batch_in_flight():
+    async def scenario():
+        collection = SlowCollection(delay=0.2)
+        buffer = WriteBehindBuffer("history", max_batch=2, flush_interval=5, max_pending=100, max_retries=1)
+        buffer.start({"history": collection})
+        buffer.add_many([{"i": i} for i in range(7)])
+        # Let the flusher take the first batch off the queue and block inside insert_many
+        await asyncio.sleep(0.05)
+        await buffer.stop()
+        return collection, buffer
+
+    collection, buffer = asyncio.run(scenario())
+    assert sorted(doc["i"] for doc in collection.documents) == list(range(7))
+    assert buffer.stats()["written"] == 7
+    assert buffer.stats()["dropped"] == 0